@@ -6,7 +6,7 @@ from pathlib import Path
 
 from azure.storage.blob import BlobServiceClient
 
-from .config import Settings
+from .config import PARQUET_PREFIX, Settings
 
 LOG = logging.getLogger("bootstrap_storage")
 
@@ -57,11 +57,23 @@ def main() -> int:
     ensure_container(service, s.blob_data_container)
     ensure_container(service, s.blob_log_container)
 
-    local_csv = Path("data/spam_sample.csv")
-    if not local_csv.exists():
-        raise RuntimeError("Expected data/spam_sample.csv in repo root. Run from repo root.")
-
-    upload_if_changed(service, s.blob_data_container, "spam_sample.csv", local_csv)
+    if s.data_format == "parquet":
+        local_dir = Path(os.getenv("SPAM_PARQUET_DIR", "data/spam_parquet"))
+        files = sorted(p for p in local_dir.rglob("*.parquet") if p.is_file())
+        if not files:
+            raise RuntimeError(
+                f"No Parquet files in {local_dir}. Create them with: python -m "
+                f"src.training.convert_dataset --input data/spam_sample.csv --output-dir {local_dir}"
+            )
+        for path in files:
+            blob_name = f"{PARQUET_PREFIX}/{path.relative_to(local_dir).as_posix()}"
+            upload_if_changed(service, s.blob_data_container, blob_name, path)
+    else:
+        local_csv = Path("data/spam_sample.csv")
+        if not local_csv.exists():
+            raise RuntimeError("Expected data/spam_sample.csv in repo root. Run from repo root.")
+
+        upload_if_changed(service, s.blob_data_container, "spam_sample.csv", local_csv)
     LOG.info("Storage bootstrap complete.")
     return 0
 
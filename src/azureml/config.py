@@ -6,6 +6,9 @@ from dataclasses import dataclass
 from azure.ai.ml import MLClient
 from azure.identity import DefaultAzureCredential
 
+# Blob prefix (in the data container) of the Parquet dataset folder.
+PARQUET_PREFIX = "spam_parquet"
+
 
 @dataclass(frozen=True)
 class Settings:
@@ -23,6 +26,9 @@ class Settings:
     aml_endpoint_name: str
     aml_deployment_name: str
 
+    # "csv": one uri_file CSV. "parquet": a uri_folder of Parquet files (see convert_dataset.py).
+    data_format: str = "csv"
+
     @staticmethod
     def from_env() -> Settings:
         def req(name: str) -> str:
@@ -31,6 +37,10 @@ class Settings:
                 raise RuntimeError(f"Missing required env var: {name}")
             return val
 
+        data_format = os.getenv("SPAM_DATA_FORMAT", "csv")
+        if data_format not in ("csv", "parquet"):
+            raise RuntimeError(f"SPAM_DATA_FORMAT must be csv or parquet, got {data_format!r}")
+
         return Settings(
             subscription_id=req("AZURE_SUBSCRIPTION_ID"),
             resource_group=req("AZURE_RESOURCE_GROUP"),
@@ -42,6 +52,7 @@ class Settings:
             blob_log_container=os.getenv("BLOB_LOG_CONTAINER", "logs"),
             aml_endpoint_name=os.getenv("AML_ENDPOINT_NAME", "spam-endpoint"),
             aml_deployment_name=os.getenv("AML_DEPLOYMENT_NAME", "blue"),
+            data_format=data_format,
         )
 
 
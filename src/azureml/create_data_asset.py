@@ -6,7 +6,7 @@ from datetime import datetime, timezone
 
 from azure.ai.ml.entities import AccountKeyConfiguration, AzureBlobDatastore, Data
 
-from .config import Settings, get_ml_client
+from .config import PARQUET_PREFIX, Settings, get_ml_client
 
 LOG = logging.getLogger("create_data_asset")
 
@@ -48,13 +48,22 @@ def main() -> int:
     LOG.info("Datastore ready: %s", datastore_name)
 
     version = datetime.now(timezone.utc).strftime("%Y%m%d%H%M%S")
-    data = Data(
-        name="spam_sample",
-        version=version,
-        description="Tiny spam/ham dataset stored in Azure Blob (CSV).",
-        type="uri_file",
-        path=f"azureml://datastores/{datastore_name}/paths/spam_sample.csv",
-    )
+    if s.data_format == "parquet":
+        data = Data(
+            name="spam_sample",
+            version=version,
+            description="Spam/ham dataset stored in Azure Blob (folder of Parquet files).",
+            type="uri_folder",
+            path=f"azureml://datastores/{datastore_name}/paths/{PARQUET_PREFIX}/",
+        )
+    else:
+        data = Data(
+            name="spam_sample",
+            version=version,
+            description="Tiny spam/ham dataset stored in Azure Blob (CSV).",
+            type="uri_file",
+            path=f"azureml://datastores/{datastore_name}/paths/spam_sample.csv",
+        )
     ml.data.create_or_update(data)
     LOG.info("Data asset created: %s:%s", data.name, data.version)
     return 0
@@ -67,7 +67,11 @@ def main() -> int:
         code=str(Path("src/training")),
         command="python train.py --data ${{inputs.data}} --output-dir ${{outputs.model_output}}",
         inputs={
-            "data": Input(type=AssetTypes.URI_FILE, path=data_asset, mode="ro_mount"),
+            "data": Input(
+                type=AssetTypes.URI_FOLDER if s.data_format == "parquet" else AssetTypes.URI_FILE,
+                path=data_asset,
+                mode="ro_mount",
+            ),
         },
         outputs={
             "model_output": Output(type=AssetTypes.URI_FOLDER, mode="rw_mount"),
@@ -0,0 +1,141 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any
+
+FUNCTION_DIR = Path(__file__).resolve().parent / "predict_function"
+
+
+def _run_stub(port: int, delay_s: float) -> None:
+    """Scoring stub: answers after delay_s, standing in for network + model time."""
+    from aiohttp import web
+
+    async def score(request: web.Request) -> web.Response:
+        body = await request.json()
+        await asyncio.sleep(delay_s)
+        n = len(body["texts"]) if "texts" in body else 1
+        return web.json_response({"predictions": [0] * n, "latency_ms": int(delay_s * 1000)})
+
+    app = web.Application()
+    app.router.add_post("/score", score)
+    web.run_app(app, host="127.0.0.1", port=port, print=None, access_log=None)
+
+
+def _wait_for_port(port: int, timeout_s: float = 10.0) -> None:
+    import socket
+
+    deadline = time.monotonic() + timeout_s
+    while time.monotonic() < deadline:
+        with socket.socket() as s:
+            if s.connect_ex(("127.0.0.1", port)) == 0:
+                return
+        time.sleep(0.05)
+    raise RuntimeError(f"stub did not start on port {port}")
+
+
+def bench_threads(requests_total: int, threads: int) -> float:
+    """The blocking path: a worker running the sync client on `threads` threads."""
+    from shared_code.aml_client import AMLOnlineEndpointClient, build_session
+    from shared_code.clients import get_logger
+    from shared_code.settings import FunctionSettings
+
+    settings = FunctionSettings.from_env()
+    client = AMLOnlineEndpointClient(
+        settings.aml_scoring_uri,
+        settings.aml_endpoint_key,
+        timeout_s=settings.http_timeout_s,
+        session=build_session(
+            settings.http_pool_size, settings.http_retries, settings.http_backoff_s
+        ),
+    )
+    logger = get_logger(settings)
+
+    def invoke(i: int) -> None:
+        pred = client.predict(f"message {i}")
+        logger.write({"input": {"text": f"message {i}"}, "prediction": pred.predictions})
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as ex:
+        list(ex.map(invoke, range(requests_total)))
+    rps = requests_total / (time.perf_counter() - start)
+    client.close()
+    return rps
+
+
+def bench_async(requests_total: int, concurrency: int) -> float:
+    """The asyncio path: predict.main invoked `concurrency` at a time on one event loop."""
+    import azure.functions as func
+    import predict
+    from shared_code.clients import close_async_client
+
+    async def run() -> float:
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def invoke(i: int) -> None:
+            req = func.HttpRequest(
+                method="POST",
+                url="/api/predict",
+                headers={"Content-Type": "application/json"},
+                body=json.dumps({"text": f"message {i}"}).encode("utf-8"),
+            )
+            async with semaphore:
+                resp = await predict.main(req)
+            if resp.status_code != 200:
+                raise RuntimeError(resp.get_body().decode("utf-8"))
+
+        start = time.perf_counter()
+        await asyncio.gather(*(invoke(i) for i in range(requests_total)))
+        rps = requests_total / (time.perf_counter() - start)
+        await close_async_client()
+        return rps
+
+    return asyncio.run(run())
+
+
+def parse_args() -> argparse.Namespace:
+    p = argparse.ArgumentParser(
+        description="Per-worker throughput of the blocking vs asyncio Function path."
+    )
+    p.add_argument("--requests", type=int, default=2000)
+    p.add_argument("--concurrency", type=int, default=200, help="In-flight requests (async)")
+    p.add_argument("--threads", type=int, nargs="+", default=[1, 5, 32])
+    p.add_argument("--stub-latency-ms", type=float, default=20.0)
+    p.add_argument("--port", type=int, default=8765)
+    return p.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    sys.path.insert(0, str(FUNCTION_DIR))
+    stub = multiprocessing.Process(
+        target=_run_stub, args=(args.port, args.stub_latency_ms / 1000), daemon=True
+    )
+    stub.start()
+    try:
+        _wait_for_port(args.port)
+        with tempfile.TemporaryDirectory() as log_dir:
+            env: dict[str, Any] = {
+                "AML_SCORING_URI": f"http://127.0.0.1:{args.port}/score",
+                "AML_ENDPOINT_KEY": "bench",
+                "AML_HTTP_POOL_SIZE": str(max(args.threads)),
+                "AML_ASYNC_POOL_SIZE": str(args.concurrency),
+                "LOCAL_BLOB_LOG_DIR": log_dir,
+            }
+            os.environ.update({k: v for k, v in env.items() if k not in os.environ})
+            print(f"stub latency {args.stub_latency_ms:g} ms, {args.requests} requests")
+            for threads in args.threads:
+                rps = bench_threads(args.requests, threads)
+                print(f"  blocking client, {threads:>3} threads: {rps:8.0f} req/s")
+            rps = bench_async(args.requests, args.concurrency)
+            print(f"  async main, {args.concurrency:>3} in flight:    {rps:8.0f} req/s")
+    finally:
+        stub.terminate()
@@ -1,14 +1,26 @@
 from __future__ import annotations
 
+import asyncio
 import json
 import logging
 import time
+from dataclasses import asdict
 from datetime import datetime, timezone
 from typing import Any
 
 import azure.functions as func
-from shared_code.aml_client import AMLOnlineEndpointClient
+from shared_code.aml_client import AMLBatchPrediction, AMLPrediction
 from shared_code.blob_logger import PredictionLogger
+from shared_code.clients import (
+    get_async_client,
+    get_cache,
+    get_local_scorer,
+    get_logger,
+    local_scorer_error,
+)
+from shared_code.latency_guard import CircuitOpenError
+from shared_code.local_scorer import LocalScorer
+from shared_code.prediction_cache import CacheHit, FrontCache
 from shared_code.settings import FunctionSettings
 
 LOG = logging.getLogger("function.predict")
@@ -22,34 +34,181 @@ def _json_response(payload: dict[str, Any], status: int = 200) -> func.HttpRespo
     )
 
 
-def main(req: func.HttpRequest) -> func.HttpResponse:
+async def _log(settings: FunctionSettings, record: dict[str, Any]) -> str:
+    logger = get_logger(settings)
+    if isinstance(logger, PredictionLogger):
+        # A blocking storage upload: run it on a thread so the event loop keeps serving
+        # other invocations' endpoint calls meanwhile.
+        return (await asyncio.to_thread(logger.write, record)).destination
+    return logger.write(record).destination  # only enqueues or buffers
+
+
+async def _cache_get(cache: FrontCache, text: str, version: str) -> CacheHit | None:
+    if cache.shared is None:
+        return cache.get(text, version)
+    return await asyncio.to_thread(cache.get, text, version)  # SQLite file I/O
+
+
+async def _cache_put(cache: FrontCache, text: str, version: str, prediction: int) -> None:
+    if cache.shared is None:
+        cache.put(text, version, prediction)
+    else:
+        await asyncio.to_thread(cache.put, text, version, prediction)
+
+
+class _EndpointError(Exception):
+    """The scoring endpoint failed or sent back an answer that could not be used."""
+
+
+def _local_scorer(settings: FunctionSettings) -> LocalScorer | None:
+    return get_local_scorer(settings) if settings.scoring_mode == "local" else None
+
+
+def _local_error(settings: FunctionSettings, exc: Exception | None = None) -> str | None:
+    """Why local mode fell back to the endpoint, for the response; None in remote mode."""
+    if settings.scoring_mode != "local":
+        return None
+    if exc is not None:
+        return f"{type(exc).__name__}: {exc}"
+    return local_scorer_error(settings)
+
+
+async def _predict_one(
+    settings: FunctionSettings, text: str
+) -> tuple[AMLPrediction, str, str | None]:
+    """Score in-process in local mode, else (or if that fails) through the endpoint.
+
+    Returns the prediction, who scored it, and why local mode fell back, if it did.
+    """
+    scorer = _local_scorer(settings)
+    error = _local_error(settings)
+    if scorer is not None:
+        try:
+            # One text takes well under a millisecond, so it runs on the event loop.
+            return scorer.predict(text), "local", None
+        except Exception as exc:
+            LOG.exception("In-process scoring failed; falling back to the endpoint")
+            error = _local_error(settings, exc)
+    client = get_async_client(settings)
+    try:
+        return await client.predict(text), "endpoint", error
+    except CircuitOpenError:
+        raise
+    except Exception as exc:
+        raise _EndpointError(f"{type(exc).__name__}: {exc}") from exc
+
+
+async def _predict_many(
+    settings: FunctionSettings, texts: list[str]
+) -> tuple[AMLBatchPrediction, str, str | None]:
+    scorer = _local_scorer(settings)
+    error = _local_error(settings)
+    if scorer is not None:
+        try:
+            pred = await asyncio.to_thread(scorer.predict_texts, texts)
+            batch = AMLBatchPrediction(list(pred.predictions), pred.latency_ms, chunks=1)
+            return batch, "local", None
+        except Exception as exc:
+            LOG.exception("In-process scoring failed; falling back to the endpoint")
+            error = _local_error(settings, exc)
+    batch = await get_async_client(settings).predict_batch(
+        texts, settings.batch_chunk_size, settings.batch_max_concurrency
+    )
+    return batch, "endpoint", error
+
+
+async def _predict_batch(
+    settings: FunctionSettings, raw_texts: Any, start: float
+) -> func.HttpResponse:
+    if not isinstance(raw_texts, list) or not raw_texts:
+        return _json_response({"error": "'texts' must be a non-empty JSON array"}, 400)
+    if len(raw_texts) > settings.batch_max_texts:
+        return _json_response({"error": "Too many texts", "limit": settings.batch_max_texts}, 413)
+    texts = [str(t) for t in raw_texts]
+
+    batch, scored_by, local_error = await _predict_many(settings, texts)
+    record: dict[str, Any] = {
+        "ts_utc": datetime.now(timezone.utc).isoformat(),
+        "input": {"texts": texts},
+        "prediction": {"predictions": batch.predictions},
+        "chunks": batch.chunks,
+        "errors": [asdict(e) for e in batch.errors],
+        "endpoint_latency_ms": batch.latency_ms,
+        "scored_by": scored_by,
+        "function_latency_ms": int((time.perf_counter() - start) * 1000),
+    }
+    if local_error:
+        record["local_scoring_error"] = local_error
+    record["log_destination"] = await _log(settings, record)
+    # Partial failures still return 200 with per-chunk errors; only a total failure is a 502.
+    return _json_response(record, 502 if len(batch.errors) == batch.chunks else 200)
+
+
+async def main(req: func.HttpRequest) -> func.HttpResponse:
     start = time.perf_counter()
+    # Only the request body is the caller's fault; everything after it is a 5xx.
     try:
-        settings = FunctionSettings.from_env()
         body = req.get_json()
+    except ValueError:
+        return _json_response({"error": "Invalid JSON body"}, 400)
+    if not isinstance(body, dict):
+        return _json_response({"error": "Expected a JSON object"}, 400)
+    try:
+        settings = FunctionSettings.from_env()
+    except (RuntimeError, ValueError) as exc:
+        LOG.exception("Invalid Function settings")
+        return _json_response({"error": "invalid_settings", "detail": str(exc)}, 500)
+
+    try:
+        if "texts" in body:
+            return await _predict_batch(settings, body["texts"], start)
         text = str(body.get("text", "")).strip()
         if not text:
-            return _json_response({"error": "Missing 'text' in JSON body"}, 400)
+            return _json_response({"error": "Missing 'text' or 'texts' in JSON body"}, 400)
 
-        client = AMLOnlineEndpointClient(settings.aml_scoring_uri, settings.aml_endpoint_key)
-        pred = client.predict(text)
+        cache = get_cache(settings)
+        # Until the endpoint has named its model version (or AML_MODEL_VERSION pins it),
+        # there is no safe key, so the first call per worker always reaches the endpoint.
+        scorer = _local_scorer(settings)
+        version = settings.model_version or (
+            scorer.version if scorer is not None else get_async_client(settings).model_version
+        )
+        hit = await _cache_get(cache, text, version) if cache and version else None
 
-        record = {
+        record: dict[str, Any] = {
             "ts_utc": datetime.now(timezone.utc).isoformat(),
             "input": {"text": text},
-            "prediction": {"predictions": pred.predictions},
-            "endpoint_latency_ms": pred.latency_ms,
-            "function_latency_ms": int((time.perf_counter() - start) * 1000),
         }
+        if hit is not None:
+            record["prediction"] = {"predictions": [hit.prediction]}
+            record["endpoint_latency_ms"] = None
+            record["cached"] = True
+            record["cache_tier"] = hit.tier
+        else:
+            pred, scored_by, local_error = await _predict_one(settings, text)
+            version = settings.model_version or pred.model_version
+            if cache and version and len(pred.predictions) == 1:
+                await _cache_put(cache, text, version, pred.predictions[0])
+            record["prediction"] = {"predictions": pred.predictions}
+            record["endpoint_latency_ms"] = pred.latency_ms
+            record["cached"] = False
+            record["scored_by"] = scored_by
+            if local_error:
+                record["local_scoring_error"] = local_error
+            if pred.hedged:
+                record["hedged"] = True
+        record["model_version"] = version
+        record["function_latency_ms"] = int((time.perf_counter() - start) * 1000)
 
-        logger = PredictionLogger(settings.storage_connection_string, settings.log_container)
-        log_res = logger.write(record)
-        record["log_destination"] = log_res.destination
+        record["log_destination"] = await _log(settings, record)
 
         return _json_response(record, 200)
 
-    except ValueError:
-        return _json_response({"error": "Invalid JSON body"}, 400)
+    except _EndpointError as exc:
+        LOG.exception("Endpoint call failed")
+        return _json_response({"error": "endpoint_error", "detail": str(exc)}, 502)
+    except CircuitOpenError:
+        return _json_response({"error": "endpoint_unavailable"}, 503)
     except Exception as exc:
         LOG.exception("Unhandled error")
         return _json_response({"error": "server_error", "detail": str(exc)}, 500)
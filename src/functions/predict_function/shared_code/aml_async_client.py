@@ -0,0 +1,195 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from dataclasses import replace
+from typing import Any
+
+import aiohttp
+
+from .aml_client import (
+    RETRY_STATUSES,
+    AMLBatchPrediction,
+    AMLPrediction,
+    ChunkError,
+    model_version_from,
+)
+from .latency_guard import LatencyGuard
+
+
+class AsyncAMLOnlineEndpointClient:
+    """asyncio counterpart of AMLOnlineEndpointClient, on a pooled aiohttp session.
+
+    One event loop can keep hundreds of endpoint calls in flight, where the blocking client
+    needs a thread each. The session is created lazily on first use, inside the running
+    loop. If the client is later used from a different loop, the old session is closed and a
+    new one created. Retries follow
+    the blocking client: connection errors and RETRY_STATUSES, with exponential backoff (or
+    the server's Retry-After).
+    """
+
+    def __init__(
+        self,
+        scoring_uri: str,
+        api_key: str,
+        timeout_s: float = 10.0,
+        pool_size: int = 100,
+        retries: int = 2,
+        backoff_s: float = 0.2,
+        guard: LatencyGuard | None = None,
+    ) -> None:
+        self._uri = scoring_uri
+        self._headers = {"Authorization": f"Bearer {api_key}", "Content-Type": "application/json"}
+        self._timeout = aiohttp.ClientTimeout(total=timeout_s)
+        self._pool_size = pool_size
+        self._retries = retries
+        self._backoff_s = backoff_s
+        self._session: aiohttp.ClientSession | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self.model_version: str | None = None
+        self.guard = guard
+
+    async def _get_session(self) -> aiohttp.ClientSession:
+        loop = asyncio.get_running_loop()
+        if self._session is None or self._session.closed or self._loop is not loop:
+            stale, stale_loop = self._session, self._loop
+            if stale is not None and not stale.closed:
+                if stale_loop is not None and stale_loop.is_running():
+                    # Still serving elsewhere: its connections belong to that loop.
+                    asyncio.run_coroutine_threadsafe(stale.close(), stale_loop)
+                else:
+                    await stale.close()
+            connector = aiohttp.TCPConnector(limit=self._pool_size, keepalive_timeout=60)
+            self._session = aiohttp.ClientSession(
+                connector=connector, headers=self._headers, timeout=self._timeout
+            )
+            self._loop = loop
+        return self._session
+
+    async def _score(self, body: dict[str, Any], hedge: bool = False) -> AMLPrediction:
+        """One endpoint call, through the guard's circuit breaker and hedging if set."""
+        if self.guard is None:
+            return await self._post(body)
+        self.guard.check()
+        start = time.perf_counter()
+        ok = False
+        try:
+            delay = self.guard.hedge_delay() if hedge else None
+            pred = await (self._post(body) if delay is None else self._hedged(body, delay))
+            ok = True
+            return pred
+        finally:
+            self.guard.record(time.perf_counter() - start, ok)
+
+    async def _hedged(self, body: dict[str, Any], delay_s: float) -> AMLPrediction:
+        """Send body; if no answer within delay_s, send it again and keep the first success."""
+        assert self.guard is not None
+        primary = asyncio.ensure_future(self._post(body))
+        pending = {primary}
+        error: BaseException | None = None
+        try:
+            done, _ = await asyncio.wait(pending, timeout=delay_s)
+            if done:
+                return primary.result()
+            self.guard.hedge_fired()
+            hedge = asyncio.ensure_future(self._post(body))
+            pending.add(hedge)
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    error = task.exception()
+                    if error is None:
+                        if task is hedge:
+                            self.guard.hedge_won()
+                            return replace(task.result(), hedged=True)
+                        return task.result()
+        finally:
+            for task in pending:
+                task.cancel()  # the loser's connection is closed rather than waited for
+            await asyncio.gather(*pending, return_exceptions=True)
+        assert error is not None
+        raise error
+
+    async def _post(self, body: dict[str, Any]) -> AMLPrediction:
+        session = await self._get_session()
+        start = time.perf_counter()
+        for attempt in range(self._retries + 1):
+            last = attempt == self._retries
+            try:
+                async with session.post(self._uri, json=body) as r:
+                    if r.status in RETRY_STATUSES and not last:
+                        await r.read()  # drain, so the connection goes back to the pool
+                        await asyncio.sleep(
+                            self._retry_delay(attempt, r.headers.get("Retry-After"))
+                        )
+                        continue
+                    r.raise_for_status()
+                    payload: dict[str, Any] = await r.json(content_type=None)
+                    version = model_version_from(payload, r.headers)
+                    self.model_version = version or self.model_version
+                    break
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError):
+                if last:
+                    raise
+                await asyncio.sleep(self._retry_delay(attempt, None))
+        latency_ms = int((time.perf_counter() - start) * 1000)
+        preds = [int(x) for x in payload.get("predictions", [])]
+        return AMLPrediction(preds, latency_ms, version)
+
+    def _retry_delay(self, attempt: int, retry_after: str | None) -> float:
+        if retry_after is not None:
+            try:
+                return float(retry_after)
+            except ValueError:
+                pass
+        return self._backoff_s * (2**attempt)
+
+    async def predict(self, text: str) -> AMLPrediction:
+        return await self._score({"text": text}, hedge=True)
+
+    async def predict_texts(self, texts: list[str]) -> AMLPrediction:
+        pred = await self._score({"texts": texts})
+        if len(pred.predictions) != len(texts):
+            raise ValueError(
+                f"Endpoint returned {len(pred.predictions)} predictions for {len(texts)} texts"
+            )
+        return pred
+
+    async def predict_batch(
+        self, texts: list[str], chunk_size: int = 32, max_concurrency: int = 4
+    ) -> AMLBatchPrediction:
+        """Same contract as AMLOnlineEndpointClient.predict_batch, on the event loop."""
+        if chunk_size < 1 or max_concurrency < 1:
+            raise ValueError("chunk_size and max_concurrency must be >= 1")
+        starts = range(0, len(texts), chunk_size)
+        semaphore = asyncio.Semaphore(max_concurrency)
+
+        async def score_chunk(i: int) -> AMLPrediction:
+            async with semaphore:
+                return await self.predict_texts(texts[i : i + chunk_size])
+
+        start = time.perf_counter()
+        results = await asyncio.gather(*(score_chunk(i) for i in starts), return_exceptions=True)
+        predictions: list[int | None] = [None] * len(texts)
+        errors: list[ChunkError] = []
+        for i, result in zip(starts, results, strict=True):
+            end = min(i + chunk_size, len(texts))
+            if isinstance(result, BaseException):
+                errors.append(
+                    ChunkError(start=i, end=end, error=f"{type(result).__name__}: {result}")
+                )
+            else:
+                predictions[i:end] = result.predictions
+        return AMLBatchPrediction(
+            predictions=predictions,
+            latency_ms=int((time.perf_counter() - start) * 1000),
+            chunks=len(starts),
+            errors=errors,
+        )
+
+    async def close(self) -> None:
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+            # Let the closed transports finish closing before a caller ends the loop.
+            await asyncio.sleep(0)
@@ -1,34 +1,185 @@
 from __future__ import annotations
 
+import socket
 import time
-from dataclasses import dataclass
+from collections.abc import Mapping
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
 from typing import Any
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection
+from urllib3.util.retry import Retry
+
+# Statuses worth retrying: throttling and transient gateway/deployment errors. Scoring is a
+# pure function of the input, so retrying the POST is safe.
+RETRY_STATUSES = (429, 502, 503, 504)
+
+# Response header with the model fingerprint, sent by the local server. A managed online
+# endpoint's azureml-model-deployment header is deliberately not used: it names the
+# deployment ("blue"), which stays the same when a new model is rolled onto it.
+MODEL_VERSION_HEADER = "X-Model-Version"
+
+
+def model_version_from(payload: Mapping[str, Any], headers: Mapping[str, str]) -> str | None:
+    """The model fingerprint score.run returns in its body, else the X-Model-Version header."""
+    value = payload.get("model_version") or headers.get(MODEL_VERSION_HEADER)
+    return str(value) if value else None
 
 
 @dataclass(frozen=True)
 class AMLPrediction:
     predictions: list[int]
     latency_ms: int
+    model_version: str | None = None
+    # Answered by a hedge request rather than the original one (async client only).
+    hedged: bool = False
+
+
+@dataclass(frozen=True)
+class ChunkError:
+    start: int  # index of the chunk's first text in the request
+    end: int  # exclusive
+    error: str
+
+
+@dataclass(frozen=True)
+class AMLBatchPrediction:
+    """Predictions in input order; texts from a failed chunk are None and listed in errors."""
+
+    predictions: list[int | None]
+    latency_ms: int
+    chunks: int
+    errors: list[ChunkError] = field(default_factory=list)
+
+
+class _KeepAliveAdapter(HTTPAdapter):
+    """HTTPAdapter that turns on TCP keepalive so idle pooled sockets survive NAT timeouts."""
+
+    def init_poolmanager(self, *args: Any, **kwargs: Any) -> None:
+        options = [
+            *HTTPConnection.default_socket_options,
+            (socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1),
+        ]
+        # Azure's load balancer drops idle flows after 4 minutes; probe well before that.
+        if hasattr(socket, "TCP_KEEPIDLE"):  # Linux
+            options += [
+                (socket.IPPROTO_TCP, socket.TCP_KEEPIDLE, 60),
+                (socket.IPPROTO_TCP, socket.TCP_KEEPINTVL, 30),
+            ]
+        kwargs["socket_options"] = options
+        super().init_poolmanager(*args, **kwargs)
+
+
+def build_session(
+    pool_size: int = 10, retries: int = 2, backoff_s: float = 0.2
+) -> requests.Session:
+    """requests.Session with a connection pool of pool_size and retry with exponential backoff.
+
+    Connection errors and RETRY_STATUSES are retried up to `retries` times, waiting
+    backoff_s, 2*backoff_s, ... between attempts (or the server's Retry-After).
+    """
+    retry = Retry(
+        total=retries,
+        backoff_factor=backoff_s,
+        status_forcelist=RETRY_STATUSES,
+        allowed_methods=frozenset({"POST"}),
+        respect_retry_after_header=True,
+        raise_on_status=False,
+    )
+    adapter = _KeepAliveAdapter(pool_connections=4, pool_maxsize=pool_size, max_retries=retry)
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
 
 
 class AMLOnlineEndpointClient:
-    def __init__(self, scoring_uri: str, api_key: str, timeout_s: float = 10.0) -> None:
+    """Blocking endpoint client on a pooled requests session.
+
+    The Function scores through AsyncAMLOnlineEndpointClient; this one is for scripts and
+    the blocking-path benchmark (src/functions/bench_function.py). It has the session's
+    retries only: hedging and the circuit breaker (LatencyGuard) are implemented on the
+    async client alone, and the AML_HEDGE* / AML_BREAKER* settings do not affect this one.
+    """
+
+    def __init__(
+        self,
+        scoring_uri: str,
+        api_key: str,
+        timeout_s: float = 10.0,
+        session: requests.Session | None = None,
+    ) -> None:
         self._uri = scoring_uri
-        self._key = api_key
+        self._headers = {"Authorization": f"Bearer {api_key}", "Content-Type": "application/json"}
         self._timeout_s = timeout_s
+        self._session = session if session is not None else build_session()
+        # Last model version the endpoint reported; None until a response names one.
+        self.model_version: str | None = None
 
-    def predict(self, text: str) -> AMLPrediction:
+    def _post(self, body: dict[str, Any]) -> AMLPrediction:
         start = time.perf_counter()
-        r = requests.post(
+        r = self._session.post(
             self._uri,
-            headers={"Authorization": f"Bearer {self._key}", "Content-Type": "application/json"},
-            json={"text": text},
+            headers=self._headers,
+            json=body,
             timeout=self._timeout_s,
         )
         latency_ms = int((time.perf_counter() - start) * 1000)
         r.raise_for_status()
         payload: dict[str, Any] = r.json()
         preds = [int(x) for x in payload.get("predictions", [])]
-        return AMLPrediction(predictions=preds, latency_ms=latency_ms)
+        version = model_version_from(payload, r.headers)
+        self.model_version = version or self.model_version
+        return AMLPrediction(preds, latency_ms, version)
+
+    def predict(self, text: str) -> AMLPrediction:
+        return self._post({"text": text})
+
+    def predict_texts(self, texts: list[str]) -> AMLPrediction:
+        """Score several texts in one call (score.run accepts {"texts": [...]})."""
+        pred = self._post({"texts": texts})
+        if len(pred.predictions) != len(texts):
+            raise ValueError(
+                f"Endpoint returned {len(pred.predictions)} predictions for {len(texts)} texts"
+            )
+        return pred
+
+    def predict_batch(
+        self, texts: list[str], chunk_size: int = 32, max_concurrency: int = 4
+    ) -> AMLBatchPrediction:
+        """Split texts into chunks and score them concurrently, at most max_concurrency at once.
+
+        Each chunk succeeds or fails on its own: a failed chunk (after the session's retries)
+        leaves None for its texts and an entry in errors, and the other chunks are kept.
+        """
+        if chunk_size < 1 or max_concurrency < 1:
+            raise ValueError("chunk_size and max_concurrency must be >= 1")
+        starts = range(0, len(texts), chunk_size)
+        start = time.perf_counter()
+        predictions: list[int | None] = [None] * len(texts)
+        errors: list[ChunkError] = []
+        if starts:
+            workers = min(max_concurrency, len(starts))
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="aml-chunk") as ex:
+                futures = [
+                    (i, ex.submit(self.predict_texts, texts[i : i + chunk_size])) for i in starts
+                ]
+                for i, future in futures:
+                    end = min(i + chunk_size, len(texts))
+                    try:
+                        predictions[i:end] = future.result().predictions
+                    except Exception as exc:
+                        errors.append(
+                            ChunkError(start=i, end=end, error=f"{type(exc).__name__}: {exc}")
+                        )
+        return AMLBatchPrediction(
+            predictions=predictions,
+            latency_ms=int((time.perf_counter() - start) * 1000),
+            chunks=len(starts),
+            errors=errors,
+        )
+
+    def close(self) -> None:
+        self._session.close()
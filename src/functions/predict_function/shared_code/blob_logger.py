@@ -1,7 +1,12 @@
 from __future__ import annotations
 
+import atexit
 import json
+import logging
 import os
+import queue
+import threading
+import time
 import uuid
 from contextlib import suppress
 from dataclasses import dataclass
@@ -11,17 +16,20 @@ from typing import Any
 
 from azure.storage.blob import BlobServiceClient
 
+LOG = logging.getLogger("function.blob_logger")
+
 
 @dataclass(frozen=True)
 class LogResult:
     destination: str
 
 
-class PredictionLogger:
-    """Write one JSON document per request.
+class BlobStore:
+    """Blob container, or a local folder standing in for it.
 
-    If AZURE_STORAGE_CONNECTION_STRING is not set, falls back to writing local files
-    under ./local_blob_logs/ so the project still runs without Azurite.
+    If AZURE_STORAGE_CONNECTION_STRING is not set, blobs are written as local files under
+    LOCAL_BLOB_LOG_DIR (default ./local_blob_logs/) so the project still runs without Azurite.
+    Blob names keep their "/" as "_" locally.
     """
 
     def __init__(self, connection_string: str | None, container: str) -> None:
@@ -31,22 +39,177 @@ class PredictionLogger:
             if connection_string
             else None
         )
+        # The container only has to be created once per process, not checked on every write.
+        self._container_ready = False
+        self._appendable: set[str] = set()
+        self._lock = threading.Lock()
+
+    def _ensure_container(self) -> None:
+        if self._container_ready or self._service is None:
+            return
+        with self._lock:
+            if not self._container_ready:
+                # Already exists, or no permission to create it: either way the uploads
+                # will tell, so do not retry this on every write.
+                with suppress(Exception):
+                    self._service.get_container_client(self._container).create_container()
+                self._container_ready = True
+
+    def _local_path(self, blob_name: str) -> Path:
+        base = Path(os.getenv("LOCAL_BLOB_LOG_DIR", "local_blob_logs")) / self._container
+        base.mkdir(parents=True, exist_ok=True)
+        return base / blob_name.replace("/", "_")
+
+    def upload(self, blob_name: str, data: bytes) -> str:
+        """Write data as a (block) blob, replacing any existing one. Returns where it went."""
+        if self._service is None:
+            path = self._local_path(blob_name)
+            path.write_bytes(data)
+            return str(path)
+        self._ensure_container()
+        blob_client = self._service.get_blob_client(container=self._container, blob=blob_name)
+        blob_client.upload_blob(data, overwrite=True)
+        return f"{self._container}/{blob_name}"
+
+    def append(self, blob_name: str, data: bytes) -> str:
+        """Append data to an append blob, creating it on first use. Returns where it went."""
+        if self._service is None:
+            path = self._local_path(blob_name)
+            with path.open("ab") as f:
+                f.write(data)
+            return str(path)
+        self._ensure_container()
+        blob_client = self._service.get_blob_client(container=self._container, blob=blob_name)
+        if blob_name not in self._appendable:
+            # Restarted writers may reuse a name that already exists: keep its contents.
+            if not blob_client.exists():
+                blob_client.create_append_blob()
+            self._appendable.add(blob_name)
+        blob_client.append_block(data)
+        return f"{self._container}/{blob_name}"
+
+    def close(self) -> None:
+        if self._service is not None:
+            self._service.close()
+
+
+class PredictionLogger:
+    """Write one JSON document per request (see BlobStore for the local fallback)."""
+
+    def __init__(self, connection_string: str | None, container: str) -> None:
+        self._store = BlobStore(connection_string, container)
 
     def write(self, record: dict[str, Any]) -> LogResult:
         now = datetime.now(timezone.utc)
         blob_name = f"predictions/{now:%Y/%m/%d}/{now:%H%M%S}-{uuid.uuid4().hex}.json"
+        data = json.dumps(record, ensure_ascii=False).encode("utf-8")
+        return LogResult(destination=self._store.upload(blob_name, data))
 
-        if self._service is None:
-            base = Path(os.getenv("LOCAL_BLOB_LOG_DIR", "local_blob_logs")) / self._container
-            base.mkdir(parents=True, exist_ok=True)
-            path = base / blob_name.replace("/", "_")
-            path.write_text(json.dumps(record, ensure_ascii=False), encoding="utf-8")
-            return LogResult(destination=str(path))
+    def close(self) -> None:
+        self._store.close()
 
-        container_client = self._service.get_container_client(self._container)
-        with suppress(Exception):
-            container_client.create_container()
 
-        blob_client = self._service.get_blob_client(container=self._container, blob=blob_name)
-        blob_client.upload_blob(json.dumps(record).encode("utf-8"), overwrite=True)
-        return LogResult(destination=f"{self._container}/{blob_name}")
+class AsyncPredictionLogger:
+    """Hand records to a background thread so logging never delays the response.
+
+    write() puts the record on a bounded queue and returns at once. When the queue is full it
+    waits up to block_timeout_s for room (backpressure) and then drops the record, counting
+    it. The worker writes through the wrapped PredictionLogger, so the blob and the local
+    fallback paths behave the same. Pending records are flushed at interpreter exit.
+    """
+
+    def __init__(
+        self, logger: PredictionLogger, max_queue: int = 10_000, block_timeout_s: float = 0.0
+    ) -> None:
+        self._logger = logger
+        self._block_timeout_s = block_timeout_s
+        self._queue: queue.Queue[dict[str, Any] | None] = queue.Queue(maxsize=max_queue)
+        self._lock = threading.Lock()
+        self._thread: threading.Thread | None = None
+        self._closed = False
+        self._enqueued = 0
+        self._written = 0
+        self._dropped = 0
+        self._failed = 0
+        atexit.register(self.close)
+
+    def write(self, record: dict[str, Any]) -> LogResult:
+        if self._closed:  # replaced or shutting down: do not strand the record in the queue
+            return self._logger.write(record)
+        self._ensure_worker()
+        try:
+            if self._block_timeout_s > 0:
+                self._queue.put(record, timeout=self._block_timeout_s)
+            else:
+                self._queue.put_nowait(record)
+        except queue.Full:
+            with self._lock:
+                self._dropped += 1
+                dropped = self._dropped
+            if dropped == 1 or dropped % 1000 == 0:
+                LOG.warning("Prediction log queue full; %s records dropped so far", dropped)
+            return LogResult(destination="dropped")
+        with self._lock:
+            self._enqueued += 1
+        return LogResult(destination="queued")
+
+    def flush(self, timeout_s: float = 10.0) -> bool:
+        """Wait until every queued record has been written (or failed). False on timeout."""
+        deadline = time.monotonic() + timeout_s
+        while self._queue.unfinished_tasks:
+            if time.monotonic() >= deadline:
+                return False
+            time.sleep(0.005)
+        return True
+
+    def close(self, timeout_s: float = 10.0) -> None:
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            thread = self._thread
+        if thread is not None:
+            self.flush(timeout_s)
+            self._queue.put(None)
+            thread.join(timeout_s)
+        self._logger.close()
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {
+                "queue_depth": self._queue.qsize(),
+                "enqueued": self._enqueued,
+                "written": self._written,
+                "dropped": self._dropped,
+                "failed": self._failed,
+            }
+
+    def _ensure_worker(self) -> None:
+        if self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._loop, name="prediction-logger", daemon=True
+                )
+                self._thread.start()
+
+    def _loop(self) -> None:
+        while True:
+            record = self._queue.get()
+            if record is None:
+                self._queue.task_done()
+                return
+            try:
+                self._logger.write(record)
+                ok = True
+            except Exception:
+                LOG.exception("Writing a prediction log record failed")
+                ok = False
+            finally:
+                self._queue.task_done()
+            with self._lock:
+                if ok:
+                    self._written += 1
+                else:
+                    self._failed += 1
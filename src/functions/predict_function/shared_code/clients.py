@@ -0,0 +1,158 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import threading
+
+from .aml_async_client import AsyncAMLOnlineEndpointClient
+from .blob_logger import AsyncPredictionLogger, BlobStore, PredictionLogger
+from .latency_guard import LatencyGuard
+from .local_scorer import LocalScorer
+from .prediction_cache import FrontCache, MemoryTier, SqliteTier
+from .segment_logger import SegmentLogger
+from .settings import FunctionSettings
+
+LOG = logging.getLogger("function.clients")
+
+RecordLogger = PredictionLogger | AsyncPredictionLogger | SegmentLogger
+
+# One logger and endpoint client per worker process, reused across invocations so the HTTP
+# and blob connection pools stay warm. Rebuilt only if the settings change (e.g. a rotated key).
+_LOCK = threading.Lock()
+_LOGGER: tuple[FunctionSettings, RecordLogger] | None = None
+_ASYNC_CLIENT: tuple[FunctionSettings, AsyncAMLOnlineEndpointClient] | None = None
+_CACHE: tuple[tuple[int, float, str], FrontCache | None] | None = None
+# (model dir, scorer, load error): a failed load keeps its error for the responses.
+_LOCAL_SCORER: tuple[str, LocalScorer | None, str | None] | None = None
+
+
+def _build_logger(settings: FunctionSettings) -> RecordLogger:
+    if settings.log_format == "segments":
+        # Segment writes only touch an in-memory buffer, so there is nothing to make async.
+        return SegmentLogger(
+            BlobStore(settings.storage_connection_string, settings.log_container),
+            max_bytes=settings.log_segment_max_bytes,
+            max_age_s=settings.log_segment_max_age_s,
+            mode=settings.log_segment_mode,
+        )
+    logger = PredictionLogger(settings.storage_connection_string, settings.log_container)
+    if settings.log_mode == "async":
+        return AsyncPredictionLogger(logger, settings.log_queue_size, settings.log_block_ms / 1000)
+    return logger
+
+
+def _build_guard(settings: FunctionSettings) -> LatencyGuard | None:
+    if not settings.hedge and settings.breaker_slow_ms <= 0:
+        return None
+    return LatencyGuard(
+        window=settings.latency_window,
+        hedge_quantile=settings.hedge_quantile if settings.hedge else None,
+        hedge_max_ratio=settings.hedge_max_ratio,
+        slow_call_s=settings.breaker_slow_ms / 1000 if settings.breaker_slow_ms > 0 else None,
+        failure_ratio=settings.breaker_failure_ratio,
+        open_s=settings.breaker_open_s,
+    )
+
+
+def get_logger(settings: FunctionSettings) -> RecordLogger:
+    """Return the process-wide prediction logger, creating it lazily."""
+    global _LOGGER
+    cached = _LOGGER
+    if cached is not None and cached[0] == settings:
+        return cached[1]
+    with _LOCK:
+        if _LOGGER is None or _LOGGER[0] != settings:
+            logger = _build_logger(settings)
+            if _LOGGER is not None:
+                # Closing flushes what the old logger still holds, which can take seconds;
+                # callers are on the event loop, so it happens on its own thread.
+                threading.Thread(target=_LOGGER[1].close, name="prediction-logger-close").start()
+            _LOGGER = (settings, logger)
+        return _LOGGER[1]
+
+
+def get_async_client(settings: FunctionSettings) -> AsyncAMLOnlineEndpointClient:
+    """Process-wide asyncio endpoint client; call from inside the event loop."""
+    global _ASYNC_CLIENT
+    cached = _ASYNC_CLIENT
+    if cached is not None and cached[0] == settings:
+        return cached[1]
+    client = AsyncAMLOnlineEndpointClient(
+        settings.aml_scoring_uri,
+        settings.aml_endpoint_key,
+        timeout_s=settings.http_timeout_s,
+        pool_size=settings.async_pool_size,
+        retries=settings.http_retries,
+        backoff_s=settings.http_backoff_s,
+        guard=_build_guard(settings),
+    )
+    # Only the event loop thread gets here, so no lock is needed.
+    if cached is not None:
+        asyncio.get_running_loop().create_task(cached[1].close())
+    _ASYNC_CLIENT = (settings, client)
+    return client
+
+
+async def close_async_client() -> None:
+    """Close the process-wide endpoint client's session (at shutdown, or between loops)."""
+    global _ASYNC_CLIENT
+    cached, _ASYNC_CLIENT = _ASYNC_CLIENT, None
+    if cached is not None:
+        await cached[1].close()
+
+
+def get_cache(settings: FunctionSettings) -> FrontCache | None:
+    """Process-wide prediction cache, or None when PREDICT_CACHE_SIZE is 0."""
+    global _CACHE
+    config = (settings.cache_size, settings.cache_ttl_s, settings.cache_sqlite_path)
+    cached = _CACHE
+    if cached is not None and cached[0] == config:
+        return cached[1]
+    with _LOCK:
+        if _CACHE is None or _CACHE[0] != config:
+            cache = None
+            if settings.cache_size > 0:
+                shared = None
+                if settings.cache_sqlite_path:
+                    shared = SqliteTier(settings.cache_sqlite_path, settings.cache_ttl_s)
+                cache = FrontCache(MemoryTier(settings.cache_size, settings.cache_ttl_s), shared)
+            if _CACHE is not None and _CACHE[1] is not None:
+                _CACHE[1].close()
+            _CACHE = (config, cache)
+        return _CACHE[1]
+
+
+def get_local_scorer(settings: FunctionSettings) -> LocalScorer | None:
+    """In-process scorer for SCORING_MODE=local, loaded once per worker process.
+
+    Returns None if the model failed to load; that is logged once and not retried, so the
+    worker keeps serving through the endpoint instead of reloading on every request.
+    local_scorer_error() says why.
+    """
+    return _load_local_scorer(settings)[1]
+
+
+def local_scorer_error(settings: FunctionSettings) -> str | None:
+    """Why the SCORING_MODE=local model failed to load in this worker, or None."""
+    return _load_local_scorer(settings)[2]
+
+
+def _load_local_scorer(
+    settings: FunctionSettings,
+) -> tuple[str, LocalScorer | None, str | None]:
+    global _LOCAL_SCORER
+    cached = _LOCAL_SCORER
+    if cached is not None and cached[0] == settings.local_model_dir:
+        return cached
+    with _LOCK:
+        if _LOCAL_SCORER is None or _LOCAL_SCORER[0] != settings.local_model_dir:
+            scorer, error = None, None
+            try:
+                scorer = LocalScorer(settings.local_model_dir)
+            except Exception as exc:
+                LOG.exception(
+                    "Loading %s failed; scoring via the endpoint", settings.local_model_dir
+                )
+                error = f"{type(exc).__name__}: {exc}"
+            _LOCAL_SCORER = (settings.local_model_dir, scorer, error)
+        return _LOCAL_SCORER
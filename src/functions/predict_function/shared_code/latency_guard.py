@@ -0,0 +1,134 @@
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from collections import deque
+
+LOG = logging.getLogger("function.latency_guard")
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised instead of calling the endpoint while the circuit breaker is open."""
+
+
+class LatencyGuard:
+    """Rolling window of endpoint call outcomes that drives hedging and a circuit breaker.
+
+    The window keeps the latency and success of the last `window` calls. The Function builds
+    one from the AML_HEDGE* / AML_BREAKER* settings for AsyncAMLOnlineEndpointClient.
+
+    Hedging (hedge_quantile set): once min_samples successful calls are in the window,
+    hedge_delay() is their hedge_quantile latency (e.g. p95). A call still unanswered after
+    that long gets a duplicate request. To bound the extra load, no new hedge is fired while
+    hedges make up more than hedge_max_ratio of all calls.
+
+    Circuit breaker (slow_call_s set): a call is bad if it failed or took longer than
+    slow_call_s. When at least min_samples calls are in the window and failure_ratio of them
+    are bad, the breaker opens and check() raises CircuitOpenError for open_s seconds. Then
+    a single probe call is let through: if it is good the breaker closes with an empty
+    window, otherwise it opens again.
+    """
+
+    def __init__(
+        self,
+        window: int = 200,
+        min_samples: int = 20,
+        hedge_quantile: float | None = None,
+        hedge_max_ratio: float = 0.1,
+        slow_call_s: float | None = None,
+        failure_ratio: float = 0.5,
+        open_s: float = 30.0,
+    ) -> None:
+        self._lock = threading.Lock()
+        self._calls: deque[tuple[float, bool]] = deque(maxlen=window)
+        self._min_samples = min_samples
+        self._hedge_quantile = hedge_quantile
+        self._hedge_max_ratio = hedge_max_ratio
+        self._slow_call_s = slow_call_s
+        self._failure_ratio = failure_ratio
+        self._open_s = open_s
+
+        self._state = "closed"
+        self._open_until = 0.0
+        self._probe_in_flight = False
+
+        self._total_calls = 0
+        self._hedges_fired = 0
+        self._hedges_won = 0
+        self._rejected = 0
+        self._opened = 0
+
+    def check(self) -> None:
+        """Raise CircuitOpenError if the breaker does not let a call through right now."""
+        if self._slow_call_s is None:
+            return
+        with self._lock:
+            if self._state == "closed":
+                return
+            if self._state == "open" and time.monotonic() >= self._open_until:
+                self._state = "half_open"
+            if self._state == "half_open" and not self._probe_in_flight:
+                self._probe_in_flight = True
+                return
+            self._rejected += 1
+        raise CircuitOpenError("AML endpoint circuit breaker is open")
+
+    def record(self, latency_s: float, ok: bool) -> None:
+        with self._lock:
+            self._total_calls += 1
+            self._calls.append((latency_s, ok))
+            if self._slow_call_s is None:
+                return
+            good = ok and latency_s <= self._slow_call_s
+            if self._state == "half_open" and self._probe_in_flight:
+                self._probe_in_flight = False
+                if good:
+                    self._state = "closed"
+                    self._calls.clear()
+                    LOG.warning("AML endpoint circuit breaker closed")
+                else:
+                    self._trip()
+            elif self._state == "closed" and len(self._calls) >= self._min_samples:
+                bad = sum(1 for lat, k in self._calls if not k or lat > self._slow_call_s)
+                if bad >= self._failure_ratio * len(self._calls):
+                    self._trip()
+
+    def _trip(self) -> None:
+        # Caller holds self._lock.
+        self._state = "open"
+        self._open_until = time.monotonic() + self._open_s
+        self._opened += 1
+        LOG.warning("AML endpoint circuit breaker opened for %.0f s", self._open_s)
+
+    def hedge_delay(self) -> float | None:
+        """Seconds to wait before hedging a call, or None if it should not be hedged."""
+        if self._hedge_quantile is None:
+            return None
+        with self._lock:
+            if self._hedges_fired > self._hedge_max_ratio * max(self._total_calls, 1):
+                return None
+            latencies = sorted(lat for lat, ok in self._calls if ok)
+        if len(latencies) < self._min_samples:
+            return None
+        return latencies[min(len(latencies) - 1, int(self._hedge_quantile * len(latencies)))]
+
+    def hedge_fired(self) -> None:
+        with self._lock:
+            self._hedges_fired += 1
+
+    def hedge_won(self) -> None:
+        with self._lock:
+            self._hedges_won += 1
+
+    def stats(self) -> dict[str, float | str]:
+        with self._lock:
+            return {
+                "state": self._state,
+                "calls": self._total_calls,
+                "window": len(self._calls),
+                "hedges_fired": self._hedges_fired,
+                "hedges_won": self._hedges_won,
+                "rejected": self._rejected,
+                "opened": self._opened,
+            }
@@ -0,0 +1,45 @@
+from __future__ import annotations
+
+import hashlib
+import logging
+import time
+from pathlib import Path
+from typing import Any
+
+from .aml_client import AMLPrediction
+
+LOG = logging.getLogger("function.local_scorer")
+
+
+def model_version(model_dir: Path | str) -> str:
+    """Fingerprint of the MLflow model folder; matches the local server's X-Model-Version."""
+    mlmodel = Path(model_dir) / "MLmodel"
+    data = mlmodel.read_bytes() if mlmodel.exists() else str(model_dir).encode("utf-8")
+    return hashlib.sha256(data).hexdigest()[:12]
+
+
+class LocalScorer:
+    """Score in the Function worker with the sklearn Pipeline saved by train.py.
+
+    The MLflow model folder is loaded once, through its sklearn flavor, and the Pipeline is
+    called directly on the texts. Results come back as AMLPrediction, the same shape as the
+    remote clients, with latency_ms measuring the in-process predict call.
+    """
+
+    def __init__(self, model_dir: Path | str) -> None:
+        start = time.perf_counter()
+        import mlflow.sklearn  # only SCORING_MODE=local pays for this import
+
+        self.model: Any = mlflow.sklearn.load_model(str(model_dir))
+        self.version = model_version(model_dir)
+        self.load_ms = int((time.perf_counter() - start) * 1000)
+        LOG.info("Loaded model %s from %s in %s ms", self.version, model_dir, self.load_ms)
+
+    def predict_texts(self, texts: list[str]) -> AMLPrediction:
+        start = time.perf_counter()
+        preds = [int(x) for x in self.model.predict(texts)]
+        latency_ms = int((time.perf_counter() - start) * 1000)
+        return AMLPrediction(preds, latency_ms, self.version)
+
+    def predict(self, text: str) -> AMLPrediction:
+        return self.predict_texts([text])
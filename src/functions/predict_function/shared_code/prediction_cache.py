@@ -0,0 +1,174 @@
+from __future__ import annotations
+
+import hashlib
+import logging
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+
+LOG = logging.getLogger("function.prediction_cache")
+
+
+def normalize_text(text: str) -> str:
+    # Same rule as the scoring-side cache: whitespace never changes the word tokens the
+    # vectorizer sees, so re-spaced copies of a message share an entry.
+    return " ".join(text.split())
+
+
+def cache_key(text: str, model_version: str) -> str:
+    h = hashlib.blake2b(model_version.encode("utf-8"), digest_size=16)
+    h.update(b"\0")
+    h.update(normalize_text(text).encode("utf-8"))
+    return h.hexdigest()
+
+
+@dataclass(frozen=True)
+class CacheHit:
+    prediction: int
+    tier: str  # "memory" or "shared"
+
+
+class MemoryTier:
+    """Thread-safe LRU of key -> prediction whose entries expire ttl_s after being written."""
+
+    def __init__(self, max_entries: int, ttl_s: float) -> None:
+        if max_entries < 1:
+            raise ValueError("max_entries must be >= 1")
+        self._max_entries = max_entries
+        self._ttl_s = ttl_s
+        self._lock = threading.Lock()
+        self._data: OrderedDict[str, tuple[int, float]] = OrderedDict()
+
+    def get(self, key: str) -> int | None:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            if entry[1] < time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return entry[0]
+
+    def put(self, key: str, prediction: int, ttl_s: float | None = None) -> None:
+        expires_at = time.monotonic() + (self._ttl_s if ttl_s is None else ttl_s)
+        with self._lock:
+            self._data[key] = (prediction, expires_at)
+            self._data.move_to_end(key)
+            while len(self._data) > self._max_entries:
+                self._data.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class SqliteTier:
+    """Cache tier in a SQLite file, shared by every worker process on the instance.
+
+    A stand-in for Redis: it lets a warm entry written by one worker serve the others.
+    Expiry is stored as wall-clock time so every process agrees on it; expired rows are
+    skipped on read and deleted every prune_every writes.
+    """
+
+    def __init__(self, path: str, ttl_s: float, prune_every: int = 1000) -> None:
+        self._ttl_s = ttl_s
+        self._prune_every = prune_every
+        self._writes = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=1.0, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS predictions ("
+                "key TEXT PRIMARY KEY, prediction INTEGER NOT NULL, expires_at REAL NOT NULL)"
+            )
+
+    def get(self, key: str) -> tuple[int, float] | None:
+        """Return (prediction, seconds left to live), or None when absent or expired."""
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT prediction, expires_at FROM predictions WHERE key = ? AND expires_at > ?",
+                (key, now),
+            ).fetchone()
+        return None if row is None else (int(row[0]), float(row[1]) - now)
+
+    def put(self, key: str, prediction: int) -> None:
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO predictions VALUES (?, ?, ?)",
+                (key, prediction, now + self._ttl_s),
+            )
+            self._writes += 1
+            if self._writes % self._prune_every == 0:
+                self._conn.execute("DELETE FROM predictions WHERE expires_at <= ?", (now,))
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+class FrontCache:
+    """Prediction cache in front of the endpoint: a memory tier, then an optional shared tier.
+
+    Keys are a digest of the normalized text and the model version: AML_MODEL_VERSION, or
+    the model fingerprint the endpoint returns (never the deployment name, which survives a
+    model rollout), so a new model never serves predictions cached from the old one. A shared-tier hit is
+    copied into memory for what is left of its TTL. Errors from the shared tier are logged
+    and treated as misses: the cache must never fail a prediction.
+    """
+
+    def __init__(self, memory: MemoryTier, shared: SqliteTier | None = None) -> None:
+        self.memory = memory
+        self.shared = shared
+        self._lock = threading.Lock()
+        self._hits = {"memory": 0, "shared": 0}
+        self._misses = 0
+
+    def get(self, text: str, model_version: str) -> CacheHit | None:
+        key = cache_key(text, model_version)
+        hit: CacheHit | None = None
+        prediction = self.memory.get(key)
+        if prediction is not None:
+            hit = CacheHit(prediction, "memory")
+        elif self.shared is not None:
+            try:
+                found = self.shared.get(key)
+            except sqlite3.Error:
+                LOG.exception("Shared prediction cache lookup failed")
+                found = None
+            if found is not None:
+                self.memory.put(key, found[0], ttl_s=found[1])
+                hit = CacheHit(found[0], "shared")
+        with self._lock:
+            if hit is None:
+                self._misses += 1
+            else:
+                self._hits[hit.tier] += 1
+        return hit
+
+    def put(self, text: str, model_version: str, prediction: int) -> None:
+        key = cache_key(text, model_version)
+        self.memory.put(key, prediction)
+        if self.shared is not None:
+            try:
+                self.shared.put(key, prediction)
+            except sqlite3.Error:
+                LOG.exception("Shared prediction cache write failed")
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {
+                "entries": len(self.memory),
+                "memory_hits": self._hits["memory"],
+                "shared_hits": self._hits["shared"],
+                "misses": self._misses,
+            }
+
+    def close(self) -> None:
+        if self.shared is not None:
+            self.shared.close()
@@ -0,0 +1,199 @@
+from __future__ import annotations
+
+import atexit
+import gzip
+import json
+import logging
+import os
+import re
+import socket
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Any
+
+from .blob_logger import BlobStore, LogResult
+
+LOG = logging.getLogger("function.segment_logger")
+
+SEGMENT_MODES = ("block", "append")
+
+
+def default_writer_id() -> str:
+    """Stable per-process name: the Functions instance (or host) plus the pid."""
+    instance = os.getenv("WEBSITE_INSTANCE_ID", "")[:12] or socket.gethostname()
+    return re.sub(r"[^A-Za-z0-9_.-]", "-", f"{instance}-{os.getpid()}")
+
+
+class SegmentLogger:
+    """Buffer prediction records and write them as gzip-compressed JSONL segments.
+
+    A segment is flushed once it holds max_bytes of (uncompressed) JSONL or its oldest
+    record is max_age_s old, and on close(), which also runs at interpreter exit. write()
+    only appends to the in-memory buffer; compression and upload happen on a background
+    thread.
+
+    Segment names are deterministic: they are built from the time of the segment's first
+    record, the writer id and a per-writer sequence number, so they sort chronologically and
+    never collide between instances:
+
+    - mode="block": one blob per segment,
+      predictions/YYYY/MM/DD/HH/<YYYYmmddTHHMMSSZ>-<writer>-<seq>.jsonl.gz
+    - mode="append": one append blob per writer and hour,
+      predictions/YYYY/MM/DD/HH/<writer>.jsonl.gz, and each flush appends one gzip member
+      (a multi-member gzip file is still a valid .gz that gzip/pandas read in full).
+
+    A segment whose upload fails is retried on the next flush; at most max_pending of them
+    are kept, older ones are dropped and counted.
+    """
+
+    def __init__(
+        self,
+        store: BlobStore,
+        max_bytes: int = 4 * 1024 * 1024,
+        max_age_s: float = 60.0,
+        mode: str = "block",
+        writer_id: str | None = None,
+        max_pending: int = 8,
+    ) -> None:
+        if mode not in SEGMENT_MODES:
+            raise ValueError(f"mode must be one of {SEGMENT_MODES}, got {mode!r}")
+        self._store = store
+        self._max_bytes = max_bytes
+        self._max_age_s = max_age_s
+        self._mode = mode
+        self._writer_id = writer_id or default_writer_id()
+        self._max_pending = max_pending
+
+        self._cond = threading.Condition()
+        self._flush_lock = threading.Lock()
+        self._lines: list[bytes] = []
+        self._size = 0
+        self._opened_at = 0.0  # monotonic time of the first buffered record
+        self._name = ""
+        self._seq = 0
+        self._sealed: list[tuple[str, list[bytes]]] = []  # full segments awaiting upload
+        self._pending: list[tuple[str, bytes, int]] = []  # (name, gzip data, records)
+        self._thread: threading.Thread | None = None
+        self._closed = False
+
+        self._segments = 0
+        self._records = 0
+        self._failed = 0
+        self._dropped_records = 0
+        atexit.register(self.close)
+
+    def segment_name(self, first_record_at: datetime, seq: int) -> str:
+        prefix = f"predictions/{first_record_at:%Y/%m/%d/%H}"
+        if self._mode == "append":
+            return f"{prefix}/{self._writer_id}.jsonl.gz"
+        return f"{prefix}/{first_record_at:%Y%m%dT%H%M%SZ}-{self._writer_id}-{seq:06d}.jsonl.gz"
+
+    def write(self, record: dict[str, Any]) -> LogResult:
+        line = json.dumps(record, ensure_ascii=False).encode("utf-8") + b"\n"
+        with self._cond:
+            if not self._lines:
+                self._opened_at = time.monotonic()
+                self._name = self.segment_name(datetime.now(timezone.utc), self._seq)
+                self._seq += 1
+                self._cond.notify()  # the flusher may be idle: start its age timer
+            self._lines.append(line)
+            self._size += len(line)
+            name = self._name
+            if self._size >= self._max_bytes:
+                self._seal()
+                self._cond.notify()
+            closed = self._closed
+        if closed:  # nobody is left to flush on a timer
+            self.flush()
+        else:
+            self._ensure_flusher()
+        return LogResult(destination=name)
+
+    def _seal(self) -> None:
+        # Caller holds self._cond.
+        if self._lines:
+            self._sealed.append((self._name, self._lines))
+            self._lines, self._size = [], 0
+
+    def flush(self) -> None:
+        """Upload the current segment (and any failed ones) now."""
+        with self._cond:
+            self._seal()
+            sealed, self._sealed = self._sealed, []
+        with self._flush_lock:
+            for name, lines in sealed:
+                # mtime=0 keeps the bytes reproducible for the same records.
+                data = gzip.compress(b"".join(lines), mtime=0)
+                self._pending.append((name, data, len(lines)))
+            while self._pending:
+                seg_name, seg_data, seg_records = self._pending[0]
+                try:
+                    if self._mode == "append":
+                        self._store.append(seg_name, seg_data)
+                    else:
+                        self._store.upload(seg_name, seg_data)
+                except Exception:
+                    LOG.exception("Uploading log segment %s failed; will retry", seg_name)
+                    self._failed += 1
+                    break
+                self._pending.pop(0)
+                self._segments += 1
+                self._records += seg_records
+            while len(self._pending) > self._max_pending:
+                lost_name, _, lost_records = self._pending.pop(0)
+                self._dropped_records += lost_records
+                LOG.error("Dropped log segment %s (%s records)", lost_name, lost_records)
+
+    def close(self) -> None:
+        with self._cond:
+            if self._closed:
+                return
+            self._closed = True
+            self._cond.notify()
+            thread = self._thread
+        if thread is not None:
+            thread.join(timeout=30)
+        self.flush()
+        self._store.close()
+
+    def stats(self) -> dict[str, int]:
+        with self._cond:
+            buffered = len(self._lines) + sum(len(lines) for _, lines in self._sealed)
+        with self._flush_lock:
+            return {
+                "buffered_records": buffered,
+                "records_flushed": self._records,
+                "segments_written": self._segments,
+                "segments_pending": len(self._pending),
+                "upload_failures": self._failed,
+                "dropped_records": self._dropped_records,
+            }
+
+    def _ensure_flusher(self) -> None:
+        if self._thread is not None:
+            return
+        with self._cond:
+            if self._thread is None and not self._closed:
+                self._thread = threading.Thread(
+                    target=self._flush_loop, name="segment-logger", daemon=True
+                )
+                self._thread.start()
+
+    def _flush_loop(self) -> None:
+        while True:
+            with self._cond:
+                while not self._closed and not self._sealed:
+                    if self._lines:
+                        age = time.monotonic() - self._opened_at
+                        if age >= self._max_age_s:
+                            break
+                        self._cond.wait(self._max_age_s - age)
+                    else:
+                        # Failed segments are retried at the age interval even when idle.
+                        self._cond.wait(self._max_age_s if self._pending else None)
+                        if self._pending and not self._lines:
+                            break
+                if self._closed:
+                    return
+            self.flush()
@@ -10,14 +10,50 @@ class FunctionSettings:
     aml_endpoint_key: str
     storage_connection_string: str | None
     log_container: str
+    http_timeout_s: float = 10.0
+    http_pool_size: int = 10
+    http_retries: int = 2
+    http_backoff_s: float = 0.2
+    async_pool_size: int = 100
+    log_mode: str = "sync"
+    log_queue_size: int = 10_000
+    log_block_ms: float = 0.0
+    log_format: str = "json"
+    log_segment_max_bytes: int = 4 * 1024 * 1024
+    log_segment_max_age_s: float = 60.0
+    log_segment_mode: str = "block"
+    batch_chunk_size: int = 32
+    batch_max_concurrency: int = 4
+    batch_max_texts: int = 10_000
+    cache_size: int = 0
+    cache_ttl_s: float = 300.0
+    cache_sqlite_path: str = ""
+    model_version: str = ""
+    hedge: bool = False
+    hedge_quantile: float = 0.95
+    hedge_max_ratio: float = 0.1
+    breaker_slow_ms: float = 0.0
+    breaker_failure_ratio: float = 0.5
+    breaker_open_s: float = 30.0
+    latency_window: int = 200
+    scoring_mode: str = "remote"
+    local_model_dir: str = ""
 
     @staticmethod
     def from_env() -> FunctionSettings:
         scoring_uri = os.getenv("AML_SCORING_URI", "")
         key = os.getenv("AML_ENDPOINT_KEY", "")
-        if not scoring_uri:
+        scoring_mode = os.getenv("SCORING_MODE", "remote")
+        local_model_dir = os.getenv("LOCAL_MODEL_DIR", "")
+        if scoring_mode not in ("remote", "local"):
+            raise RuntimeError(f"SCORING_MODE must be 'remote' or 'local', got {scoring_mode!r}")
+        if scoring_mode == "local":
+            # The endpoint is only the fallback here, so it may be left unset.
+            if not local_model_dir:
+                raise RuntimeError("Missing LOCAL_MODEL_DIR")
+        elif not scoring_uri:
             raise RuntimeError("Missing AML_SCORING_URI")
-        if not key:
+        elif not key:
             raise RuntimeError("Missing AML_ENDPOINT_KEY")
 
         return FunctionSettings(
@@ -25,4 +61,34 @@ class FunctionSettings:
             aml_endpoint_key=key,
             storage_connection_string=os.getenv("AZURE_STORAGE_CONNECTION_STRING"),
             log_container=os.getenv("BLOB_LOG_CONTAINER", "logs"),
+            http_timeout_s=float(os.getenv("AML_HTTP_TIMEOUT_S", "10")),
+            http_pool_size=int(os.getenv("AML_HTTP_POOL_SIZE", "10")),
+            http_retries=int(os.getenv("AML_HTTP_RETRIES", "2")),
+            http_backoff_s=float(os.getenv("AML_HTTP_BACKOFF_S", "0.2")),
+            async_pool_size=int(os.getenv("AML_ASYNC_POOL_SIZE", "100")),
+            log_mode=os.getenv("BLOB_LOG_MODE", "sync"),
+            log_queue_size=int(os.getenv("BLOB_LOG_QUEUE_SIZE", "10000")),
+            log_block_ms=float(os.getenv("BLOB_LOG_BLOCK_MS", "0")),
+            log_format=os.getenv("BLOB_LOG_FORMAT", "json"),
+            log_segment_max_bytes=int(
+                os.getenv("BLOB_LOG_SEGMENT_MAX_BYTES", str(4 * 1024 * 1024))
+            ),
+            log_segment_max_age_s=float(os.getenv("BLOB_LOG_SEGMENT_MAX_AGE_S", "60")),
+            log_segment_mode=os.getenv("BLOB_LOG_SEGMENT_MODE", "block"),
+            batch_chunk_size=int(os.getenv("AML_BATCH_CHUNK_SIZE", "32")),
+            batch_max_concurrency=int(os.getenv("AML_BATCH_MAX_CONCURRENCY", "4")),
+            batch_max_texts=int(os.getenv("AML_BATCH_MAX_TEXTS", "10000")),
+            cache_size=int(os.getenv("PREDICT_CACHE_SIZE", "0")),
+            cache_ttl_s=float(os.getenv("PREDICT_CACHE_TTL_S", "300")),
+            cache_sqlite_path=os.getenv("PREDICT_CACHE_SQLITE_PATH", ""),
+            model_version=os.getenv("AML_MODEL_VERSION", ""),
+            hedge=os.getenv("AML_HEDGE", "0") == "1",
+            hedge_quantile=float(os.getenv("AML_HEDGE_QUANTILE", "0.95")),
+            hedge_max_ratio=float(os.getenv("AML_HEDGE_MAX_RATIO", "0.1")),
+            breaker_slow_ms=float(os.getenv("AML_BREAKER_SLOW_MS", "0")),
+            breaker_failure_ratio=float(os.getenv("AML_BREAKER_FAILURE_RATIO", "0.5")),
+            breaker_open_s=float(os.getenv("AML_BREAKER_OPEN_S", "30")),
+            latency_window=int(os.getenv("AML_LATENCY_WINDOW", "200")),
+            scoring_mode=scoring_mode,
+            local_model_dir=local_model_dir,
         )
@@ -0,0 +1,232 @@
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import os
+import time
+from collections import deque
+from collections.abc import Iterator
+from concurrent.futures import Future, ProcessPoolExecutor
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import IO, Any
+
+from .predictor import Predictor, load_predictor
+
+LOG = logging.getLogger("batch_score")
+
+_WORKER_MODEL: Predictor | None = None
+
+
+@dataclass
+class Checkpoint:
+    """Progress marker written next to the output after every chunk.
+
+    rows_done input rows have predictions in the first output_bytes bytes of the output, so
+    a resumed run truncates the output there and skips that many input rows.
+    """
+
+    input: str
+    rows_done: int = 0
+    output_bytes: int = 0
+    complete: bool = False
+
+    @staticmethod
+    def path_for(output: Path) -> Path:
+        return output.with_name(output.name + ".ckpt")
+
+    def save(self, output: Path) -> None:
+        path = self.path_for(output)
+        tmp = path.with_name(path.name + ".tmp")
+        tmp.write_text(json.dumps(asdict(self)), encoding="utf-8")
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, output: Path) -> Checkpoint | None:
+        path = cls.path_for(output)
+        if not path.exists():
+            return None
+        return cls(**json.loads(path.read_text(encoding="utf-8")))
+
+
+def _detect_format(path: Path) -> str:
+    suffix = path.suffix.lower()
+    if suffix == ".csv":
+        return "csv"
+    if suffix in (".jsonl", ".ndjson"):
+        return "jsonl"
+    if suffix in (".parquet", ".pq"):
+        return "parquet"
+    raise ValueError(f"Unsupported file type: {path.name} (expected .csv, .jsonl or .parquet)")
+
+
+def iter_chunks(
+    path: Path, text_column: str, chunk_size: int, skip_rows: int = 0
+) -> Iterator[list[str]]:
+    """Yield the text column in chunks of chunk_size rows, skipping the first skip_rows."""
+    fmt = _detect_format(path)
+    raw: Iterator[Any]
+    if fmt == "parquet":
+        import pyarrow.parquet as pq
+
+        pf = pq.ParquetFile(path)
+        raw = (b.column(0).to_pylist() for b in pf.iter_batches(chunk_size, columns=[text_column]))
+    else:
+        import pandas as pd
+
+        reader: Any = (
+            pd.read_csv(path, usecols=[text_column], dtype=str, chunksize=chunk_size)
+            if fmt == "csv"
+            else pd.read_json(path, lines=True, dtype=False, chunksize=chunk_size)
+        )
+        raw = (chunk[text_column].fillna("").astype(str).tolist() for chunk in reader)
+
+    to_skip = skip_rows
+    for texts in raw:
+        if to_skip >= len(texts):
+            to_skip -= len(texts)
+            continue
+        texts = ["" if t is None else str(t) for t in texts[to_skip:]]
+        to_skip = 0
+        yield texts
+
+
+def _init_worker(model_dir: str, native: bool, compact: bool) -> None:
+    global _WORKER_MODEL
+    _WORKER_MODEL = load_predictor(model_dir, native=native, compact=compact)
+
+
+def _predict_chunk(texts: list[str]) -> list[int]:
+    if _WORKER_MODEL is None:
+        raise RuntimeError("Worker model not loaded")
+    return _WORKER_MODEL.predict(texts)
+
+
+def _write_chunk(out: IO[bytes], fmt: str, first_row: int, preds: list[int]) -> None:
+    if fmt == "csv":
+        lines = [f"{first_row + i},{p}\n" for i, p in enumerate(preds)]
+    else:
+        lines = [f'{{"row": {first_row + i}, "prediction": {p}}}\n' for i, p in enumerate(preds)]
+    out.write("".join(lines).encode("utf-8"))
+
+
+def score_file(
+    input_path: Path,
+    output_path: Path,
+    model_dir: Path,
+    text_column: str = "text",
+    chunk_size: int = 10_000,
+    workers: int = 0,
+    native: bool = True,
+    compact: bool = False,
+    resume: bool = False,
+) -> dict[str, float]:
+    """Score input_path into output_path (.csv or .jsonl of row, prediction) in input order.
+
+    Chunks are fanned out to a process pool whose workers each load the model once; results
+    are written as soon as every earlier chunk is done, followed by a checkpoint.
+    """
+    out_fmt = "csv" if output_path.suffix.lower() == ".csv" else "jsonl"
+    workers = workers or os.cpu_count() or 1
+
+    ckpt = Checkpoint.load(output_path) if resume else None
+    if ckpt is not None and ckpt.input != str(input_path):
+        raise ValueError(f"Checkpoint is for {ckpt.input}, not {input_path}")
+    if ckpt is not None and ckpt.complete:
+        LOG.info("Checkpoint says %s is already complete (%s rows)", output_path, ckpt.rows_done)
+        return {"rows": 0.0, "rows_total": float(ckpt.rows_done), "seconds": 0.0, "rows_per_s": 0.0}
+    if ckpt is None:
+        ckpt = Checkpoint(input=str(input_path))
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        output_path.write_bytes(b"row,prediction\n" if out_fmt == "csv" else b"")
+        ckpt.output_bytes = output_path.stat().st_size
+        ckpt.save(output_path)
+    else:
+        LOG.info("Resuming %s at row %s", input_path, ckpt.rows_done)
+
+    start = time.perf_counter()
+    rows_start = ckpt.rows_done
+    window: deque[tuple[int, Future[list[int]]]] = deque()
+    next_row = ckpt.rows_done
+
+    with (
+        open(output_path, "r+b") as out,
+        ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_init_worker,
+            initargs=(str(model_dir), native, compact),
+        ) as pool,
+    ):
+        out.truncate(ckpt.output_bytes)
+        out.seek(ckpt.output_bytes)
+
+        def drain_one() -> None:
+            first_row, fut = window.popleft()
+            preds = fut.result()
+            _write_chunk(out, out_fmt, first_row, preds)
+            out.flush()
+            ckpt.rows_done = first_row + len(preds)
+            ckpt.output_bytes = out.tell()
+            ckpt.save(output_path)
+            elapsed = time.perf_counter() - start
+            LOG.info(
+                "%s rows done (%.0f rows/s)",
+                ckpt.rows_done,
+                (ckpt.rows_done - rows_start) / elapsed if elapsed else 0.0,
+            )
+
+        for texts in iter_chunks(input_path, text_column, chunk_size, skip_rows=ckpt.rows_done):
+            window.append((next_row, pool.submit(_predict_chunk, texts)))
+            next_row += len(texts)
+            # Bound in-flight chunks so memory does not grow with the input size.
+            if len(window) >= workers * 2:
+                drain_one()
+        while window:
+            drain_one()
+
+    ckpt.complete = True
+    ckpt.save(output_path)
+    elapsed = time.perf_counter() - start
+    rows = ckpt.rows_done - rows_start
+    return {
+        "rows": float(rows),
+        "rows_total": float(ckpt.rows_done),
+        "seconds": elapsed,
+        "rows_per_s": rows / elapsed if elapsed else 0.0,
+    }
+
+
+def parse_args() -> argparse.Namespace:
+    p = argparse.ArgumentParser(description="Bulk-score a CSV/JSONL/Parquet file of messages.")
+    p.add_argument("--model-dir", type=Path, required=True, help="Path to the MLflow model folder")
+    p.add_argument("--input", type=Path, required=True, help=".csv, .jsonl or .parquet input")
+    p.add_argument("--output", type=Path, required=True, help=".csv or .jsonl output")
+    p.add_argument("--text-column", default="text")
+    p.add_argument("--chunk-size", type=int, default=10_000)
+    p.add_argument("--workers", type=int, default=0, help="Worker processes (0 = all cores)")
+    p.add_argument(
+        "--pyfunc",
+        action="store_true",
+        help="Score through mlflow.pyfunc instead of the native sklearn Pipeline",
+    )
+    p.add_argument("--compact", action="store_true", help="Use the numpy-only compact scorer")
+    p.add_argument("--resume", action="store_true", help="Continue from the output's checkpoint")
+    return p.parse_args()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level="INFO", format="%(asctime)s %(levelname)s %(name)s - %(message)s")
+    args = parse_args()
+    result = score_file(
+        args.input,
+        args.output,
+        args.model_dir,
+        text_column=args.text_column,
+        chunk_size=args.chunk_size,
+        workers=args.workers,
+        native=not args.pyfunc,
+        compact=args.compact,
+        resume=args.resume,
+    )
+    print(json.dumps(result, indent=2))
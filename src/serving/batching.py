@@ -0,0 +1,154 @@
+from __future__ import annotations
+
+import logging
+import os
+import queue
+import threading
+import time
+from collections.abc import Callable
+from concurrent.futures import Future
+from dataclasses import dataclass
+
+LOG = logging.getLogger("batching")
+
+
+@dataclass(frozen=True)
+class _Pending:
+    texts: list[str]
+    future: Future[list[int]]
+
+
+class MicroBatcher:
+    """Coalesce concurrent predict requests into one vectorized call.
+
+    Callers block in submit(); a single background thread drains the queue, waiting at most
+    `max_wait_ms` after the first request of a batch for more to arrive, and stops once
+    `max_batch_size` texts are collected. A request is never split: one that is larger than
+    `max_batch_size` is predicted on its own.
+    """
+
+    def __init__(
+        self,
+        predict_fn: Callable[[list[str]], list[int]],
+        max_batch_size: int = 32,
+        max_wait_ms: float = 5.0,
+    ) -> None:
+        if max_batch_size < 1:
+            raise ValueError("max_batch_size must be >= 1")
+        self._predict_fn = predict_fn
+        self._max_batch_size = max_batch_size
+        self._max_wait_s = max(0.0, max_wait_ms) / 1000.0
+
+        self._lock = threading.Lock()
+        self._queue: queue.Queue[_Pending] = queue.Queue()
+        self._carry: _Pending | None = None
+        self._thread: threading.Thread | None = None
+        self._pid = os.getpid()
+        self._closed = False
+
+        self._batches = 0
+        self._requests = 0
+        self._rows = 0
+        self._max_seen = 0
+        self._last_size = 0
+
+    def submit(self, texts: list[str]) -> list[int]:
+        if not texts:
+            return []
+        pending = _Pending(texts=texts, future=Future())
+        with self._lock:
+            closed = self._closed
+            if not closed:
+                # Only an open batcher starts a worker; close() could not stop one started later.
+                self._ensure_worker()
+                self._queue.put(pending)
+        if closed:
+            # A caller that picked up this batcher just before it was replaced still gets an
+            # answer, just unbatched.
+            return self._predict_fn(texts)
+        return pending.future.result()
+
+    def close(self) -> None:
+        """Stop the worker once the requests already queued have been answered."""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            if self._thread is not None:
+                self._queue.put(_Pending(texts=[], future=Future()))  # stop marker
+
+    def stats(self) -> dict[str, float]:
+        with self._lock:
+            return {
+                "queue_depth": float(self._queue.qsize() + (1 if self._carry else 0)),
+                "batches": float(self._batches),
+                "requests": float(self._requests),
+                "rows": float(self._rows),
+                "mean_batch_size": self._rows / self._batches if self._batches else 0.0,
+                "max_batch_size": float(self._max_seen),
+                "last_batch_size": float(self._last_size),
+            }
+
+    def _ensure_worker(self) -> None:
+        """Start the worker thread if this process has none; call with self._lock held."""
+        # After a pre-fork the child inherits our state but not the thread, so start fresh.
+        if self._pid != os.getpid():
+            self._pid = os.getpid()
+            self._queue = queue.Queue()
+            self._carry = None
+            self._thread = None
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._loop, name="micro-batcher", daemon=True)
+            self._thread.start()
+
+    def _collect(self) -> list[_Pending]:
+        first = self._carry if self._carry is not None else self._queue.get()
+        self._carry = None
+        if not first.texts:
+            return []
+        batch = [first]
+        size = len(first.texts)
+        deadline = time.perf_counter() + self._max_wait_s
+
+        while size < self._max_batch_size:
+            remaining = deadline - time.perf_counter()
+            try:
+                nxt = (
+                    self._queue.get(timeout=remaining)
+                    if remaining > 0
+                    else self._queue.get_nowait()
+                )
+            except queue.Empty:
+                break
+            if not nxt.texts or size + len(nxt.texts) > self._max_batch_size:
+                self._carry = nxt
+                break
+            batch.append(nxt)
+            size += len(nxt.texts)
+        return batch
+
+    def _loop(self) -> None:
+        while True:
+            batch = self._collect()
+            if not batch:
+                return
+            flat = [t for p in batch for t in p.texts]
+            try:
+                preds = self._predict_fn(flat)
+            except Exception as exc:
+                LOG.exception("Batched predict failed (%s rows)", len(flat))
+                for p in batch:
+                    p.future.set_exception(exc)
+                continue
+
+            with self._lock:
+                self._batches += 1
+                self._requests += len(batch)
+                self._rows += len(flat)
+                self._max_seen = max(self._max_seen, len(flat))
+                self._last_size = len(flat)
+
+            offset = 0
+            for p in batch:
+                p.future.set_result(preds[offset : offset + len(p.texts)])
+                offset += len(p.texts)
@@ -0,0 +1,56 @@
+from __future__ import annotations
+
+import argparse
+import json
+import statistics
+import time
+from pathlib import Path
+
+from .compact_scorer import COMPACT_SCORER_FILE, CompactScorer
+from .predictor import Predictor, PyfuncPredictor, SklearnPredictor
+
+_TEXTS = [
+    "WIN a free gift card now!!!",
+    "Are we still on for lunch tomorrow?",
+    "URGENT: Verify your account now http://tinyurl.com/winfast",
+    "Can you send me the slides from the meeting",
+]
+
+
+def bench(predictor: Predictor, iterations: int, batch_size: int) -> dict[str, float]:
+    """Time predictor.predict() per request; returns latency percentiles in microseconds."""
+    batch = [_TEXTS[i % len(_TEXTS)] for i in range(batch_size)]
+    for _ in range(min(50, iterations)):
+        predictor.predict(batch)
+
+    samples: list[float] = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        predictor.predict(batch)
+        samples.append((time.perf_counter() - start) * 1e6)
+    samples.sort()
+    return {
+        "mean_us": statistics.fmean(samples),
+        "p50_us": samples[len(samples) // 2],
+        "p99_us": samples[min(len(samples) - 1, int(len(samples) * 0.99))],
+    }
+
+
+def parse_args() -> argparse.Namespace:
+    p = argparse.ArgumentParser(description="Compare per-request predict latency across paths.")
+    p.add_argument("--model-dir", type=Path, required=True, help="Path to the MLflow model folder")
+    p.add_argument("--iterations", type=int, default=2000)
+    p.add_argument("--batch-size", type=int, default=1, help="Texts per request")
+    return p.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    paths: dict[str, Predictor] = {
+        "pyfunc": PyfuncPredictor(args.model_dir),
+        "sklearn": SklearnPredictor(args.model_dir),
+    }
+    if (args.model_dir / COMPACT_SCORER_FILE).exists():
+        paths["compact"] = CompactScorer.from_model_dir(args.model_dir)
+    results = {name: bench(p, args.iterations, args.batch_size) for name, p in paths.items()}
+    print(json.dumps(results, indent=2))
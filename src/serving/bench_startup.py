@@ -0,0 +1,87 @@
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+SERVING_DIR = Path(__file__).resolve().parent
+
+# Runs in a fresh interpreter with src/serving as the working directory, exactly as the Azure ML
+# runtime imports score.py.
+_CHILD = """
+import json, time
+t0 = time.perf_counter()
+import score
+t1 = time.perf_counter()
+score.init()
+t2 = time.perf_counter()
+score.run({"text": "WIN a free gift card now!!!"})
+t3 = time.perf_counter()
+print(json.dumps({
+    "import_score": (t1 - t0) * 1000,
+    **{"init." + k: v for k, v in score.STARTUP_PHASES_MS.items()},
+    "first_run": (t3 - t2) * 1000,
+    "import_to_first_prediction": (t3 - t0) * 1000,
+}))
+"""
+
+MODES: dict[str, dict[str, str]] = {
+    "pyfunc": {},
+    "native": {"SCORE_NATIVE_SKLEARN": "1"},
+    "native+pipeline_cache": {"SCORE_NATIVE_SKLEARN": "1", "SCORE_PIPELINE_CACHE": "1"},
+    "compact": {"SCORE_COMPACT": "1"},
+}
+
+
+def measure(model_dir: Path, env_overrides: dict[str, str], warmup_rounds: int) -> dict[str, float]:
+    env = {
+        **os.environ,
+        "AZUREML_MODEL_DIR": str(model_dir),
+        "SCORE_WARMUP_ROUNDS": str(warmup_rounds),
+        "LOG_LEVEL": "WARNING",
+        **env_overrides,
+    }
+    start = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, "-c", _CHILD],
+        cwd=SERVING_DIR,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    wall_ms = (time.perf_counter() - start) * 1000
+    result: dict[str, float] = json.loads(proc.stdout.strip().splitlines()[-1])
+    result["process_wall"] = wall_ms
+    return result
+
+
+def parse_args() -> argparse.Namespace:
+    p = argparse.ArgumentParser(description="Time-to-first-prediction breakdown for score.py.")
+    p.add_argument("--model-dir", type=Path, required=True, help="Path to the MLflow model folder")
+    p.add_argument("--warmup-rounds", type=int, default=1)
+    return p.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    model_dir = args.model_dir.resolve()
+    results: dict[str, dict[str, float]] = {}
+    for name, overrides in MODES.items():
+        with tempfile.TemporaryDirectory() as cache_dir:
+            overrides = {**overrides, "SCORE_PIPELINE_CACHE_DIR": cache_dir}
+            if "SCORE_PIPELINE_CACHE" in overrides:
+                measure(model_dir, overrides, args.warmup_rounds)  # populate the cache
+            else:
+                del overrides["SCORE_PIPELINE_CACHE_DIR"]
+            results[name] = measure(model_dir, overrides, args.warmup_rounds)
+
+    for name, phases in results.items():
+        print(f"== {name}")
+        for phase, ms in phases.items():
+            print(f"  {phase:<34} {ms:9.1f} ms")
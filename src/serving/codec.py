@@ -0,0 +1,37 @@
+from __future__ import annotations
+
+import json
+from collections.abc import Callable
+from dataclasses import dataclass
+from typing import Any
+
+
+@dataclass(frozen=True)
+class JsonCodec:
+    """bytes <-> object JSON codec; both sides work on bytes to skip str round-trips."""
+
+    name: str
+    loads: Callable[[bytes | str], Any]
+    dumps: Callable[[Any], bytes]
+
+
+def _std_dumps(obj: Any) -> bytes:
+    return json.dumps(obj, separators=(",", ":")).encode("utf-8")
+
+
+STDLIB = JsonCodec(name="json", loads=json.loads, dumps=_std_dumps)
+
+
+def get_codec(name: str = "auto") -> JsonCodec:
+    """Return the named codec; "auto" picks orjson when it is installed, else the stdlib."""
+    if name == "json":
+        return STDLIB
+    if name not in ("auto", "orjson"):
+        raise ValueError(f"Unknown JSON codec: {name!r} (expected auto, orjson or json)")
+    try:
+        import orjson
+    except ImportError:
+        if name == "orjson":
+            raise
+        return STDLIB
+    return JsonCodec(name="orjson", loads=orjson.loads, dumps=orjson.dumps)
@@ -0,0 +1,89 @@
+from __future__ import annotations
+
+import json
+import re
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+
+COMPACT_SCORER_FILE = "compact_scorer.npz"
+
+
+class CompactScorer:
+    """Pure-numpy re-implementation of the TfidfVectorizer + LogisticRegression pipeline.
+
+    Loads the arrays written by train.export_compact_scorer(): the vocabulary, per-term idf
+    and coefficient, the intercept and the analyzer settings. Prediction is a sparse dot
+    product per document; no sklearn, scipy, pandas or MLflow import is needed.
+    """
+
+    flavor = "compact"
+
+    def __init__(self, path: Path | str) -> None:
+        start = time.perf_counter()
+        with np.load(str(path), allow_pickle=False) as data:
+            terms = data["terms"]
+            self._idf = data["idf"].astype(np.float64)
+            self._coef = data["coef"].astype(np.float64)
+            self._intercept = float(data["intercept"])
+            self._classes = data["classes"]
+            config: dict[str, Any] = json.loads(str(data["config"]))
+
+        self._vocab = {str(t): i for i, t in enumerate(terms.tolist())}
+        self._lowercase = bool(config["lowercase"])
+        self._token_re = re.compile(config["token_pattern"])
+        self._stop_words = frozenset(config["stop_words"] or ())
+        self._min_n, self._max_n = (int(n) for n in config["ngram_range"])
+        self._sublinear_tf = bool(config["sublinear_tf"])
+        self._norm = config["norm"]
+        if self._norm not in ("l2", None):
+            raise ValueError(f"Unsupported norm for compact scoring: {self._norm!r}")
+        self.load_phases_ms = {"load": (time.perf_counter() - start) * 1000}
+
+    @classmethod
+    def from_model_dir(cls, model_dir: Path | str) -> CompactScorer:
+        return cls(Path(model_dir) / COMPACT_SCORER_FILE)
+
+    def _analyze(self, text: str) -> list[str]:
+        if self._lowercase:
+            text = text.lower()
+        tokens = [t for t in self._token_re.findall(text) if t not in self._stop_words]
+        if self._max_n == 1:
+            return tokens
+        grams = list(tokens) if self._min_n == 1 else []
+        for n in range(max(self._min_n, 2), min(self._max_n, len(tokens)) + 1):
+            grams.extend(" ".join(tokens[i : i + n]) for i in range(len(tokens) - n + 1))
+        return grams
+
+    def decision_function(self, texts: list[str]) -> np.ndarray:
+        vocab = self._vocab
+        doc_ids: list[int] = []
+        term_ids: list[int] = []
+        counts: list[int] = []
+        for d, text in enumerate(texts):
+            tf = Counter(i for i in map(vocab.get, self._analyze(text)) if i is not None)
+            doc_ids.extend([d] * len(tf))
+            term_ids.extend(tf.keys())
+            counts.extend(tf.values())
+
+        n = len(texts)
+        idx = np.asarray(term_ids, dtype=np.intp)
+        docs = np.asarray(doc_ids, dtype=np.intp)
+        tf_arr = np.asarray(counts, dtype=np.float64)
+        if self._sublinear_tf:
+            tf_arr = np.log(tf_arr) + 1.0
+        x = tf_arr * self._idf[idx]
+
+        # bincount returns an int array when no document has a known term; keep it float.
+        dot = np.bincount(docs, weights=x * self._coef[idx], minlength=n).astype(np.float64)
+        if self._norm == "l2":
+            norms = np.sqrt(np.bincount(docs, weights=x * x, minlength=n))
+            dot = np.divide(dot, norms, out=np.zeros_like(dot), where=norms > 0)
+        return dot + self._intercept
+
+    def predict(self, texts: list[str]) -> list[int]:
+        positive = (self.decision_function(texts) > 0).astype(np.intp)
+        return self._classes[positive].astype(np.int64).tolist()
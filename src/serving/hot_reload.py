@@ -0,0 +1,169 @@
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+from .batching import MicroBatcher
+from .prediction_cache import PredictionCache
+from .predictor import Predictor
+
+LOG = logging.getLogger("hot_reload")
+
+
+@dataclass(frozen=True)
+class ServingModel:
+    """Everything that has to change together when the model does.
+
+    Handlers read the current ServingModel once per request and use only that object, so a
+    request is answered entirely by one model version even if a reload lands mid-request.
+    """
+
+    model: Predictor
+    version: str
+    batcher: MicroBatcher | None = None
+    cache: PredictionCache | None = None
+    loaded_at: float = field(default_factory=time.time)
+
+    def predict(self, texts: list[str]) -> list[int]:
+        predict_fn = self.batcher.submit if self.batcher else self.model.predict
+        return self.cache.predict(texts, predict_fn) if self.cache else predict_fn(texts)
+
+    def close(self) -> None:
+        if self.batcher is not None:
+            self.batcher.close()
+
+
+def dir_signature(model_dir: Path) -> tuple[tuple[str, int, int], ...]:
+    """(path, size, mtime) of every file under model_dir; changes whenever a file does."""
+    entries = []
+    for path in sorted(model_dir.rglob("*")):
+        try:
+            st = path.stat()
+        except FileNotFoundError:  # removed while we were listing
+            continue
+        if path.is_file():
+            entries.append((str(path.relative_to(model_dir)), st.st_size, st.st_mtime_ns))
+    return tuple(entries)
+
+
+class ModelReloader:
+    """Load a new ServingModel in the background and publish it with one atomic swap.
+
+    `load` builds (and warms up) a ServingModel from model_dir; `publish` makes it current.
+    Reloads run on a background thread, one at a time: a request that arrives while one is
+    running schedules exactly one more. A failed load is logged and counted, and the
+    current model keeps serving. With poll_s > 0, watch() polls model_dir and reloads once
+    its files have stopped changing for one poll interval, so a half-copied model is never
+    picked up.
+    """
+
+    def __init__(
+        self,
+        model_dir: Path,
+        current: ServingModel,
+        load: Callable[[Path], ServingModel],
+        publish: Callable[[ServingModel], None],
+        poll_s: float = 0.0,
+    ) -> None:
+        self.model_dir = model_dir
+        self.current = current
+        self._load = load
+        self._publish = publish
+        self._poll_s = poll_s
+
+        self._lock = threading.Lock()
+        self._running = False
+        self._again = False
+        self._seen = dir_signature(model_dir) if poll_s > 0 else ()
+
+        self._reloads = 0
+        self._failures = 0
+        self._last_error: str | None = None
+        self._last_duration_ms = 0.0
+
+    def request(self) -> bool:
+        """Start a background reload. Returns False if one was already running (it is queued)."""
+        with self._lock:
+            if self._running:
+                self._again = True
+                return False
+            self._running = True
+        threading.Thread(target=self._run, name="model-reload", daemon=True).start()
+        return True
+
+    def watch(self) -> None:
+        """Start polling model_dir for changes (no-op when poll_s is 0)."""
+        if self._poll_s > 0:
+            threading.Thread(target=self._watch_loop, name="model-watch", daemon=True).start()
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "version": self.current.version,
+                "loaded_at": self.current.loaded_at,
+                "reloading": self._running,
+                "reloads": self._reloads,
+                "reload_failures": self._failures,
+                "last_reload_ms": self._last_duration_ms,
+                "last_error": self._last_error,
+            }
+
+    def _run(self) -> None:
+        while True:
+            self._reload_once()
+            with self._lock:
+                if not self._again:
+                    self._running = False
+                    return
+                self._again = False
+
+    def _reload_once(self) -> None:
+        start = time.perf_counter()
+        try:
+            new = self._load(self.model_dir)
+        except Exception as exc:
+            LOG.exception(
+                "Model reload from %s failed; still serving %s",
+                self.model_dir,
+                self.current.version,
+            )
+            with self._lock:
+                self._failures += 1
+                self._last_error = f"{type(exc).__name__}: {exc}"
+            return
+
+        old = self.current
+        self._publish(new)
+        self.current = new
+        old.close()
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        with self._lock:
+            self._reloads += 1
+            self._last_error = None
+            self._last_duration_ms = elapsed_ms
+        LOG.info("Swapped model %s -> %s (loaded in %.0f ms)", old.version, new.version, elapsed_ms)
+
+    def _watch_loop(self) -> None:
+        pending: tuple[tuple[str, int, int], ...] | None = None
+        while True:
+            time.sleep(self._poll_s)
+            try:
+                sig = dir_signature(self.model_dir)
+            except OSError:
+                LOG.warning("Could not scan %s", self.model_dir, exc_info=True)
+                continue
+            if sig == self._seen:
+                pending = None
+            elif sig == pending:
+                # Unchanged since the last poll: the copy has finished.
+                self._seen = sig
+                pending = None
+                LOG.info("Change detected in %s; reloading", self.model_dir)
+                self.request()
+            else:
+                pending = sig
@@ -0,0 +1,105 @@
+from __future__ import annotations
+
+import argparse
+import http.client
+import json
+import statistics
+import threading
+import time
+from dataclasses import dataclass, field
+from urllib.parse import urlsplit
+
+
+@dataclass
+class _Stats:
+    latencies_ms: list[float] = field(default_factory=list)
+    errors: int = 0
+    lock: threading.Lock = field(default_factory=threading.Lock)
+
+
+def _client_loop(
+    url: str, body: bytes, deadline: float, stats: _Stats, keep_alive: bool = False
+) -> None:
+    parts = urlsplit(url)
+    path = parts.path or "/"
+    headers = {"Content-Type": "application/json", "Content-Length": str(len(body))}
+    if not keep_alive:
+        headers["Connection"] = "close"
+    latencies: list[float] = []
+    errors = 0
+    conn: http.client.HTTPConnection | None = None
+    while time.perf_counter() < deadline:
+        # Without keep_alive every request opens a fresh connection, as a plain HTTP/1.0
+        # client would; with it each client thread reuses one connection until it fails.
+        if conn is None:
+            conn = http.client.HTTPConnection(parts.hostname or "127.0.0.1", parts.port or 80)
+        start = time.perf_counter()
+        try:
+            conn.request("POST", path, body=body, headers=headers)
+            resp = conn.getresponse()
+            resp.read()
+            if resp.status != 200:
+                errors += 1
+                continue
+            latencies.append((time.perf_counter() - start) * 1000)
+        except (OSError, http.client.HTTPException):
+            errors += 1
+            conn.close()
+            conn = None
+        finally:
+            if conn is not None and (not keep_alive or resp.will_close):
+                conn.close()
+                conn = None
+    if conn is not None:
+        conn.close()
+    with stats.lock:
+        stats.latencies_ms.extend(latencies)
+        stats.errors += errors
+
+
+def run_load(
+    url: str, concurrency: int, duration_s: float, text: str, keep_alive: bool = False
+) -> dict[str, float]:
+    body = json.dumps({"text": text}).encode("utf-8")
+    stats = _Stats()
+    deadline = time.perf_counter() + duration_s
+    threads = [
+        threading.Thread(
+            target=_client_loop, args=(url, body, deadline, stats, keep_alive), daemon=True
+        )
+        for _ in range(concurrency)
+    ]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - start
+
+    lat = sorted(stats.latencies_ms)
+    ok = len(lat)
+    return {
+        "requests": float(ok),
+        "errors": float(stats.errors),
+        "rps": ok / elapsed if elapsed else 0.0,
+        "p50_ms": statistics.median(lat) if lat else 0.0,
+        "p99_ms": lat[min(ok - 1, int(ok * 0.99))] if lat else 0.0,
+    }
+
+
+def parse_args() -> argparse.Namespace:
+    p = argparse.ArgumentParser(description="Closed-loop load generator for the /score endpoint.")
+    p.add_argument("--url", default="http://127.0.0.1:8000/score")
+    p.add_argument("--concurrency", type=int, default=16)
+    p.add_argument("--duration", type=float, default=10.0, help="Seconds to run")
+    p.add_argument("--text", default="WIN a free gift card now!!!")
+    p.add_argument(
+        "--keep-alive", action="store_true", help="Reuse one connection per client thread"
+    )
+    return p.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    result = run_load(args.url, args.concurrency, args.duration, args.text, args.keep_alive)
+    print(json.dumps(result, indent=2))
@@ -1,76 +1,478 @@
 from __future__ import annotations
 
 import argparse
-import json
+import gc
 import logging
+import os
+import signal
 import time
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import suppress
 from http.server import BaseHTTPRequestHandler, HTTPServer
 from pathlib import Path
 from typing import Any
 
-import mlflow.pyfunc
-import pandas as pd
+from .batching import MicroBatcher
+from .codec import JsonCodec, get_codec
+from .hot_reload import ModelReloader, ServingModel
+from .metrics import IN_FLIGHT, observe_batch, render_prometheus, stage
+from .prediction_cache import PredictionCache, model_version
+from .predictor import load_predictor, warm_up
+from .streaming import StreamError, iter_chunked_body, iter_length_body, iter_lines, score_ndjson
 
 LOG = logging.getLogger("local_server")
 
 
 class _ModelWrapper:
-    def __init__(self, model_dir: Path) -> None:
-        self.model = mlflow.pyfunc.load_model(str(model_dir))
+    def __init__(self, model_dir: Path, native: bool = False, compact: bool = False) -> None:
+        self.model = load_predictor(model_dir, native=native, compact=compact)
+        self.flavor = self.model.flavor
 
     def predict(self, texts: list[str]) -> list[int]:
-        df = pd.DataFrame({"text": texts})
-        preds = self.model.predict(df)
-        return [int(x) for x in list(preds)]
+        observe_batch(len(texts))
+        return self.model.predict(texts)
 
 
 class Handler(BaseHTTPRequestHandler):
-    model: _ModelWrapper
+    # HTTP/1.1 keeps connections open between requests; every response therefore carries a
+    # Content-Length or is chunked. Idle keep-alive connections are dropped after `timeout`
+    # seconds so they do not pin pool threads.
+    protocol_version = "HTTP/1.1"
+    timeout = 5.0
+    disable_nagle_algorithm = True
 
-    def _send(self, code: int, payload: dict[str, Any]) -> None:
-        body = json.dumps(payload).encode("utf-8")
+    serving: ServingModel
+    reloader: ModelReloader | None = None
+    admin_token: str = ""
+    reload_via_parent = False
+    codec: JsonCodec = get_codec("auto")
+    max_body_bytes: int = 10 * 1024 * 1024
+    stream_batch_size: int = 256
+    stream_max_line_bytes: int = 1024 * 1024
+
+    def _send(self, code: int, payload: dict[str, Any], model_version: str | None = None) -> None:
+        body = self.codec.dumps(payload)
         self.send_response(code)
         self.send_header("Content-Type", "application/json")
         self.send_header("Content-Length", str(len(body)))
+        if model_version is not None:
+            self.send_header("X-Model-Version", model_version)
+        if self.close_connection:
+            self.send_header("Connection", "close")
         self.end_headers()
         self.wfile.write(body)
 
+    def _reject(self, code: int, payload: dict[str, Any]) -> None:
+        """Error response for a request whose body may be unread: never reuse the connection."""
+        self.close_connection = True
+        self._send(code, payload)
+
+    def _content_length(self) -> int | None:
+        """Content-Length as a non-negative int (0 if absent), or reject with 400 and return None."""
+        try:
+            length = int(self.headers.get("Content-Length", "0"))
+        except ValueError:
+            length = -1
+        if length < 0:
+            self._reject(400, {"error": "invalid_content_length"})
+            return None
+        return length
+
+    def _read_body(self) -> bytes | None:
+        """Read the whole request body within max_body_bytes, or reject and return None."""
+        if "chunked" in self.headers.get("Transfer-Encoding", "").lower():
+            buf = bytearray()
+            try:
+                for block in iter_chunked_body(self.rfile):
+                    buf += block
+                    if len(buf) > self.max_body_bytes:
+                        limit = self.max_body_bytes
+                        self._reject(413, {"error": "payload_too_large", "limit": limit})
+                        return None
+            except StreamError as exc:
+                # The rest of the body is unreadable, so the connection cannot be reused.
+                self._reject(400, {"error": "invalid_chunked_body", "detail": str(exc)})
+                return None
+            return bytes(buf)
+        length = self._content_length()
+        if length is None:
+            return None
+        if length > self.max_body_bytes:
+            self._reject(413, {"error": "payload_too_large", "limit": self.max_body_bytes})
+            return None
+        return self.rfile.read(length)
+
+    def _send_metrics(self) -> None:
+        serving = self.serving
+        extra: dict[str, float] = {}
+        for prefix, stats in (
+            ("spam_batcher_", serving.batcher.stats() if serving.batcher else {}),
+            ("spam_cache_", serving.cache.stats() if serving.cache else {}),
+        ):
+            extra.update({prefix + k: v for k, v in stats.items()})
+        extra["spam_model_loaded_timestamp_seconds"] = serving.loaded_at
+        if self.reloader is not None:
+            reload_stats = self.reloader.stats()
+            for key in ("reloads", "reload_failures"):
+                extra[f"spam_model_{key}"] = float(reload_stats[key])
+        body = render_prometheus(extra).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self) -> None:
+        if self.path == "/metrics":
+            self._send_metrics()
+            return
+        if self.path != "/stats":
+            self._send(404, {"error": "not_found"})
+            return
+        serving = self.serving
+        self._send(
+            200,
+            {
+                "model": self.reloader.stats()
+                if self.reloader
+                else {"version": serving.version, "loaded_at": serving.loaded_at},
+                "batching": serving.batcher.stats() if serving.batcher else None,
+                "cache": serving.cache.stats() if serving.cache else None,
+            },
+        )
+
+    def _admin_reload(self) -> None:
+        """POST /admin/reload: load --model-dir again in the background and swap it in."""
+        if self.admin_token and self.headers.get("Authorization") != f"Bearer {self.admin_token}":
+            self._reject(401, {"error": "unauthorized"})
+            return
+        if self.reloader is None:
+            self._reject(404, {"error": "not_found"})
+            return
+        if self.reload_via_parent:
+            # Pre-forked: have the parent signal every worker, not just the one we landed on.
+            os.kill(os.getppid(), signal.SIGHUP)
+            started = True
+        else:
+            started = self.reloader.request()
+        self._send(
+            202,
+            {
+                "status": "reloading" if started else "queued",
+                "serving_version": self.serving.version,
+            },
+        )
+
+    def _score_stream(self) -> None:
+        """POST /score/stream: NDJSON in (one text per line), NDJSON predictions out.
+
+        Lines are scored in batches of stream_batch_size as they arrive and each batch is
+        written back immediately, so memory stays flat regardless of the body size.
+        """
+        if "chunked" in self.headers.get("Transfer-Encoding", "").lower():
+            blocks = iter_chunked_body(self.rfile)
+        elif "Content-Length" in self.headers:
+            length = self._content_length()
+            if length is None:
+                return
+            blocks = iter_length_body(self.rfile, length)
+        else:
+            self._reject(411, {"error": "length_required"})
+            return
+
+        serving = self.serving
+        lines = iter_lines(blocks, self.stream_max_line_bytes)
+        out = score_ndjson(lines, serving.predict, self.stream_batch_size, self.codec)
+        # Pull the first batch before committing to a 200 so early failures still get a status.
+        try:
+            first = next(out, b"")
+        except StreamError as exc:
+            self._reject(400, {"error": "invalid_stream", "detail": str(exc)})
+            return
+        except Exception as exc:
+            LOG.exception("Stream request failed")
+            self._reject(500, {"error": "server_error", "detail": str(exc)})
+            return
+
+        # Keep-alive connections get a chunked body so they survive; others read to close.
+        chunked = not self.close_connection and self.request_version == "HTTP/1.1"
+        if not chunked:
+            self.close_connection = True
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson")
+        self.send_header("X-Model-Version", serving.version)
+        self.send_header(
+            "Transfer-Encoding" if chunked else "Connection", "chunked" if chunked else "close"
+        )
+        self.end_headers()
+
+        def write(block: bytes) -> None:
+            if not block:
+                return
+            self.wfile.write(b"%x\r\n%s\r\n" % (len(block), block) if chunked else block)
+            self.wfile.flush()
+
+        try:
+            write(first)
+            for block in out:
+                write(block)
+        except Exception as exc:
+            # Headers are already out; report the failure in-band as a final NDJSON line.
+            LOG.exception("Stream request failed mid-body")
+            self.close_connection = True
+            error = {"error": "invalid_stream" if isinstance(exc, StreamError) else "server_error"}
+            write(self.codec.dumps({**error, "detail": str(exc)}) + b"\n")
+        if chunked:
+            self.wfile.write(b"0\r\n\r\n")
+
     def do_POST(self) -> None:
+        if self.path == "/score/stream":
+            IN_FLIGHT.inc()
+            try:
+                self._score_stream()
+            finally:
+                IN_FLIGHT.dec()
+            return
+        if self.path == "/admin/reload":
+            self._admin_reload()
+            return
         if self.path != "/score":
-            self._send(404, {"error": "not_found"})
+            self._reject(404, {"error": "not_found"})
             return
 
+        IN_FLIGHT.inc()
         try:
-            length = int(self.headers.get("Content-Length", "0"))
-            raw = self.rfile.read(length).decode("utf-8")
-            data = json.loads(raw) if raw else {}
+            with stage("parse"):
+                raw = self._read_body()
+                if raw is None:
+                    return
+                data = self.codec.loads(raw) if raw else {}
             texts: list[str]
-            if isinstance(data, dict) and "text" in data:
-                texts = [str(data["text"])]
-            elif isinstance(data, dict) and "texts" in data:
-                texts = [str(x) for x in data["texts"]]
-            else:
-                self._send(400, {"error": "invalid_payload", "expected": {"text": "..."}})
-                return
+            with stage("normalize"):
+                if isinstance(data, dict) and "text" in data:
+                    texts = [str(data["text"])]
+                elif isinstance(data, dict) and "texts" in data:
+                    texts = [str(x) for x in data["texts"]]
+                else:
+                    self._send(400, {"error": "invalid_payload", "expected": {"text": "..."}})
+                    return
 
+            serving = self.serving
             start = time.perf_counter()
-            preds = self.model.predict(texts)
+            with stage("predict"):
+                preds = serving.predict(texts)
             latency_ms = int((time.perf_counter() - start) * 1000)
-            self._send(200, {"predictions": preds, "latency_ms": latency_ms})
+            with stage("serialize"):
+                self._send(
+                    200,
+                    {
+                        "predictions": preds,
+                        "latency_ms": latency_ms,
+                        "model_version": serving.version,
+                    },
+                    model_version=serving.version,
+                )
         except Exception as exc:
             LOG.exception("Request failed")
             self._send(500, {"error": "server_error", "detail": str(exc)})
+        finally:
+            IN_FLIGHT.dec()
 
     def log_message(self, format: str, *args: Any) -> None:
         LOG.info("%s - %s", self.address_string(), format % args)
 
 
-def serve(host: str, port: int, model_dir: Path) -> None:
+class _PooledHTTPServer(HTTPServer):
+    """HTTPServer that hands each accepted connection to a fixed-size thread pool.
+
+    Unlike ThreadingHTTPServer this does not spawn a thread per connection, so a burst
+    of clients cannot oversubscribe the box.
+    """
+
+    allow_reuse_address = True
+    request_queue_size = 128
+
+    def __init__(self, address: tuple[str, int], handler: type[Handler], threads: int) -> None:
+        super().__init__(address, handler)
+        # Threads are started lazily on first submit, so creating the pool before a
+        # pre-fork is safe: every worker process ends up with its own threads.
+        self._pool = ThreadPoolExecutor(max_workers=threads, thread_name_prefix="score")
+
+    def process_request(self, request: Any, client_address: Any) -> None:
+        self._pool.submit(self._process_request_thread, request, client_address)
+
+    def _process_request_thread(self, request: Any, client_address: Any) -> None:
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+
+    def server_close(self) -> None:
+        super().server_close()
+        self._pool.shutdown(wait=True)
+
+
+class _SingleThreadHandler(Handler):
+    """Handler for the unpooled server: one idle keep-alive client would block all others."""
+
+    protocol_version = "HTTP/1.0"
+
+
+def _make_server(host: str, port: int, threads: int) -> HTTPServer:
+    if threads > 1:
+        return _PooledHTTPServer((host, port), Handler, threads=threads)
+    return HTTPServer((host, port), _SingleThreadHandler)
+
+
+def _run_prefork(
+    server: HTTPServer, workers: int, on_worker_start: Callable[[], None] | None = None
+) -> None:
+    """Fork `workers` processes that all accept() on the already-bound listening socket.
+
+    The model is loaded in the parent before forking, so workers share its pages
+    copy-on-write instead of each paying for mlflow.pyfunc.load_model. on_worker_start runs
+    in each child before it starts serving; SIGHUP to the parent is forwarded to every child.
+    """
+    if not hasattr(os, "fork"):
+        raise RuntimeError("--workers > 1 requires os.fork (POSIX only); use --threads instead")
+
+    # Move everything allocated so far (model included) out of the GC's reach so the
+    # collector does not touch those objects in the children and un-share their pages.
+    gc.freeze()
+
+    children: list[int] = []
+    for _ in range(workers):
+        pid = os.fork()
+        if pid == 0:
+            code = 0
+            try:
+                if on_worker_start is not None:
+                    on_worker_start()
+                server.serve_forever()
+            except KeyboardInterrupt:
+                pass
+            except Exception:
+                LOG.exception("Worker %s crashed", os.getpid())
+                code = 1
+            finally:
+                os._exit(code)
+        children.append(pid)
+    LOG.info("Started %s worker processes: %s", workers, children)
+
+    def _forward(signum: int, frame: Any) -> None:
+        for pid in children:
+            with suppress(ProcessLookupError):
+                os.kill(pid, signal.SIGHUP if signum == signal.SIGHUP else signal.SIGTERM)
+
+    signal.signal(signal.SIGTERM, _forward)
+    signal.signal(signal.SIGINT, _forward)
+    signal.signal(signal.SIGHUP, _forward)
+    try:
+        for pid in children:
+            with suppress(ChildProcessError):
+                os.waitpid(pid, 0)
+    finally:
+        server.server_close()
+
+
+def serve(
+    host: str,
+    port: int,
+    model_dir: Path,
+    workers: int = 1,
+    threads: int = 1,
+    batch_max_size: int = 0,
+    batch_wait_ms: float = 5.0,
+    native: bool = False,
+    compact: bool = False,
+    cache_size: int = 0,
+    cache_ttl_s: float = 0.0,
+    stream_batch_size: int = 256,
+    json_codec: str = "auto",
+    max_body_bytes: int = 10 * 1024 * 1024,
+    keepalive_timeout_s: float = 5.0,
+    warmup_rounds: int = 1,
+    reload_poll_s: float = 0.0,
+    admin_token: str = "",
+) -> None:
+    """Serve /score until interrupted.
+
+    threads > 1 handles connections on a thread pool (per worker); workers > 1 pre-forks
+    that many processes sharing one listening socket and one copy of the loaded model.
+    batch_max_size > 0 coalesces concurrent requests within a worker into one predict call.
+    native=True calls the sklearn Pipeline directly instead of going through pyfunc, and
+    compact=True uses the numpy-only scorer exported by train.py. cache_size > 0 answers
+    repeated texts from a per-process LRU. POST /score/stream scores NDJSON bodies in batches
+    of stream_batch_size lines.
+
+    With threads > 1, connections are HTTP/1.1 keep-alive, closed after keepalive_timeout_s
+    idle; each open connection holds one pool thread while it is idle. With threads == 1 there
+    is no pool to share, so every response closes its connection (HTTP/1.0). Bodies over
+    max_body_bytes get a 413 without being read. json_codec picks the JSON library ("auto"
+    prefers orjson).
+
+    The model can be replaced without a restart: POST /admin/reload (Bearer admin_token, when
+    set), SIGHUP, or, with reload_poll_s > 0, any change to the files in model_dir loads it
+    again in the background, warms it up with warmup_rounds synthetic predictions and swaps
+    it in. Every response names the model version that produced it.
+    """
+    if workers < 1 or threads < 1:
+        raise ValueError("workers and threads must be >= 1")
+
     logging.basicConfig(level="INFO", format="%(asctime)s %(levelname)s %(name)s - %(message)s")
-    server = HTTPServer((host, port), Handler)
-    Handler.model = _ModelWrapper(model_dir)
-    LOG.info("Local scoring server running on http://%s:%s/score", host, port)
-    server.serve_forever()
+    server = _make_server(host, port, threads)
+
+    def load(path: Path) -> ServingModel:
+        version = model_version(path)
+        wrapper = _ModelWrapper(path, native=native, compact=compact)
+        warm_up(wrapper.model, warmup_rounds)
+        return ServingModel(
+            model=wrapper,
+            version=version,
+            batcher=MicroBatcher(wrapper.predict, batch_max_size, batch_wait_ms)
+            if batch_max_size > 0
+            else None,
+            cache=PredictionCache(version, cache_size, cache_ttl_s) if cache_size > 0 else None,
+        )
+
+    def publish(serving: ServingModel) -> None:
+        Handler.serving = serving
+
+    Handler.serving = load(model_dir)
+    reloader = ModelReloader(model_dir, Handler.serving, load, publish, poll_s=reload_poll_s)
+    Handler.reloader = reloader
+    Handler.admin_token = admin_token
+    Handler.stream_batch_size = stream_batch_size
+    Handler.codec = get_codec(json_codec)
+    Handler.max_body_bytes = max_body_bytes
+    Handler.timeout = keepalive_timeout_s
+
+    def start_reloading(via_parent: bool = False) -> None:
+        Handler.reload_via_parent = via_parent
+        signal.signal(signal.SIGHUP, lambda signum, frame: reloader.request())
+        reloader.watch()
+
+    LOG.info(
+        "Local scoring server running on http://%s:%s/score "
+        "(workers=%s, threads=%s, json=%s, model=%s)",
+        host,
+        port,
+        workers,
+        threads,
+        Handler.codec.name,
+        Handler.serving.version,
+    )
+    if workers > 1:
+        _run_prefork(server, workers, on_worker_start=lambda: start_reloading(via_parent=True))
+        return
+    start_reloading()
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
 
 
 def parse_args() -> argparse.Namespace:
@@ -78,9 +480,117 @@ def parse_args() -> argparse.Namespace:
     p.add_argument("--model-dir", type=Path, required=True, help="Path to the MLflow model folder")
     p.add_argument("--host", default="127.0.0.1")
     p.add_argument("--port", type=int, default=8000)
+    p.add_argument(
+        "--workers",
+        type=int,
+        default=int(os.getenv("SCORE_WORKERS", "1")),
+        help="Pre-forked worker processes sharing the listening socket (POSIX only)",
+    )
+    p.add_argument(
+        "--threads",
+        type=int,
+        default=int(os.getenv("SCORE_THREADS", "1")),
+        help="Request-handling threads per worker process",
+    )
+    p.add_argument(
+        "--batch-max-size",
+        type=int,
+        default=int(os.getenv("SCORE_BATCH_MAX_SIZE", "0")),
+        help="Coalesce concurrent requests into batches of up to N texts (0 disables)",
+    )
+    p.add_argument(
+        "--batch-wait-ms",
+        type=float,
+        default=float(os.getenv("SCORE_BATCH_MAX_WAIT_MS", "5")),
+        help="Max time the first request of a batch waits for others",
+    )
+    p.add_argument(
+        "--native",
+        action="store_true",
+        default=os.getenv("SCORE_NATIVE_SKLEARN", "0") == "1",
+        help="Predict with the sklearn Pipeline directly, skipping pyfunc and pandas",
+    )
+    p.add_argument(
+        "--compact",
+        action="store_true",
+        default=os.getenv("SCORE_COMPACT", "0") == "1",
+        help="Predict with the numpy-only compact scorer exported by train.py",
+    )
+    p.add_argument(
+        "--cache-size",
+        type=int,
+        default=int(os.getenv("SCORE_CACHE_SIZE", "0")),
+        help="Max cached predictions per worker (0 disables)",
+    )
+    p.add_argument(
+        "--cache-ttl",
+        type=float,
+        default=float(os.getenv("SCORE_CACHE_TTL_S", "0")),
+        help="Seconds before a cached prediction expires (0 = never)",
+    )
+    p.add_argument(
+        "--stream-batch-size",
+        type=int,
+        default=256,
+        help="Lines scored per batch on POST /score/stream",
+    )
+    p.add_argument(
+        "--json-codec",
+        choices=("auto", "orjson", "json"),
+        default=os.getenv("SCORE_JSON_CODEC", "auto"),
+        help="JSON library for request parsing and responses (auto prefers orjson)",
+    )
+    p.add_argument(
+        "--max-body-bytes",
+        type=int,
+        default=int(os.getenv("SCORE_MAX_BODY_BYTES", str(10 * 1024 * 1024))),
+        help="Reject /score bodies larger than this with 413",
+    )
+    p.add_argument(
+        "--keepalive-timeout",
+        type=float,
+        default=float(os.getenv("SCORE_KEEPALIVE_TIMEOUT_S", "5")),
+        help="Seconds an idle keep-alive connection is held open",
+    )
+    p.add_argument(
+        "--warmup-rounds",
+        type=int,
+        default=int(os.getenv("SCORE_WARMUP_ROUNDS", "1")),
+        help="Synthetic predictions run on a freshly loaded model before it serves traffic",
+    )
+    p.add_argument(
+        "--reload-poll",
+        type=float,
+        default=float(os.getenv("SCORE_RELOAD_POLL_S", "0")),
+        help="Poll --model-dir every N seconds and hot-reload on change (0 disables)",
+    )
+    p.add_argument(
+        "--admin-token",
+        default=os.getenv("SCORE_ADMIN_TOKEN", ""),
+        help="Bearer token required by POST /admin/reload (empty: no auth)",
+    )
     return p.parse_args()
 
 
 if __name__ == "__main__":
     args = parse_args()
-    serve(args.host, args.port, args.model_dir)
+    serve(
+        args.host,
+        args.port,
+        args.model_dir,
+        workers=args.workers,
+        threads=args.threads,
+        batch_max_size=args.batch_max_size,
+        batch_wait_ms=args.batch_wait_ms,
+        native=args.native,
+        compact=args.compact,
+        cache_size=args.cache_size,
+        cache_ttl_s=args.cache_ttl,
+        stream_batch_size=args.stream_batch_size,
+        json_codec=args.json_codec,
+        max_body_bytes=args.max_body_bytes,
+        keepalive_timeout_s=args.keepalive_timeout,
+        warmup_rounds=args.warmup_rounds,
+        reload_poll_s=args.reload_poll,
+        admin_token=args.admin_token,
+    )
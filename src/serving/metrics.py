@@ -0,0 +1,163 @@
+from __future__ import annotations
+
+import threading
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+LATENCY_BUCKETS_S = (
+    0.0001,
+    0.00025,
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+)
+BATCH_SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256, 512, 1024)
+
+
+def _fmt_labels(labels: dict[str, str], extra: str = "") -> str:
+    parts = [f'{k}="{v}"' for k, v in labels.items()]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+class Histogram:
+    """Cumulative-bucket histogram with an optional single label, rendered Prometheus-style."""
+
+    def __init__(
+        self, name: str, help_text: str, buckets: tuple[float, ...], label: str | None = None
+    ) -> None:
+        self.name = name
+        self.help = help_text
+        self.buckets = buckets
+        self.label = label
+        self._lock = threading.Lock()
+        # label value -> (per-bucket counts incl. +Inf, sum, count)
+        self._series: dict[str, tuple[list[int], float, int]] = {}
+
+    def observe(self, value: float, label_value: str = "") -> None:
+        with self._lock:
+            counts, total, n = self._series.get(label_value) or (
+                [0] * (len(self.buckets) + 1),
+                0.0,
+                0,
+            )
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[i] += 1
+                    break
+            else:
+                counts[-1] += 1
+            self._series[label_value] = (counts, total + value, n + 1)
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            series = {k: (list(c), s, n) for k, (c, s, n) in sorted(self._series.items())}
+        for label_value, (counts, total, n) in series.items():
+            labels = {self.label: label_value} if self.label else {}
+            cumulative = 0
+            for bound, count in zip((*self.buckets, float("inf")), counts, strict=True):
+                cumulative += count
+                le = 'le="+Inf"' if bound == float("inf") else f'le="{bound:g}"'
+                lines.append(f"{self.name}_bucket{_fmt_labels(labels, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_fmt_labels(labels)} {total:.9g}")
+            lines.append(f"{self.name}_count{_fmt_labels(labels)} {n}")
+        return lines
+
+
+class Gauge:
+    def __init__(self, name: str, help_text: str) -> None:
+        self.name = name
+        self.help = help_text
+        self._lock = threading.Lock()
+        self._value = 0.0
+
+    def set(self, value: float) -> None:
+        with self._lock:
+            self._value = value
+
+    def inc(self, amount: float = 1.0) -> None:
+        with self._lock:
+            self._value += amount
+
+    def dec(self, amount: float = 1.0) -> None:
+        self.inc(-amount)
+
+    @property
+    def value(self) -> float:
+        with self._lock:
+            return self._value
+
+    def render(self) -> list[str]:
+        return [
+            f"# HELP {self.name} {self.help}",
+            f"# TYPE {self.name} gauge",
+            f"{self.name} {self.value:g}",
+        ]
+
+
+STAGE_SECONDS = Histogram(
+    "spam_scoring_stage_seconds",
+    "Time spent per request stage (parse, normalize, dataframe, predict, serialize).",
+    LATENCY_BUCKETS_S,
+    label="stage",
+)
+BATCH_SIZE = Histogram(
+    "spam_scoring_batch_size", "Texts per model predict call.", BATCH_SIZE_BUCKETS
+)
+IN_FLIGHT = Gauge("spam_scoring_in_flight_requests", "Requests currently being handled.")
+LAST_BATCH_SIZE = Gauge("spam_scoring_last_batch_size", "Texts in the most recent predict call.")
+
+_BREAKDOWN: ContextVar[dict[str, float] | None] = ContextVar("stage_breakdown", default=None)
+
+
+@contextmanager
+def collect_stages() -> Iterator[dict[str, float]]:
+    """Collect the stage timings (ms) recorded by stage() calls in this context."""
+    breakdown: dict[str, float] = {}
+    token = _BREAKDOWN.set(breakdown)
+    try:
+        yield breakdown
+    finally:
+        _BREAKDOWN.reset(token)
+
+
+@contextmanager
+def stage(name: str) -> Iterator[None]:
+    """Time a block into the stage histogram (and the current breakdown, if collecting)."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        STAGE_SECONDS.observe(elapsed, name)
+        breakdown = _BREAKDOWN.get()
+        if breakdown is not None:
+            breakdown[name] = breakdown.get(name, 0.0) + elapsed * 1000
+
+
+def observe_batch(size: int) -> None:
+    BATCH_SIZE.observe(size)
+    LAST_BATCH_SIZE.set(size)
+
+
+def render_prometheus(extra_gauges: dict[str, float] | None = None) -> str:
+    """Prometheus text exposition of the built-in metrics plus ad-hoc gauges."""
+    lines: list[str] = []
+    for metric in (STAGE_SECONDS, BATCH_SIZE, IN_FLIGHT, LAST_BATCH_SIZE):
+        lines.extend(metric.render())
+    for name, value in sorted((extra_gauges or {}).items()):
+        lines.extend([f"# TYPE {name} gauge", f"{name} {value:g}"])
+    return "\n".join(lines) + "\n"
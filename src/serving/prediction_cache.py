@@ -0,0 +1,120 @@
+from __future__ import annotations
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+from pathlib import Path
+from typing import cast
+
+
+def model_version(model_dir: Path | str) -> str:
+    """Short fingerprint of the MLflow model folder, taken from its MLmodel file."""
+    mlmodel = Path(model_dir) / "MLmodel"
+    data = mlmodel.read_bytes() if mlmodel.exists() else str(model_dir).encode("utf-8")
+    return hashlib.sha256(data).hexdigest()[:12]
+
+
+def normalize_text(text: str) -> str:
+    # Whitespace never changes the word tokens the vectorizer sees, so collapsing it is
+    # prediction-preserving and lets trivially re-spaced copies share an entry.
+    return " ".join(text.split())
+
+
+class PredictionCache:
+    """Thread-safe LRU of text -> prediction with optional TTL.
+
+    Keys are a digest of the normalized text and the model version, so entries never leak
+    across model versions and memory per entry is fixed (~200 bytes) regardless of text size.
+    """
+
+    def __init__(self, model_version: str, max_entries: int = 100_000, ttl_s: float = 0.0) -> None:
+        if max_entries < 1:
+            raise ValueError("max_entries must be >= 1")
+        self._version = model_version.encode("utf-8")
+        self._max_entries = max_entries
+        self._ttl_s = ttl_s
+        self._lock = threading.Lock()
+        self._data: OrderedDict[bytes, tuple[int, float]] = OrderedDict()
+
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._expirations = 0
+
+    def key(self, text: str) -> bytes:
+        h = hashlib.blake2b(self._version, digest_size=16)
+        h.update(b"\0")
+        h.update(normalize_text(text).encode("utf-8"))
+        return h.digest()
+
+    def _get(self, key: bytes, now: float) -> int | None:
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        value, expires_at = entry
+        if expires_at and expires_at < now:
+            del self._data[key]
+            self._expirations += 1
+            return None
+        self._data.move_to_end(key)
+        return value
+
+    def _put(self, key: bytes, value: int, now: float) -> None:
+        self._data[key] = (value, now + self._ttl_s if self._ttl_s > 0 else 0.0)
+        self._data.move_to_end(key)
+        while len(self._data) > self._max_entries:
+            self._data.popitem(last=False)
+            self._evictions += 1
+
+    def predict(self, texts: list[str], predict_fn: Callable[[list[str]], list[int]]) -> list[int]:
+        """Answer cached texts from memory and call predict_fn once on the unique misses."""
+        keys = [self.key(t) for t in texts]
+        results: list[int | None] = [None] * len(texts)
+        miss_positions: dict[bytes, list[int]] = {}
+        miss_texts: list[str] = []
+
+        with self._lock:
+            now = time.monotonic()
+            for i, k in enumerate(keys):
+                if k in miss_positions:
+                    miss_positions[k].append(i)
+                    self._hits += 1
+                    continue
+                value = self._get(k, now)
+                if value is None:
+                    miss_positions[k] = [i]
+                    miss_texts.append(texts[i])
+                    self._misses += 1
+                else:
+                    results[i] = value
+                    self._hits += 1
+
+        if miss_texts:
+            preds = predict_fn(miss_texts)
+            with self._lock:
+                now = time.monotonic()
+                for (k, positions), pred in zip(miss_positions.items(), preds, strict=True):
+                    self._put(k, pred, now)
+                    for i in positions:
+                        results[i] = pred
+
+        return cast(list[int], results)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> dict[str, float]:
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "entries": float(len(self._data)),
+                "max_entries": float(self._max_entries),
+                "hits": float(self._hits),
+                "misses": float(self._misses),
+                "hit_rate": self._hits / lookups if lookups else 0.0,
+                "evictions": float(self._evictions),
+                "expirations": float(self._expirations),
+            }
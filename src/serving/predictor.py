@@ -0,0 +1,185 @@
+from __future__ import annotations
+
+import logging
+import os
+import pickle
+import time
+from contextlib import suppress
+from importlib import metadata
+from pathlib import Path
+from typing import Any, Protocol
+
+import numpy as np
+
+try:
+    from .compact_scorer import COMPACT_SCORER_FILE, CompactScorer
+    from .metrics import stage
+    from .prediction_cache import model_version
+except ImportError:  # Azure ML loads score.py (and so this module) from src/serving directly
+    from compact_scorer import COMPACT_SCORER_FILE, CompactScorer  # type: ignore[no-redef]
+    from metrics import stage  # type: ignore[no-redef]
+    from prediction_cache import model_version  # type: ignore[no-redef]
+
+LOG = logging.getLogger("predictor")
+
+
+class Predictor(Protocol):
+    flavor: str
+
+    def predict(self, texts: list[str]) -> list[int]: ...
+
+
+WARMUP_TEXTS = [
+    "WIN a free gift card now!!!",
+    "Are we still on for lunch tomorrow?",
+    "URGENT: verify your account at http://example.com before it is suspended",
+    "ok",
+]
+
+
+def warm_up(predictor: Predictor, rounds: int = 1) -> None:
+    """Run synthetic predictions so lazy numpy/scipy/sklearn init happens before traffic."""
+    for _ in range(rounds):
+        predictor.predict(WARMUP_TEXTS[:1])
+        predictor.predict(WARMUP_TEXTS * 4)
+
+
+def _ms_since(start: float) -> float:
+    return (time.perf_counter() - start) * 1000
+
+
+# MLflow, pandas and sklearn are imported inside the loaders so the compact path never pays
+# for them. Each loader records how long its imports and its load took in load_phases_ms.
+
+
+class PyfuncPredictor:
+    """Generic path: schema enforcement + DataFrame through mlflow.pyfunc."""
+
+    flavor = "python_function"
+
+    def __init__(self, model_dir: Path | str) -> None:
+        start = time.perf_counter()
+        import mlflow.pyfunc
+        import pandas as pd
+
+        self.load_phases_ms = {"import": _ms_since(start)}
+        start = time.perf_counter()
+        self._pd = pd
+        self.model = mlflow.pyfunc.load_model(str(model_dir))
+        self.load_phases_ms["load"] = _ms_since(start)
+
+    def predict(self, texts: list[str]) -> list[int]:
+        with stage("dataframe"):
+            df = self._pd.DataFrame({"text": texts})
+        preds = self.model.predict(df)
+        return [int(x) for x in list(preds)]
+
+
+def pipeline_cache_path(model_dir: Path | str, cache_dir: Path) -> Path:
+    # Pickles are only valid for the model and the sklearn release that wrote them.
+    sklearn_version = metadata.version("scikit-learn")
+    return cache_dir / f"pipeline-{model_version(model_dir)}-sklearn{sklearn_version}.pkl"
+
+
+class SklearnPredictor:
+    """Fast path: call the saved sklearn Pipeline directly on list[str].
+
+    With pipeline_cache_dir set, the unpickled Pipeline is cached there on first load and
+    later loads read it back directly, skipping MLflow's import and metadata handling.
+    """
+
+    flavor = "sklearn"
+
+    def __init__(self, model_dir: Path | str, pipeline_cache_dir: Path | None = None) -> None:
+        cache_path = (
+            pipeline_cache_path(model_dir, pipeline_cache_dir) if pipeline_cache_dir else None
+        )
+        start = time.perf_counter()
+        if cache_path is not None and cache_path.exists():
+            import sklearn.pipeline  # noqa: F401  (timed separately from the unpickle)
+
+            self.load_phases_ms = {"import": _ms_since(start)}
+            start = time.perf_counter()
+            with cache_path.open("rb") as f:
+                self.model: Any = pickle.load(f)
+            self.load_phases_ms["load_pipeline_cache"] = _ms_since(start)
+            return
+
+        import mlflow.sklearn
+
+        self.load_phases_ms = {"import": _ms_since(start)}
+        start = time.perf_counter()
+        self.model = mlflow.sklearn.load_model(str(model_dir))
+        self.load_phases_ms["load"] = _ms_since(start)
+        if cache_path is not None:
+            self._write_cache(cache_path)
+
+    def _write_cache(self, path: Path) -> None:
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+            with tmp.open("wb") as f:
+                pickle.dump(self.model, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp, path)
+            LOG.info("Wrote pipeline cache %s", path)
+        except OSError:
+            LOG.warning("Could not write pipeline cache %s", path, exc_info=True)
+
+    def predict(self, texts: list[str]) -> list[int]:
+        preds = self.model.predict(texts)
+        return np.asarray(preds, dtype=np.int64).tolist()
+
+
+def load_predictor(
+    model_dir: Path | str,
+    native: bool = False,
+    compact: bool = False,
+    pipeline_cache_dir: Path | None = None,
+) -> Predictor:
+    """Load the MLflow model folder, optionally bypassing pyfunc.
+
+    With compact=True the array-backed scorer exported by train.py is used when present.
+    With native=True the sklearn flavor is used when the model has one (read from
+    pipeline_cache_dir when a cached copy exists). Anything else, or a failure to load
+    either, falls back to pyfunc.
+    """
+    if compact:
+        compact_path = Path(model_dir) / COMPACT_SCORER_FILE
+        if compact_path.exists():
+            try:
+                return CompactScorer(compact_path)
+            except Exception:
+                LOG.exception("Compact scorer load failed; falling back")
+        else:
+            LOG.info("No %s in model folder; falling back", COMPACT_SCORER_FILE)
+
+    if native:
+        cache_path = (
+            pipeline_cache_path(model_dir, pipeline_cache_dir) if pipeline_cache_dir else None
+        )
+        if cache_path is not None and cache_path.exists():
+            try:
+                return SklearnPredictor(model_dir, pipeline_cache_dir)
+            except Exception:
+                LOG.exception("Pipeline cache load failed; rebuilding it through MLflow")
+                with suppress(OSError):
+                    cache_path.unlink()
+
+        start = time.perf_counter()
+        from mlflow.models import Model
+
+        flavors = Model.load(str(model_dir)).flavors
+        read_mlmodel_ms = _ms_since(start)
+        if "sklearn" in flavors:
+            try:
+                predictor = SklearnPredictor(model_dir, pipeline_cache_dir)
+                predictor.load_phases_ms = {
+                    "read_mlmodel": read_mlmodel_ms,
+                    **predictor.load_phases_ms,
+                }
+                return predictor
+            except Exception:
+                LOG.exception("Native sklearn load failed; falling back to pyfunc")
+        else:
+            LOG.info("Model has no sklearn flavor (%s); using pyfunc", sorted(flavors))
+    return PyfuncPredictor(model_dir)
@@ -1,17 +1,63 @@
 from __future__ import annotations
 
-import json
 import logging
 import os
 import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from pathlib import Path
 from typing import Any
 
-import mlflow.pyfunc
-import pandas as pd
+try:
+    from .batching import MicroBatcher
+    from .codec import JsonCodec, get_codec
+    from .metrics import IN_FLIGHT, collect_stages, observe_batch, stage
+    from .prediction_cache import PredictionCache, model_version
+    from .predictor import Predictor, load_predictor, warm_up
+except ImportError:  # Azure ML loads score.py as a top-level module from src/serving
+    from batching import MicroBatcher  # type: ignore[no-redef]
+    from codec import JsonCodec, get_codec  # type: ignore[no-redef]
+    from metrics import IN_FLIGHT, collect_stages, observe_batch, stage  # type: ignore[no-redef]
+    from prediction_cache import PredictionCache, model_version  # type: ignore[no-redef]
+    from predictor import Predictor, load_predictor, warm_up  # type: ignore[no-redef]
 
 LOG = logging.getLogger("score")
 
-_MODEL: mlflow.pyfunc.PyFuncModel | None = None
+_MODEL: Predictor | None = None
+_BATCHER: MicroBatcher | None = None
+_CACHE: PredictionCache | None = None
+_VERSION: str | None = None
+# Response extras, read from the environment once in init().
+_INCLUDE_STAGES = False
+_INCLUDE_STATS = False
+_CODEC: JsonCodec = get_codec(os.getenv("SCORE_JSON_CODEC", "auto"))
+
+# Milliseconds spent in each init() phase, for diagnosing slow scale-out.
+STARTUP_PHASES_MS: dict[str, float] = {}
+
+
+@contextmanager
+def _phase(name: str) -> Iterator[None]:
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        STARTUP_PHASES_MS[name] = (time.perf_counter() - start) * 1000
+
+
+def _pipeline_cache_dir(model_dir: str) -> Path | None:
+    explicit = os.getenv("SCORE_PIPELINE_CACHE_DIR")
+    if explicit:
+        return Path(explicit)
+    if os.getenv("SCORE_PIPELINE_CACHE", "0") == "1":
+        return Path(model_dir).resolve().parent / ".score_pipeline_cache"
+    return None
+
+
+def _warmup(rounds: int) -> None:
+    if _MODEL is None or rounds <= 0:
+        return
+    warm_up(_MODEL, rounds)
 
 
 def init() -> None:
@@ -19,8 +65,37 @@ def init() -> None:
 
     The runtime provides AZUREML_MODEL_DIR: path to the registered model folder on disk.
     We register an MLflow model folder (type=mlflow_model), so mlflow.pyfunc.load_model works.
+    Set SCORE_NATIVE_SKLEARN=1 to call the sklearn Pipeline directly instead of through pyfunc,
+    or SCORE_COMPACT=1 to use the numpy-only scorer exported next to the model by train.py.
+
+    Set SCORE_BATCH_MAX_SIZE > 0 to coalesce concurrent run() calls into one predict call,
+    waiting at most SCORE_BATCH_MAX_WAIT_MS (default 5) for a batch to fill.
+
+    Set SCORE_CACHE_SIZE > 0 to answer repeated texts from an in-process LRU (entries expire
+    after SCORE_CACHE_TTL_S seconds when set).
+
+    Cold start: with native scoring, SCORE_PIPELINE_CACHE=1 keeps an unpickled copy of the
+    Pipeline next to the model folder (or in SCORE_PIPELINE_CACHE_DIR) so later workers skip
+    MLflow entirely. SCORE_WARMUP_ROUNDS (default 1) synthetic predictions run before init()
+    returns. Per-phase timings are logged and kept in STARTUP_PHASES_MS.
+
+    Every run() response carries "model_version", the MLmodel fingerprint of the loaded model,
+    so callers can key their own caches on the model that actually answered.
+
+    Set SCORE_INCLUDE_STAGES=1 to add a per-request "stages_ms" breakdown (parse, normalize,
+    dataframe, predict) to run() responses. With batching on, "dataframe" is missing from it:
+    the pyfunc DataFrame is built on the batcher thread, once for the whole batch, so it is
+    only recorded in the stage histogram. Set SCORE_INCLUDE_STATS=1 to add the batcher and
+    cache counters ("batching", "cache") to every response.
     """
-    global _MODEL
+    global _MODEL, _BATCHER, _CACHE, _VERSION, _CODEC, _INCLUDE_STAGES, _INCLUDE_STATS
+    _BATCHER = None
+    _CACHE = None
+    _INCLUDE_STAGES = os.getenv("SCORE_INCLUDE_STAGES", "0") == "1"
+    _INCLUDE_STATS = os.getenv("SCORE_INCLUDE_STATS", "0") == "1"
+    _CODEC = get_codec(os.getenv("SCORE_JSON_CODEC", "auto"))
+    STARTUP_PHASES_MS.clear()
+    init_start = time.perf_counter()
     logging.basicConfig(
         level=os.getenv("LOG_LEVEL", "INFO"),
         format="%(asctime)s %(levelname)s %(name)s - %(message)s",
@@ -30,14 +105,45 @@ def init() -> None:
     if not model_dir:
         raise RuntimeError("AZUREML_MODEL_DIR is not set. Are you running in Azure ML?")
 
-    LOG.info("Loading MLflow model from %s", model_dir)
-    _MODEL = mlflow.pyfunc.load_model(model_dir)
-    LOG.info("Model loaded.")
-
+    native = os.getenv("SCORE_NATIVE_SKLEARN", "0") == "1"
+    compact = os.getenv("SCORE_COMPACT", "0") == "1"
+    LOG.info("Loading MLflow model from %s (native=%s, compact=%s)", model_dir, native, compact)
+    with _phase("load_model"):
+        _MODEL = load_predictor(
+            model_dir,
+            native=native,
+            compact=compact,
+            pipeline_cache_dir=_pipeline_cache_dir(model_dir),
+        )
+    for name, ms in getattr(_MODEL, "load_phases_ms", {}).items():
+        STARTUP_PHASES_MS[f"load_model.{name}"] = ms
+    _VERSION = model_version(model_dir)
+    LOG.info("Model %s loaded (flavor=%s).", _VERSION, _MODEL.flavor)
+
+    with _phase("warmup"):
+        _warmup(int(os.getenv("SCORE_WARMUP_ROUNDS", "1")))
+
+    batch_max_size = int(os.getenv("SCORE_BATCH_MAX_SIZE", "0"))
+    if batch_max_size > 0:
+        batch_max_wait_ms = float(os.getenv("SCORE_BATCH_MAX_WAIT_MS", "5"))
+        _BATCHER = MicroBatcher(_predict, batch_max_size, batch_max_wait_ms)
+        LOG.info("Micro-batching on: max_size=%s max_wait_ms=%s", batch_max_size, batch_max_wait_ms)
+
+    cache_size = int(os.getenv("SCORE_CACHE_SIZE", "0"))
+    if cache_size > 0:
+        cache_ttl_s = float(os.getenv("SCORE_CACHE_TTL_S", "0"))
+        _CACHE = PredictionCache(_VERSION, cache_size, cache_ttl_s)
+        LOG.info("Prediction cache on: max_entries=%s ttl_s=%s", cache_size, cache_ttl_s)
+
+    STARTUP_PHASES_MS["init_total"] = (time.perf_counter() - init_start) * 1000
+    LOG.info(
+        "init() phases (ms): %s",
+        ", ".join(f"{k}={v:.1f}" for k, v in STARTUP_PHASES_MS.items()),
+    )
 
-def _normalize_payload(raw_data: Any) -> list[str]:
-    payload = json.loads(raw_data) if isinstance(raw_data, str) else raw_data
 
+def _normalize_payload(payload: Any) -> list[str]:
+    """Texts from an already-decoded payload (run() decodes the raw body exactly once)."""
     if isinstance(payload, dict) and "text" in payload:
         return [str(payload["text"])]
     if isinstance(payload, dict) and "texts" in payload:
@@ -47,17 +153,44 @@ def _normalize_payload(raw_data: Any) -> list[str]:
     raise ValueError('Expected {"text":"..."} or {"texts":[...]} or ["..."].')
 
 
-def run(raw_data: Any) -> dict[str, Any]:
+def _predict(texts: list[str]) -> list[int]:
     if _MODEL is None:
         raise RuntimeError("Model is not loaded. init() was not called?")
+    observe_batch(len(texts))
+    return _MODEL.predict(texts)
 
-    start = time.perf_counter()
-    texts = _normalize_payload(raw_data)
 
-    df = pd.DataFrame({"text": texts})
-    preds = _MODEL.predict(df)
+def run(raw_data: Any) -> dict[str, Any]:
+    if _MODEL is None:
+        raise RuntimeError("Model is not loaded. init() was not called?")
 
-    pred_list = [int(x) for x in list(preds)]
+    start = time.perf_counter()
+    IN_FLIGHT.inc()
+    try:
+        with collect_stages() as stages:
+            with stage("parse"):
+                payload = _CODEC.loads(raw_data) if isinstance(raw_data, str | bytes) else raw_data
+            with stage("normalize"):
+                texts = _normalize_payload(payload)
+            with stage("predict"):
+                predict_fn = _BATCHER.submit if _BATCHER is not None else _predict
+                pred_list = (
+                    _CACHE.predict(texts, predict_fn) if _CACHE is not None else predict_fn(texts)
+                )
+    finally:
+        IN_FLIGHT.dec()
     elapsed_ms = int((time.perf_counter() - start) * 1000)
 
-    return {"predictions": pred_list, "latency_ms": elapsed_ms}
+    response: dict[str, Any] = {
+        "predictions": pred_list,
+        "latency_ms": elapsed_ms,
+        "model_version": _VERSION,
+    }
+    if _INCLUDE_STAGES:
+        response["stages_ms"] = stages
+    if _INCLUDE_STATS:
+        if _BATCHER is not None:
+            response["batching"] = _BATCHER.stats()
+        if _CACHE is not None:
+            response["cache"] = _CACHE.stats()
+    return response
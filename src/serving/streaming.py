@@ -0,0 +1,117 @@
+from __future__ import annotations
+
+from collections.abc import Callable, Iterable, Iterator
+from typing import Any, BinaryIO
+
+from .codec import STDLIB, JsonCodec
+from .metrics import stage
+
+_READ_SIZE = 64 * 1024
+
+
+class StreamError(ValueError):
+    pass
+
+
+def iter_chunked_body(rfile: BinaryIO) -> Iterator[bytes]:
+    """Decode a Transfer-Encoding: chunked request body into raw blocks."""
+    while True:
+        size_line = rfile.readline(1024)
+        if not size_line:
+            raise StreamError("Connection closed inside chunked body")
+        try:
+            size = int(size_line.split(b";", 1)[0].strip(), 16)
+        except ValueError as exc:
+            raise StreamError(f"Bad chunk size line: {size_line!r}") from exc
+        if size == 0:
+            # Skip optional trailers up to the terminating blank line.
+            while rfile.readline(1024) not in (b"\r\n", b"\n", b""):
+                pass
+            return
+        remaining = size
+        while remaining:
+            block = rfile.read(min(remaining, _READ_SIZE))
+            if not block:
+                raise StreamError("Connection closed inside chunk")
+            remaining -= len(block)
+            yield block
+        rfile.readline(1024)  # CRLF after each chunk
+
+
+def iter_length_body(rfile: BinaryIO, length: int) -> Iterator[bytes]:
+    remaining = length
+    while remaining:
+        block = rfile.read(min(remaining, _READ_SIZE))
+        if not block:
+            raise StreamError("Connection closed before Content-Length bytes were read")
+        remaining -= len(block)
+        yield block
+
+
+def iter_lines(blocks: Iterable[bytes], max_line_bytes: int) -> Iterator[bytes]:
+    """Split a stream of blocks into lines without ever buffering more than one line."""
+    buf = b""
+    for block in blocks:
+        buf += block
+        *lines, buf = buf.split(b"\n")
+        yield from lines
+        if len(buf) > max_line_bytes:
+            raise StreamError(f"Line exceeds {max_line_bytes} bytes")
+    if buf:
+        yield buf
+
+
+def _parse_line(line: bytes, codec: JsonCodec) -> str:
+    item = codec.loads(line)
+    if isinstance(item, dict) and "text" in item:
+        return str(item["text"])
+    if isinstance(item, str):
+        return item
+    raise ValueError('Expected a JSON string or {"text": "..."} per line')
+
+
+def score_ndjson(
+    lines: Iterable[bytes],
+    predict_fn: Callable[[list[str]], list[int]],
+    batch_size: int = 256,
+    codec: JsonCodec = STDLIB,
+) -> Iterator[bytes]:
+    """Score NDJSON input lines in fixed-size batches, yielding one NDJSON block per batch.
+
+    Output lines are {"i": <input line index>, "prediction": <int>} in input order; lines that
+    do not parse yield {"i": ..., "error": "..."} instead and do not stop the stream. Each
+    batch is timed into the parse, predict and serialize stages, like a /score request.
+    """
+    index = 0
+    batch: list[tuple[int, bytes]] = []
+
+    def flush() -> bytes:
+        texts: list[tuple[int, str]] = []
+        records: list[tuple[int, dict[str, Any]]] = []
+        with stage("parse"):
+            for i, line in batch:
+                try:
+                    texts.append((i, _parse_line(line, codec)))
+                except ValueError as exc:
+                    records.append((i, {"i": i, "error": str(exc)}))
+        with stage("predict"):
+            preds = predict_fn([t for _, t in texts]) if texts else []
+        with stage("serialize"):
+            records += [
+                (i, {"i": i, "prediction": p}) for (i, _), p in zip(texts, preds, strict=True)
+            ]
+            records.sort(key=lambda r: r[0])
+            batch.clear()
+            return b"".join(codec.dumps(r) + b"\n" for _, r in records)
+
+    for raw in lines:
+        line = raw.strip()
+        if not line:
+            continue
+        batch.append((index, line))
+        index += 1
+        if len(batch) >= batch_size:
+            yield flush()
+
+    if batch:
+        yield flush()
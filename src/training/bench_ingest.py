@@ -0,0 +1,83 @@
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+TRAINING_DIR = Path(__file__).resolve().parent
+
+# Runs in a fresh interpreter per measurement, so each peak RSS belongs to one load only.
+# Reads /proc, so it is Linux-only.
+_CHILD = """
+import json, sys, time
+from pathlib import Path
+import train
+
+def status_mb(field):
+    with open("/proc/self/status") as f:
+        return next(int(line.split()[1]) for line in f if line.startswith(field)) / 1024
+
+baseline = status_mb("VmRSS:")
+with open("/proc/self/clear_refs", "w") as f:
+    f.write("5")  # reset the peak (VmHWM) to the current RSS, dropping the import spike
+start = time.perf_counter()
+x, y = train.load_dataset(Path(sys.argv[1]))
+seconds = time.perf_counter() - start
+peak = status_mb("VmHWM:")
+print(json.dumps({
+    "rows": len(x),
+    "load_s": seconds,
+    "peak_rss_mb": peak,
+    "load_rss_mb": peak - baseline,
+}))
+"""
+
+
+def measure(data_path: Path) -> dict[str, float]:
+    proc = subprocess.run(
+        [sys.executable, "-c", _CHILD, str(data_path.resolve())],
+        cwd=TRAINING_DIR,
+        env={**os.environ, "LOG_LEVEL": "WARNING"},
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    result: dict[str, float] = json.loads(proc.stdout.strip().splitlines()[-1])
+    return result
+
+
+def parse_args() -> argparse.Namespace:
+    p = argparse.ArgumentParser(description="Dataset load time and peak memory: CSV vs Parquet.")
+    p.add_argument("--csv", type=Path, required=True, help="Training CSV with text,label")
+    p.add_argument("--rows-per-file", type=int, default=250_000, help="Parquet folder layout")
+    p.add_argument("--repeats", type=int, default=3, help="Best of N for load time")
+    return p.parse_args()
+
+
+if __name__ == "__main__":
+    sys.path.insert(0, str(TRAINING_DIR))
+    from dataset import convert_csv
+
+    args = parse_args()
+    with tempfile.TemporaryDirectory() as tmp:
+        single = Path(tmp) / "single"
+        folder = Path(tmp) / "folder"
+        convert_csv(args.csv, single, rows_per_file=sys.maxsize)
+        convert_csv(args.csv, folder, rows_per_file=args.rows_per_file)
+        inputs = {
+            "csv": args.csv,
+            "parquet file": next(single.iterdir()),
+            "parquet folder": folder,
+        }
+        print(f"{'format':<16}{'rows':>10}{'load s':>9}{'peak RSS MB':>13}{'load RSS MB':>13}")
+        for name, path in inputs.items():
+            runs = [measure(path) for _ in range(args.repeats)]
+            best = min(runs, key=lambda r: r["load_s"])
+            print(
+                f"{name:<16}{best['rows']:>10.0f}{best['load_s']:>9.2f}"
+                f"{best['peak_rss_mb']:>13.0f}{best['load_rss_mb']:>13.0f}"
+            )
@@ -0,0 +1,37 @@
+from __future__ import annotations
+
+import argparse
+import logging
+import os
+from pathlib import Path
+
+try:
+    from .dataset import convert_csv
+except ImportError:  # run as `python convert_dataset.py` from src/training
+    from dataset import convert_csv  # type: ignore[no-redef]
+
+
+def parse_args() -> argparse.Namespace:
+    p = argparse.ArgumentParser(
+        description="One-time conversion of a training CSV to a folder of Parquet files."
+    )
+    p.add_argument("--input", type=Path, required=True, help="CSV with text,label columns")
+    p.add_argument("--output-dir", type=Path, required=True, help="Folder for part-*.parquet")
+    p.add_argument("--rows-per-file", type=int, default=1_000_000)
+    p.add_argument("--compression", default="zstd", help="Parquet codec (zstd, snappy, none)")
+    return p.parse_args()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(
+        level=os.getenv("LOG_LEVEL", "INFO"),
+        format="%(asctime)s %(levelname)s %(name)s - %(message)s",
+    )
+    args = parse_args()
+    files = convert_csv(
+        args.input,
+        args.output_dir,
+        rows_per_file=args.rows_per_file,
+        compression=args.compression,
+    )
+    print(f"Wrote {len(files)} file(s) to {args.output_dir}")
@@ -0,0 +1,127 @@
+from __future__ import annotations
+
+import logging
+from collections.abc import Iterator
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+LOG = logging.getLogger("training.dataset")
+
+COLUMNS = ("text", "label")
+SCHEMA = pa.schema([("text", pa.string()), ("label", pa.int64())])
+PARQUET_SUFFIXES = (".parquet", ".pq")
+
+
+def is_parquet(path: Path) -> bool:
+    """A Parquet file, or a folder (an Azure ML uri_folder) of Parquet files."""
+    return path.is_dir() or path.suffix.lower() in PARQUET_SUFFIXES
+
+
+def parquet_files(path: Path) -> list[Path]:
+    """The Parquet files under path, in a stable order; hive-style subfolders are included."""
+    if not path.is_dir():
+        return [path]
+    files = sorted(
+        p
+        for p in path.rglob("*")
+        if p.is_file()
+        and p.suffix.lower() in PARQUET_SUFFIXES
+        and not p.name.startswith((".", "_"))
+    )
+    if not files:
+        raise ValueError(f"No Parquet files under {path}")
+    return files
+
+
+def _check_columns(path: Path, names: list[str]) -> None:
+    missing = [c for c in COLUMNS if c not in names]
+    if missing:
+        raise ValueError(f'{path} must contain columns: "text", "label" (missing {missing})')
+
+
+def read_parquet(path: Path) -> pa.Table:
+    """Read only the text and label columns, cast to string and int64.
+
+    Files are scanned by Arrow's thread pool, so the files of a partitioned folder and the row
+    groups within each file are decoded in parallel. Rows keep the order of parquet_files().
+    """
+    files = parquet_files(path)
+    _check_columns(path, pq.read_schema(files[0]).names)
+    dataset = ds.dataset([str(f) for f in files], format="parquet")
+    table = dataset.to_table(columns=list(COLUMNS), use_threads=True)
+    text = pc.fill_null(table.column("text").cast(pa.string()), "")
+    label = table.column("label").cast(pa.int64())
+    return pa.table([text, label], schema=SCHEMA)
+
+
+def load_parquet(path: Path) -> tuple[pd.Series, pd.Series]:
+    """Texts come back Arrow-backed (string[pyarrow]) rather than as one Python str per row."""
+    table = read_parquet(path)
+    LOG.info("Read %s rows from %s Parquet file(s)", table.num_rows, len(parquet_files(path)))
+    x = table.column("text").to_pandas(types_mapper=pd.ArrowDtype).rename("text")
+    y = table.column("label").to_pandas().rename("label")
+    return x, y
+
+
+def iter_parquet_batches(path: Path, batch_rows: int) -> Iterator[tuple[list[str], np.ndarray]]:
+    """Yield (texts, labels) batches of at most batch_rows rows, one file at a time."""
+    for f in parquet_files(path):
+        pf = pq.ParquetFile(f)
+        _check_columns(f, pf.schema_arrow.names)
+        for batch in pf.iter_batches(batch_size=batch_rows, columns=list(COLUMNS)):
+            text = pc.fill_null(batch.column("text").cast(pa.string()), "")
+            label = batch.column("label").cast(pa.int64())
+            yield text.to_pylist(), label.to_numpy()
+
+
+def convert_csv(
+    csv_path: Path,
+    output_dir: Path,
+    rows_per_file: int = 1_000_000,
+    block_bytes: int = 64 << 20,
+    compression: str = "zstd",
+) -> list[Path]:
+    """Convert a training CSV to a folder of Parquet files with rows_per_file rows each.
+
+    The CSV is streamed in block_bytes blocks, so memory stays flat whatever its size. Only the
+    text and label columns are kept, typed string and int64, and an empty text becomes "".
+    """
+    import pyarrow.csv as pacsv
+
+    output_dir.mkdir(parents=True, exist_ok=True)
+    reader = pacsv.open_csv(
+        csv_path,
+        read_options=pacsv.ReadOptions(block_size=block_bytes),
+        convert_options=pacsv.ConvertOptions(
+            include_columns=list(COLUMNS), column_types=SCHEMA, strings_can_be_null=False
+        ),
+    )
+    written: list[Path] = []
+    writer: pq.ParquetWriter | None = None
+    rows_in_file = 0
+    try:
+        for batch in reader:
+            start = 0
+            while start < batch.num_rows:
+                if writer is None:
+                    written.append(output_dir / f"part-{len(written):05d}.parquet")
+                    writer = pq.ParquetWriter(written[-1], SCHEMA, compression=compression)
+                    rows_in_file = 0
+                take = min(batch.num_rows - start, rows_per_file - rows_in_file)
+                writer.write_batch(batch.slice(start, take))
+                start += take
+                rows_in_file += take
+                if rows_in_file == rows_per_file:
+                    writer.close()
+                    writer = None
+    finally:
+        if writer is not None:
+            writer.close()
+    LOG.info("Converted %s into %s Parquet file(s) in %s", csv_path, len(written), output_dir)
+    return written
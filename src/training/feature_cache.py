@@ -0,0 +1,154 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import pickle
+import shutil
+import time
+from contextlib import suppress
+from dataclasses import dataclass
+from importlib import metadata
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+import scipy.sparse as sp
+
+LOG = logging.getLogger("training.feature_cache")
+
+_MATRICES = ("x_train", "x_test")
+_CSR_PARTS = ("data", "indices", "indptr")
+
+
+@dataclass(frozen=True)
+class FeatureSet:
+    """A fitted vectorizer and the train/test matrices and labels it produced."""
+
+    vectorizer: Any
+    x_train: sp.csr_matrix
+    x_test: sp.csr_matrix
+    y_train: np.ndarray
+    y_test: np.ndarray
+
+
+def file_digest(path: Path, block_bytes: int = 1 << 20) -> str:
+    """Hash a file's contents, or a folder's file names and contents."""
+    h = hashlib.blake2b(digest_size=16)
+    files = sorted(p for p in path.rglob("*") if p.is_file()) if path.is_dir() else [path]
+    for file in files:
+        if path.is_dir():
+            h.update(file.relative_to(path).as_posix().encode("utf-8") + b"\0")
+        with file.open("rb") as f:
+            while block := f.read(block_bytes):
+                h.update(block)
+    return h.hexdigest()
+
+
+def _dir_bytes(path: Path) -> int:
+    return sum(p.stat().st_size for p in path.iterdir() if p.is_file())
+
+
+class FeatureCache:
+    """On-disk cache of FeatureSets, one folder per key under cache_dir.
+
+    The matrices are stored as their CSR component arrays in .npy files and loaded with
+    mmap_mode="r", so a hit costs a few page-ins instead of re-reading the CSV and re-fitting
+    TF-IDF. Entries are written to a temporary folder and renamed into place, so a crashed or
+    concurrent run never sees half an entry. After each put, least recently used entries are
+    removed until the cache fits in max_bytes.
+    """
+
+    def __init__(self, cache_dir: Path, max_bytes: int = 2 * 1024**3) -> None:
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+
+    def key(self, data_path: Path, params: dict[str, Any]) -> str:
+        """Content hash of the input plus everything that shapes the features."""
+        spec = {
+            "data": file_digest(data_path),
+            "params": params,
+            # The vectorizer is pickled, and pickles only load on the release that wrote them.
+            "sklearn": metadata.version("scikit-learn"),
+        }
+        blob = json.dumps(spec, sort_keys=True, default=str).encode("utf-8")
+        return hashlib.sha256(blob).hexdigest()[:16]
+
+    def get(self, key: str) -> FeatureSet | None:
+        entry = self.cache_dir / key
+        meta_path = entry / "meta.json"
+        if not meta_path.exists():
+            return None
+        try:
+            meta = json.loads(meta_path.read_text(encoding="utf-8"))
+            with (entry / "vectorizer.pkl").open("rb") as f:
+                vectorizer = pickle.load(f)
+            matrices = {
+                name: sp.csr_matrix(
+                    tuple(
+                        np.load(entry / f"{name}.{part}.npy", mmap_mode="r") for part in _CSR_PARTS
+                    ),
+                    shape=tuple(meta["shapes"][name]),
+                    copy=False,
+                )
+                for name in _MATRICES
+            }
+            features = FeatureSet(
+                vectorizer,
+                matrices["x_train"],
+                matrices["x_test"],
+                np.load(entry / "y_train.npy"),
+                np.load(entry / "y_test.npy"),
+            )
+        except Exception:
+            LOG.warning("Feature cache entry %s is unreadable; rebuilding it", key, exc_info=True)
+            shutil.rmtree(entry, ignore_errors=True)
+            return None
+        # Last use, for eviction; a read-only or shared cache dir still serves the hit.
+        with suppress(OSError):
+            os.utime(meta_path)
+        return features
+
+    def put(self, key: str, features: FeatureSet) -> None:
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        tmp = self.cache_dir / f".{key}.{os.getpid()}.tmp"
+        shutil.rmtree(tmp, ignore_errors=True)
+        tmp.mkdir()
+        try:
+            with (tmp / "vectorizer.pkl").open("wb") as f:
+                pickle.dump(features.vectorizer, f, protocol=pickle.HIGHEST_PROTOCOL)
+            shapes = {}
+            for name in _MATRICES:
+                matrix = sp.csr_matrix(getattr(features, name))
+                shapes[name] = list(matrix.shape)
+                for part in _CSR_PARTS:
+                    np.save(tmp / f"{name}.{part}.npy", getattr(matrix, part))
+            np.save(tmp / "y_train.npy", np.asarray(features.y_train))
+            np.save(tmp / "y_test.npy", np.asarray(features.y_test))
+            # meta.json goes last: get() treats an entry without it as absent.
+            meta = {"shapes": shapes, "created": time.time()}
+            (tmp / "meta.json").write_text(json.dumps(meta), encoding="utf-8")
+            os.replace(tmp, self.cache_dir / key)
+        except OSError:
+            # Another run may have stored the same key first; either copy is valid.
+            LOG.warning("Could not store feature cache entry %s", key, exc_info=True)
+            shutil.rmtree(tmp, ignore_errors=True)
+            return
+        self.evict(keep=key)
+
+    def evict(self, keep: str = "") -> None:
+        entries = []
+        for entry in self.cache_dir.iterdir():
+            meta_path = entry / "meta.json"
+            if entry.is_dir() and meta_path.exists():
+                entries.append((meta_path.stat().st_mtime, entry, _dir_bytes(entry)))
+        total = sum(size for _, _, size in entries)
+        for _, entry, size in sorted(entries, key=lambda e: e[0]):
+            if total <= self.max_bytes:
+                break
+            if entry.name == keep:
+                continue
+            LOG.info("Evicting feature cache entry %s (%s bytes)", entry.name, size)
+            shutil.rmtree(entry, ignore_errors=True)
+            total -= size
@@ -0,0 +1,184 @@
+from __future__ import annotations
+
+import gzip
+import json
+import logging
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+import scipy.sparse as sp
+from sklearn.feature_extraction.text import CountVectorizer, TfidfTransformer, TfidfVectorizer
+from sklearn.linear_model import LogisticRegression, SGDClassifier
+from sklearn.pipeline import Pipeline
+
+LOG = logging.getLogger("training.incremental")
+
+STATE_FILE = "retrain_state.json"
+# Labeled log rows held out for evaluation by a retrain; the next retrain trains on them.
+HOLDOUT_FILE = "retrain_holdout.json.gz"
+
+
+@dataclass(frozen=True)
+class RetrainState:
+    """What an incremental retrain needs to know about the model it starts from.
+
+    Saved as retrain_state.json in every retrained model folder. For a model saved by a full
+    train.py run it is derived from that run's metrics.json (see load_state).
+    """
+
+    # ts_utc of the newest log record already ingested; None: none yet. Records up to
+    # lookback before it are read again, and those in `seen` are skipped.
+    watermark: str | None
+    # Training documents behind the IDF statistics and the classifier.
+    idf_docs: int
+    # Rows a full retrain would now load (the original data plus every ingested record), and
+    # the last full run's cost per row before saving, to estimate what a full retrain costs.
+    full_rows: int
+    full_seconds_per_row: float
+    # prediction_logs.record_key -> ts_utc of the records ingested within the lookback.
+    seen: dict[str, str] = field(default_factory=dict)
+
+    def full_retrain_estimate_s(self, new_rows: int) -> float:
+        return self.full_seconds_per_row * (self.full_rows + new_rows)
+
+    def save(self, model_dir: Path) -> None:
+        (model_dir / STATE_FILE).write_text(json.dumps(asdict(self), indent=2), encoding="utf-8")
+
+
+def load_state(model_dir: Path) -> RetrainState:
+    path = model_dir / STATE_FILE
+    if path.exists():
+        return RetrainState(**json.loads(path.read_text(encoding="utf-8")))
+    metrics_path = model_dir / "metrics.json"
+    metrics: dict[str, Any] = (
+        json.loads(metrics_path.read_text(encoding="utf-8")) if metrics_path.exists() else {}
+    )
+    if "feature_cache_read_wall_s" in metrics and "vectorize_wall_s" not in metrics:
+        raise ValueError(
+            f"{model_dir} was trained from a --feature-cache hit, so its run did not load or "
+            "vectorize the data and says nothing about what a full retrain costs; retrain "
+            "it once without --feature-cache before retraining incrementally"
+        )
+    if not metrics.get("fit_rows") or not metrics.get("load_rows"):
+        raise ValueError(
+            f"{model_dir} has no {STATE_FILE} and its metrics.json lacks the profiled row "
+            "counts (fit_rows, load_rows); retrain it once with the current train.py"
+        )
+    return RetrainState(
+        watermark=None,
+        idf_docs=int(metrics["fit_rows"]),
+        full_rows=int(metrics["load_rows"]),
+        full_seconds_per_row=(float(metrics["total_wall_s"]) - float(metrics.get("save_wall_s", 0)))
+        / int(metrics["load_rows"]),
+    )
+
+
+def check_retrainable(model: Any, model_dir: Path) -> tuple[TfidfVectorizer, LogisticRegression]:
+    """The pipeline's TF-IDF and binary LogisticRegression, or ValueError for other models.
+
+    A --streaming model (hashed features and an SGDClassifier) has no vocabulary to refresh,
+    so it is rejected before any logs are read.
+    """
+    steps = model.named_steps if isinstance(model, Pipeline) else {}
+    tfidf, clf = steps.get("tfidf"), steps.get("clf")
+    if not isinstance(tfidf, TfidfVectorizer) or not isinstance(clf, LogisticRegression):
+        raise ValueError(
+            f"{model_dir} is not a TfidfVectorizer + LogisticRegression pipeline (a --streaming "
+            "model hashes its features and has no vocabulary); incremental retraining needs "
+            "a model from a full train.py run"
+        )
+    if clf.coef_.shape[0] != 1:
+        raise ValueError(f"{model_dir} is not a binary classifier; retrain it in full")
+    return tfidf, clf
+
+
+def save_holdout(model_dir: Path, texts: list[str], labels: list[int]) -> None:
+    data = json.dumps({"texts": texts, "labels": labels}, ensure_ascii=False)
+    (model_dir / HOLDOUT_FILE).write_bytes(gzip.compress(data.encode("utf-8"), mtime=0))
+
+
+def load_holdout(model_dir: Path) -> tuple[list[str], list[int]]:
+    """The rows the previous retrain held out, or none for a model from a full run."""
+    path = model_dir / HOLDOUT_FILE
+    if not path.exists():
+        return [], []
+    data = json.loads(gzip.decompress(path.read_bytes()))
+    return list(data["texts"]), [int(y) for y in data["labels"]]
+
+
+def count_terms(tfidf: TfidfVectorizer, texts: Any) -> sp.csr_matrix:
+    """Raw term counts over the vectorizer's vocabulary (its transform before weighting)."""
+    counter = CountVectorizer(
+        analyzer=tfidf.build_analyzer(),
+        vocabulary=tfidf.vocabulary_,
+        binary=tfidf.binary,
+        dtype=tfidf.dtype,
+    )
+    return counter.transform(texts)
+
+
+def weigh(tfidf: TfidfVectorizer, counts: sp.csr_matrix) -> sp.csr_matrix:
+    """What tfidf.transform would return for the texts behind counts, with its current IDF."""
+    transformer = TfidfTransformer(
+        norm=tfidf.norm,
+        use_idf=tfidf.use_idf,
+        smooth_idf=tfidf.smooth_idf,
+        sublinear_tf=tfidf.sublinear_tf,
+    )
+    transformer.idf_ = tfidf.idf_
+    return transformer.transform(counts)
+
+
+def refresh_idf(tfidf: TfidfVectorizer, idf_docs: int, x_new: sp.csr_matrix) -> int:
+    """Fold the new documents into the vectorizer's IDF; returns the new document count.
+
+    With smooth_idf, idf = ln((1 + n) / (1 + df)) + 1, so the previous document frequencies
+    can be recovered exactly from idf_ and n. x_new is the new documents' count_terms (any
+    matrix with the same non-zero pattern works). The vocabulary stays as it was.
+    """
+    if not tfidf.smooth_idf:
+        raise ValueError("refresh_idf needs a vectorizer fitted with smooth_idf=True")
+    df = np.rint((1 + idf_docs) * np.exp(1.0 - tfidf.idf_) - 1.0)
+    df += np.bincount(x_new.indices, minlength=df.size)
+    n = idf_docs + x_new.shape[0]
+    tfidf.idf_ = np.log((1 + n) / (1 + df)) + 1.0
+    return n
+
+
+def update_classifier(
+    clf: LogisticRegression,
+    x: sp.csr_matrix,
+    y: np.ndarray,
+    idf_docs: int,
+    epochs: int,
+    eta0: float,
+    random_state: int,
+) -> None:
+    """Continue training a binary LogisticRegression on new rows with SGD, in place.
+
+    The SGD model starts from the current coefficients and takes `epochs` passes over the
+    new rows at a constant step of eta0, with the L2 strength LogisticRegression's C gives
+    over idf_docs documents. The result is copied back, so the pipeline keeps its
+    LogisticRegression and the compact scorer export still applies.
+    """
+    if clf.coef_.shape[0] != 1:
+        raise ValueError("Incremental updates only support binary classifiers")
+    sgd = SGDClassifier(
+        loss="log_loss",
+        alpha=1.0 / (clf.C * idf_docs),
+        learning_rate="constant",
+        eta0=eta0,
+        random_state=random_state,
+    )
+    # partial_fit keeps coefficients that are already set, and takes the classes up front,
+    # so a batch of new rows that all share one label is still a valid update.
+    sgd.coef_ = clf.coef_.astype(np.float64, copy=True)
+    sgd.intercept_ = clf.intercept_.astype(np.float64, copy=True)
+    rng = np.random.default_rng(random_state)
+    for _ in range(epochs):
+        order = rng.permutation(x.shape[0])
+        sgd.partial_fit(x[order], y[order], classes=clf.classes_)
+    clf.coef_ = sgd.coef_
+    clf.intercept_ = sgd.intercept_
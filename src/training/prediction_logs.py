@@ -0,0 +1,185 @@
+from __future__ import annotations
+
+import gzip
+import hashlib
+import json
+import logging
+import re
+from collections.abc import Iterable, Iterator, Mapping
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any
+
+LOG = logging.getLogger("training.prediction_logs")
+
+# Blob names written by the Function's loggers, with "/" already replaced by "_" (which is
+# how the local fallback folder stores them):
+#   PredictionLogger: predictions/YYYY/MM/DD/HHMMSS-<uuid>.json, one record per file
+#   SegmentLogger:    predictions/YYYY/MM/DD/HH/<...>.jsonl.gz, gzip JSONL (maybe multi-member)
+_RECORD_NAME = re.compile(
+    r"^predictions_(\d{4})_(\d{2})_(\d{2})_(\d{2})(\d{2})(\d{2})-[^_]+\.json$"
+)
+_SEGMENT_NAME = re.compile(r"^predictions_(\d{4})_(\d{2})_(\d{2})_(\d{2})_.+\.jsonl\.gz$")
+
+# A record's ts_utc is taken when the request starts, and a segment can keep filling for a
+# while after the hour in its name, so a file is only skipped when the time in its name is
+# this much older than the watermark.
+PRUNE_MARGIN = timedelta(hours=1)
+SEGMENT_SPAN = timedelta(hours=1)  # the hour in a segment's name
+
+
+@dataclass(frozen=True)
+class LabeledLogs:
+    texts: list[str]
+    labels: list[int]
+    # Newest ts_utc among the labeled records. Unlabeled records are read again next time,
+    # in case a reviewer has labeled them by then.
+    newest: datetime | None
+    records: int
+    files: int
+    # record_key -> ts_utc of each labeled record read, so a later read can skip it.
+    keys: dict[str, str]
+    # Labeled records at or before `since`, not seen before, in the files that were read.
+    # They are not used: a full retrain picks them up.
+    late: int
+
+
+def parse_ts(value: str) -> datetime:
+    ts = datetime.fromisoformat(value)
+    return ts if ts.tzinfo else ts.replace(tzinfo=timezone.utc)
+
+
+def name_period(name: str) -> tuple[datetime, datetime] | None:
+    """[start, end) of the time the Function wrote the file, from its (flattened) name."""
+    flat = name.replace("/", "_")
+    if m := _RECORD_NAME.match(flat):
+        fmt, width = "%Y%m%d%H%M%S", timedelta(seconds=1)
+    elif m := _SEGMENT_NAME.match(flat):
+        fmt, width = "%Y%m%d%H", SEGMENT_SPAN
+    else:
+        return None
+    start = datetime.strptime("".join(m.groups()), fmt).replace(tzinfo=timezone.utc)
+    return start, start + width
+
+
+def may_hold_newer(name: str, since: datetime | None) -> bool:
+    period = name_period(name)
+    if period is None:
+        return False
+    return since is None or period[1] + PRUNE_MARGIN > since
+
+
+def record_key(raw: bytes) -> str:
+    """Fingerprint of a record as written; labeling it later rewrites it, so the key changes."""
+    return hashlib.blake2b(raw.strip(), digest_size=12).hexdigest()
+
+
+def parse_records(name: str, data: bytes) -> list[tuple[bytes, dict[str, Any]]]:
+    """(raw bytes, record) of each record in a log file."""
+    if name.endswith(".gz"):
+        lines = gzip.decompress(data).splitlines()
+        return [(line, json.loads(line)) for line in lines if line.strip()]
+    return [(data, json.loads(data))]
+
+
+def labeled_examples(record: dict[str, Any]) -> Iterator[tuple[str, int]]:
+    """(text, label) pairs of a record that has been labeled or reviewed.
+
+    The Function logs `input.text` (or `input.texts` for batches). A reviewer, or a labeling
+    job, adds `label` (or `labels`, aligned with `texts`); records without one are skipped.
+    """
+    inputs = record.get("input") or {}
+    if "text" in inputs and record.get("label") is not None:
+        yield str(inputs["text"]), int(record["label"])
+    elif "texts" in inputs and isinstance(record.get("labels"), list):
+        for text, label in zip(inputs["texts"], record["labels"], strict=False):
+            if label is not None:
+                yield str(text), int(label)
+
+
+def collect(
+    files: Iterable[tuple[str, bytes]],
+    since: datetime | None,
+    seen: Mapping[str, str],
+    file_count: int,
+) -> LabeledLogs:
+    """Labeled examples of the records after `since` whose record_key is not in seen."""
+    texts: list[str] = []
+    labels: list[int] = []
+    newest: datetime | None = None
+    records = late = 0
+    keys: dict[str, str] = {}
+    for name, data in files:
+        try:
+            batch = parse_records(name, data)
+        except (OSError, ValueError):
+            LOG.warning("Skipping unreadable log file %s", name, exc_info=True)
+            continue
+        for raw, record in batch:
+            ts = parse_ts(record["ts_utc"]) if record.get("ts_utc") else None
+            if ts is None:
+                continue
+            examples = list(labeled_examples(record))
+            old = since is not None and ts <= since
+            if old and not examples:
+                continue
+            key = record_key(raw)
+            if key in seen or key in keys:
+                continue
+            if old:
+                late += 1
+                continue
+            records += 1
+            if examples:
+                newest = ts if newest is None else max(newest, ts)
+                keys[key] = record["ts_utc"]
+            for text, label in examples:
+                texts.append(text)
+                labels.append(label)
+    LOG.info("Read %s new records (%s labeled) from %s log files", records, len(labels), file_count)
+    if late:
+        LOG.warning(
+            "Skipped %s labeled records from before %s; a full retrain picks them up", late, since
+        )
+    return LabeledLogs(texts, labels, newest, records, file_count, keys, late)
+
+
+def keep_seen(seen: Mapping[str, str], since: datetime) -> dict[str, str]:
+    """The seen keys that a read from `since` may meet again: its oldest files hold records
+    up to PRUNE_MARGIN plus a segment's hour before it."""
+    cutoff = since - PRUNE_MARGIN - SEGMENT_SPAN
+    return {key: ts for key, ts in seen.items() if parse_ts(ts) > cutoff}
+
+
+def read_local_logs(log_dir: Path, since: datetime | None, seen: Mapping[str, str]) -> LabeledLogs:
+    """Read the Function's local fallback folder (LOCAL_BLOB_LOG_DIR/<container>)."""
+    paths = sorted(p for p in log_dir.iterdir() if p.is_file() and may_hold_newer(p.name, since))
+    return collect(((p.name, p.read_bytes()) for p in paths), since, seen, len(paths))
+
+
+def read_blob_logs(
+    connection_string: str,
+    container: str,
+    prefix: str,
+    since: datetime | None,
+    seen: Mapping[str, str],
+    max_workers: int = 16,
+) -> LabeledLogs:
+    """Read log blobs under prefix, downloading max_workers at a time."""
+    from azure.storage.blob import ContainerClient  # only blob ingestion needs the SDK
+
+    client = ContainerClient.from_connection_string(connection_string, container)
+    with client:
+        names = sorted(
+            b.name
+            for b in client.list_blobs(name_starts_with=prefix)
+            if may_hold_newer(b.name, since)
+        )
+
+        def download(name: str) -> tuple[str, bytes]:
+            return name, client.download_blob(name).readall()
+
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            return collect(pool.map(download, names), since, seen, len(names))
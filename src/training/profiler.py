@@ -0,0 +1,149 @@
+from __future__ import annotations
+
+import cProfile
+import logging
+import os
+import pstats
+import sys
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+
+LOG = logging.getLogger("training.profiler")
+
+_PROC_STATUS = Path("/proc/self/status")
+_PROC_CLEAR_REFS = Path("/proc/self/clear_refs")
+
+
+def _proc_status_mb(field: str) -> float | None:
+    try:
+        with _PROC_STATUS.open(encoding="ascii") as f:
+            for line in f:
+                if line.startswith(field):
+                    return int(line.split()[1]) / 1024  # kB
+    except OSError:
+        pass
+    return None
+
+
+def reset_peak_rss() -> bool:
+    """Reset the kernel's peak RSS (VmHWM) to the current RSS; Linux only.
+
+    This also resets the process's ru_maxrss, which StageProfiler.metrics() makes up for by
+    reporting the largest phase peak as peak_rss_mb.
+    """
+    try:
+        _PROC_CLEAR_REFS.write_text("5", encoding="ascii")
+    except OSError:
+        return False
+    return True
+
+
+def peak_rss_mb() -> float:
+    """Peak RSS since the last reset_peak_rss(), or since process start where it can't reset."""
+    hwm = _proc_status_mb("VmHWM:")
+    if hwm is not None:
+        return hwm
+    try:
+        import resource
+    except ImportError:  # Windows
+        return 0.0
+    maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return maxrss / 1024**2 if sys.platform == "darwin" else maxrss / 1024
+
+
+def cpu_seconds() -> float:
+    """User + system CPU of this process and its finished children (e.g. search workers)."""
+    t = os.times()
+    return t.user + t.system + t.children_user + t.children_system
+
+
+@dataclass
+class Phase:
+    """One timed phase. rows and nnz are filled in by the code inside the phase."""
+
+    name: str
+    wall_s: float = 0.0
+    cpu_s: float = 0.0
+    peak_rss_mb: float = 0.0
+    rows: int = 0
+    nnz: int = 0
+
+    def metrics(self) -> dict[str, float]:
+        out = {
+            f"{self.name}_wall_s": self.wall_s,
+            f"{self.name}_cpu_s": self.cpu_s,
+            f"{self.name}_peak_rss_mb": self.peak_rss_mb,
+        }
+        if self.rows:
+            out[f"{self.name}_rows"] = self.rows
+            out[f"{self.name}_rows_per_s"] = self.rows / self.wall_s if self.wall_s else 0.0
+        if self.nnz:
+            out[f"{self.name}_nnz"] = self.nnz
+        return out
+
+
+class StageProfiler:
+    """Per-phase wall time, CPU time and peak RSS for a training run.
+
+    Phases are flat and sequential: `with profiler.phase("fit") as p: ...; p.rows = n`. On
+    Linux each phase resets the kernel's peak RSS counter when it starts, so its peak_rss_mb
+    is the high-water mark within the phase; elsewhere it is the process peak so far.
+
+    Phases named in cprofile also run under cProfile; write_profiles() saves them.
+    """
+
+    def __init__(self, cprofile: tuple[str, ...] = ()) -> None:
+        self.phases: list[Phase] = []
+        self.cprofile = cprofile
+        self.profiles: dict[str, cProfile.Profile] = {}
+        self._start = time.perf_counter()
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[Phase]:
+        phase = Phase(name)
+        reset_peak_rss()
+        profile = cProfile.Profile() if name in self.cprofile else None
+        cpu, wall = cpu_seconds(), time.perf_counter()
+        if profile is not None:
+            profile.enable()
+        try:
+            yield phase
+        finally:
+            if profile is not None:
+                profile.disable()
+                self.profiles[name] = profile
+            phase.wall_s = time.perf_counter() - wall
+            phase.cpu_s = cpu_seconds() - cpu
+            phase.peak_rss_mb = peak_rss_mb()
+            self.phases.append(phase)
+            LOG.info(
+                "Phase %s: %.2f s wall, %.2f s CPU, peak RSS %.0f MB",
+                name,
+                phase.wall_s,
+                phase.cpu_s,
+                phase.peak_rss_mb,
+            )
+
+    def metrics(self) -> dict[str, float]:
+        out: dict[str, float] = {}
+        for phase in self.phases:
+            out.update(phase.metrics())
+        out["total_wall_s"] = time.perf_counter() - self._start
+        out["peak_rss_mb"] = max((p.peak_rss_mb for p in self.phases), default=peak_rss_mb())
+        return out
+
+    def write_profiles(self, output_dir: Path, top: int = 40) -> list[Path]:
+        """Save each cProfile as <phase>.prof (for snakeviz / pstats) and a text summary."""
+        output_dir.mkdir(parents=True, exist_ok=True)
+        written = []
+        for name, profile in self.profiles.items():
+            prof_path = output_dir / f"{name}.prof"
+            profile.dump_stats(prof_path)
+            txt_path = output_dir / f"{name}_profile.txt"
+            with txt_path.open("w", encoding="utf-8") as f:
+                pstats.Stats(profile, stream=f).sort_stats("cumulative").print_stats(top)
+            written += [prof_path, txt_path]
+        return written
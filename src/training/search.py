@@ -0,0 +1,157 @@
+from __future__ import annotations
+
+import itertools
+import logging
+import math
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass
+from typing import Any
+
+import numpy as np
+import scipy.sparse as sp
+from sklearn.feature_extraction.text import CountVectorizer, TfidfTransformer
+from sklearn.linear_model import LogisticRegression
+from sklearn.metrics import accuracy_score, f1_score
+
+LOG = logging.getLogger("training.search")
+
+SEARCH_MODES = ("grid", "random")
+
+
+@dataclass(frozen=True)
+class Candidate:
+    c: float
+    ngram_max: int
+    max_features: int
+
+
+@dataclass(frozen=True)
+class CandidateResult:
+    candidate: Candidate
+    metrics: dict[str, float]
+    fit_seconds: float
+
+
+@dataclass(frozen=True)
+class _Counts:
+    """Term counts for one ngram_max, shared by every candidate with that ngram_max."""
+
+    train: sp.csr_matrix
+    test: sp.csr_matrix
+    # Column indices by decreasing training term frequency, as TfidfVectorizer ranks them
+    # for max_features.
+    by_frequency: np.ndarray
+
+
+def build_space(
+    mode: str,
+    c_values: list[float],
+    ngram_values: list[int],
+    max_features_values: list[int],
+    trials: int,
+    random_state: int,
+) -> list[Candidate]:
+    """Grid: every combination. Random: `trials` draws, C log-uniform over its range."""
+    if mode == "grid":
+        return [
+            Candidate(c, n, m)
+            for c, n, m in itertools.product(c_values, ngram_values, max_features_values)
+        ]
+    if mode != "random":
+        raise ValueError(f"search mode must be one of {SEARCH_MODES}, got {mode!r}")
+    rng = np.random.default_rng(random_state)
+    lo, hi = math.log(min(c_values)), math.log(max(c_values))
+    return [
+        Candidate(
+            c=float(math.exp(rng.uniform(lo, hi))),
+            ngram_max=int(rng.choice(ngram_values)),
+            max_features=int(rng.choice(max_features_values)),
+        )
+        for _ in range(trials)
+    ]
+
+
+def count_ngrams(
+    x_train: list[str], x_test: list[str], ngram_max: int, vectorizer_params: dict[str, Any]
+) -> _Counts:
+    vec = CountVectorizer(ngram_range=(1, ngram_max), **vectorizer_params)
+    train = vec.fit_transform(x_train)
+    # Same ranking as TfidfVectorizer._limit_features over the alphabetically sorted
+    # vocabulary, so slicing the top max_features reproduces its feature selection.
+    term_freq = np.asarray(train.sum(axis=0)).ravel()
+    return _Counts(train, vec.transform(x_test), (-term_freq).argsort())
+
+
+# Set in each worker by _init_worker; the parent's counts are pickled once per worker
+# instead of once per candidate.
+_COUNTS: dict[int, _Counts] = {}
+_LABELS: tuple[np.ndarray, np.ndarray] | None = None
+
+
+def _init_worker(counts: dict[int, _Counts], y_train: np.ndarray, y_test: np.ndarray) -> None:
+    global _COUNTS, _LABELS
+    _COUNTS = counts
+    _LABELS = (y_train, y_test)
+
+
+def _evaluate(candidate: Candidate, max_iter: int) -> CandidateResult:
+    assert _LABELS is not None
+    y_train, y_test = _LABELS
+    start = time.perf_counter()
+    counts = _COUNTS[candidate.ngram_max]
+    cols = np.sort(counts.by_frequency[: candidate.max_features])
+    tfidf = TfidfTransformer()
+    x_train = tfidf.fit_transform(counts.train[:, cols])
+    x_test = tfidf.transform(counts.test[:, cols])
+    clf = LogisticRegression(C=candidate.c, max_iter=max_iter, n_jobs=1).fit(x_train, y_train)
+    y_pred = clf.predict(x_test)
+    metrics = {
+        "accuracy": float(accuracy_score(y_test, y_pred)),
+        "f1": float(f1_score(y_test, y_pred)),
+    }
+    return CandidateResult(candidate, metrics, time.perf_counter() - start)
+
+
+def run_search(
+    candidates: list[Candidate],
+    x_train: list[str],
+    y_train: np.ndarray,
+    x_test: list[str],
+    y_test: np.ndarray,
+    vectorizer_params: dict[str, Any],
+    max_iter: int,
+    n_jobs: int = 0,
+) -> list[CandidateResult]:
+    """Evaluate candidates in a process pool; results come back in candidate order.
+
+    Texts are tokenized and n-gram counted once per distinct ngram_max. Each candidate then
+    only slices its max_features columns, re-weights them with IDF and fits the classifier.
+    n_jobs=0 uses every core.
+    """
+    start = time.perf_counter()
+    counts = {
+        n: count_ngrams(x_train, x_test, n, vectorizer_params)
+        for n in sorted({c.ngram_max for c in candidates})
+    }
+    LOG.info(
+        "Counted n-grams for ngram_max %s in %.2f s", sorted(counts), time.perf_counter() - start
+    )
+    workers = min(n_jobs or os.cpu_count() or 1, len(candidates))
+    if workers <= 1:
+        _init_worker(counts, y_train, y_test)
+        return [_evaluate(c, max_iter) for c in candidates]
+    with ProcessPoolExecutor(
+        max_workers=workers, initializer=_init_worker, initargs=(counts, y_train, y_test)
+    ) as pool:
+        return list(pool.map(_evaluate, candidates, itertools.repeat(max_iter)))
+
+
+def best_result(results: list[CandidateResult], metric: str) -> CandidateResult:
+    # Ties go to the earlier candidate, which keeps grid results reproducible.
+    return max(results, key=lambda r: r.metrics[metric])
+
+
+def result_rows(results: list[CandidateResult]) -> list[dict[str, Any]]:
+    return [{**asdict(r.candidate), **r.metrics, "fit_seconds": r.fit_seconds} for r in results]
@@ -0,0 +1,167 @@
+from __future__ import annotations
+
+import logging
+import time
+from collections.abc import Iterator
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from sklearn.feature_extraction.text import HashingVectorizer, TfidfTransformer
+from sklearn.linear_model import SGDClassifier
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import FunctionTransformer
+
+try:
+    from .dataset import is_parquet, iter_parquet_batches
+except ImportError:  # Azure ML runs `python train.py` from src/training
+    from dataset import is_parquet, iter_parquet_batches  # type: ignore[no-redef]
+
+LOG = logging.getLogger("training.streaming")
+
+
+@dataclass(frozen=True)
+class StreamingResult:
+    model: Pipeline
+    metrics: dict[str, float]
+    train_rows: int
+    holdout_rows: int
+    seconds: float
+
+
+def iter_chunks(path: Path, chunk_rows: int) -> Iterator[tuple[list[str], np.ndarray]]:
+    """Yield (texts, labels) for chunk_rows rows at a time, reading only the two columns."""
+    if is_parquet(path):
+        yield from iter_parquet_batches(path, chunk_rows)
+        return
+    reader = pd.read_csv(
+        path,
+        usecols=["text", "label"],
+        dtype={"text": str},
+        keep_default_na=False,
+        chunksize=chunk_rows,
+    )
+    with reader:
+        for chunk in reader:
+            yield chunk["text"].tolist(), chunk["label"].to_numpy(dtype=np.int64)
+
+
+def holdout_mask(random_state: int, chunk_index: int, rows: int, test_size: float) -> np.ndarray:
+    return np.random.default_rng((random_state, chunk_index)).random(rows) < test_size
+
+
+def build_streaming_model(ngram_max: int, n_features: int, c: float) -> Pipeline:
+    """The in-memory model's steps, with hashing + IDF in place of TfidfVectorizer.
+
+    The IDF weights and the classifier are filled in by train_streaming; a pipeline loaded
+    from the saved MLflow model scores lists of texts (or the pyfunc DataFrame) as usual.
+    """
+    return Pipeline(
+        steps=[
+            ("flatten", FunctionTransformer(np.ravel)),
+            (
+                "hash",
+                HashingVectorizer(
+                    lowercase=True,
+                    stop_words="english",
+                    ngram_range=(1, ngram_max),
+                    n_features=n_features,
+                    alternate_sign=False,  # counts must stay non-negative for IDF
+                    norm=None,
+                ),
+            ),
+            ("tfidf", TfidfTransformer(norm="l2", smooth_idf=True)),
+            ("clf", SGDClassifier(loss="log_loss", alpha=1.0 / c)),
+        ]
+    )
+
+
+def train_streaming(
+    data_path: Path,
+    *,
+    test_size: float,
+    random_state: int,
+    ngram_max: int,
+    c: float,
+    n_features: int = 2**20,
+    chunk_rows: int = 50_000,
+    epochs: int = 3,
+) -> StreamingResult:
+    """Train out of core: chunked CSV reads, hashed features and an SGD classifier.
+
+    Memory is bounded by chunk_rows and n_features instead of the corpus: no vocabulary is
+    built and no chunk outlives its step. The CSV is read several times:
+
+    1. one pass counts, per hash bucket, how many training documents contain it (the IDF
+       statistics), and the training/holdout rows;
+    2. `epochs` passes call partial_fit on each chunk, shuffled within the chunk;
+    3. one pass predicts the holdout rows and accumulates the confusion counts.
+
+    Holdout rows are picked per chunk from a generator seeded with (random_state, chunk
+    index), so every pass agrees on them without keeping their indices around.
+    """
+    start = time.perf_counter()
+    model = build_streaming_model(ngram_max, n_features, c)
+    hasher: HashingVectorizer = model.named_steps["hash"]
+    tfidf: TfidfTransformer = model.named_steps["tfidf"]
+    clf: SGDClassifier = model.named_steps["clf"]
+
+    LOG.info("Streaming pass 1: document frequencies")
+    doc_freq = np.zeros(n_features, dtype=np.int64)
+    train_rows = holdout_rows = 0
+    classes: set[int] = set()
+    for k, (texts, labels) in enumerate(iter_chunks(data_path, chunk_rows)):
+        test = holdout_mask(random_state, k, len(texts), test_size)
+        train_texts = [t for t, is_test in zip(texts, test, strict=True) if not is_test]
+        counts = hasher.transform(train_texts)
+        doc_freq += np.bincount(counts.indices, minlength=n_features)
+        train_rows += len(train_texts)
+        holdout_rows += int(test.sum())
+        classes.update(np.unique(labels).tolist())
+    if train_rows == 0:
+        raise ValueError(f"No training rows in {data_path}")
+
+    # The smoothed IDF TfidfVectorizer uses, so the features match the in-memory model's.
+    tfidf.idf_ = np.log((1 + train_rows) / (1 + doc_freq)) + 1.0
+    # C is LogisticRegression's inverse regularization over the whole training set; SGD's
+    # alpha is per sample.
+    clf.set_params(alpha=1.0 / (c * train_rows))
+    all_classes = np.array(sorted(classes))
+
+    for epoch in range(epochs):
+        LOG.info("Streaming pass %s: epoch %s/%s", epoch + 2, epoch + 1, epochs)
+        for k, (texts, labels) in enumerate(iter_chunks(data_path, chunk_rows)):
+            train = ~holdout_mask(random_state, k, len(texts), test_size)
+            order = np.random.default_rng((random_state, epoch, k)).permutation(
+                np.flatnonzero(train)
+            )
+            if order.size == 0:
+                continue
+            x = tfidf.transform(hasher.transform([texts[i] for i in order]))
+            clf.partial_fit(x, labels[order], classes=all_classes)
+
+    LOG.info("Streaming pass %s: holdout metrics", epochs + 2)
+    tp = fp = fn = correct = 0
+    for k, (texts, labels) in enumerate(iter_chunks(data_path, chunk_rows)):
+        test = holdout_mask(random_state, k, len(texts), test_size)
+        if not test.any():
+            continue
+        y_true = labels[test]
+        y_pred = model.predict([t for t, is_test in zip(texts, test, strict=True) if is_test])
+        correct += int((y_pred == y_true).sum())
+        tp += int(((y_pred == 1) & (y_true == 1)).sum())
+        fp += int(((y_pred == 1) & (y_true != 1)).sum())
+        fn += int(((y_pred != 1) & (y_true == 1)).sum())
+
+    metrics = {
+        "accuracy": correct / holdout_rows if holdout_rows else 0.0,
+        "f1": 2 * tp / (2 * tp + fp + fn) if tp + fp + fn else 0.0,
+    }
+    return StreamingResult(
+        model=model,
+        metrics=metrics,
+        train_rows=train_rows,
+        holdout_rows=holdout_rows,
+        seconds=time.perf_counter() - start,
+    )
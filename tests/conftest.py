@@ -3,5 +3,27 @@ from __future__ import annotations
 import sys
 from pathlib import Path
 
+import pytest
+
 ROOT = Path(__file__).resolve().parents[1]
 sys.path.insert(0, str(ROOT))
+
+from src.training.train import TrainConfig, main  # noqa: E402
+
+
+@pytest.fixture(scope="session")
+def trained_model_dir(tmp_path_factory: pytest.TempPathFactory) -> Path:
+    """Train the sample model once per session for tests that need a real MLflow folder."""
+    model_out = tmp_path_factory.mktemp("trained") / "model"
+    cfg = TrainConfig(
+        data_path=ROOT / "data" / "spam_sample.csv",
+        output_dir=model_out,
+        test_size=0.2,
+        random_state=42,
+        max_features=2000,
+        ngram_max=2,
+        c=1.0,
+        max_iter=100,
+    )
+    assert main(cfg) == 0
+    return model_out
@@ -0,0 +1,222 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import threading
+import time
+from collections.abc import Iterator
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import aiohttp
+import pytest
+
+from src.functions.predict_function.shared_code import clients
+from src.functions.predict_function.shared_code.aml_async_client import (
+    AsyncAMLOnlineEndpointClient,
+)
+from src.functions.predict_function.shared_code.aml_client import (
+    AMLOnlineEndpointClient,
+    ChunkError,
+    build_session,
+)
+from src.functions.predict_function.shared_code.latency_guard import LatencyGuard
+from src.functions.predict_function.shared_code.settings import FunctionSettings
+
+
+class _StubScoring(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Client ports seen (one per request), statuses to return before answering normally, an
+    # artificial per-request delay (delays, if set, overrides it for the next requests) and
+    # the most requests seen in flight at once.
+    peers: list[int] = []
+    fail_with: list[int] = []
+    delay_s = 0.0
+    delays: list[float] = []
+    in_flight = 0
+    max_in_flight = 0
+    lock = threading.Lock()
+
+    def do_POST(self) -> None:
+        cls = type(self)
+        payload = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        with cls.lock:
+            cls.peers.append(self.client_address[1])
+            cls.in_flight += 1
+            cls.max_in_flight = max(cls.max_in_flight, cls.in_flight)
+            delay = cls.delays.pop(0) if cls.delays else cls.delay_s
+        time.sleep(delay)
+        with cls.lock:
+            cls.in_flight -= 1
+        texts = payload.get("texts", [payload.get("text")])
+        status = cls.fail_with.pop(0) if cls.fail_with else 200
+        if "boom" in texts:
+            status = 500
+        preds = [len(t) for t in texts]
+        body = json.dumps({"predictions": preds} if status == 200 else {"error": "busy"}).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args: object) -> None:
+        pass
+
+
+@pytest.fixture()
+def stub_url() -> Iterator[str]:
+    _StubScoring.peers = []
+    _StubScoring.fail_with = []
+    _StubScoring.delay_s = 0.0
+    _StubScoring.delays = []
+    _StubScoring.max_in_flight = 0
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _StubScoring)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        yield f"http://127.0.0.1:{server.server_address[1]}/score"
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_client_reuses_one_connection(stub_url: str) -> None:
+    client = AMLOnlineEndpointClient(stub_url, "key")
+    for _ in range(5):
+        assert client.predict("hello").predictions == [5]
+    assert len(_StubScoring.peers) == 5
+    assert len(set(_StubScoring.peers)) == 1
+    client.close()
+
+
+def test_client_retries_transient_statuses(stub_url: str) -> None:
+    _StubScoring.fail_with = [503, 429]
+    client = AMLOnlineEndpointClient(stub_url, "key", session=build_session(retries=2, backoff_s=0))
+    assert client.predict("hello").predictions == [5]
+    assert len(_StubScoring.peers) == 3
+    client.close()
+
+
+def test_process_clients_are_cached_per_settings(stub_url: str) -> None:
+    settings = FunctionSettings(stub_url, "key", None, "logs")
+    logger = clients.get_logger(settings)
+    assert clients.get_logger(FunctionSettings(stub_url, "key", None, "logs")) is logger
+
+    # Replacing the logger must not wait for the old one to flush.
+    closed = threading.Event()
+    release = threading.Event()
+
+    def slow_close() -> None:
+        release.wait(5)
+        closed.set()
+
+    logger.close = slow_close  # type: ignore[method-assign]
+    start = time.perf_counter()
+    assert clients.get_logger(FunctionSettings(stub_url, "key", None, "other")) is not logger
+    assert time.perf_counter() - start < 1.0
+    release.set()
+    assert closed.wait(5)
+
+    async def run() -> list[int]:
+        client = clients.get_async_client(settings)
+        assert clients.get_async_client(FunctionSettings(stub_url, "key", None, "logs")) is client
+        rotated = clients.get_async_client(FunctionSettings(stub_url, "new-key", None, "logs"))
+        assert rotated is not client
+        try:
+            return (await rotated.predict("hello")).predictions
+        finally:
+            await clients.close_async_client()
+
+    assert asyncio.run(run()) == [5]
+
+
+def test_predict_batch_fans_out_in_order_and_isolates_failed_chunks(stub_url: str) -> None:
+    _StubScoring.delay_s = 0.05
+    client = AMLOnlineEndpointClient(stub_url, "key", session=build_session(retries=0))
+    texts = ["x" * (i % 7 + 1) for i in range(50)]
+    texts[23] = "boom"
+
+    batch = client.predict_batch(texts, chunk_size=10, max_concurrency=3)
+
+    assert batch.chunks == 5
+    assert batch.errors == [ChunkError(start=20, end=30, error=batch.errors[0].error)]
+    assert "500" in batch.errors[0].error
+    expected: list[int | None] = [len(t) for t in texts]
+    expected[20:30] = [None] * 10
+    assert batch.predictions == expected
+    assert 1 < _StubScoring.max_in_flight <= 3
+    client.close()
+
+
+def test_async_client_pools_connections_and_retries(stub_url: str) -> None:
+    async def run() -> list[list[int]]:
+        client = AsyncAMLOnlineEndpointClient(stub_url, "key", backoff_s=0)
+        try:
+            results = [(await client.predict("hello")).predictions for _ in range(4)]
+            _StubScoring.fail_with = [503]
+            results.append((await client.predict("hi")).predictions)
+            return results
+        finally:
+            await client.close()
+
+    assert asyncio.run(run()) == [[5], [5], [5], [5], [2]]
+    assert len(_StubScoring.peers) == 6
+    assert len(set(_StubScoring.peers)) == 1
+
+
+def test_async_client_closes_its_session_when_the_loop_changes(stub_url: str) -> None:
+    client = AsyncAMLOnlineEndpointClient(stub_url, "key")
+
+    async def call() -> object:
+        await client.predict("hello")
+        return client._session
+
+    first = asyncio.run(call())  # each asyncio.run is a new event loop
+    second = asyncio.run(call())
+    assert second is not first
+    assert isinstance(first, aiohttp.ClientSession) and first.closed
+    asyncio.run(client.close())
+
+
+def test_async_predict_batch_matches_the_blocking_contract(stub_url: str) -> None:
+    _StubScoring.delay_s = 0.05
+    texts = ["x" * (i % 7 + 1) for i in range(50)]
+    texts[23] = "boom"
+
+    async def run() -> list[int | None]:
+        client = AsyncAMLOnlineEndpointClient(stub_url, "key", retries=0)
+        try:
+            batch = await client.predict_batch(texts, chunk_size=10, max_concurrency=3)
+        finally:
+            await client.close()
+        assert [(e.start, e.end) for e in batch.errors] == [(20, 30)]
+        return batch.predictions
+
+    expected: list[int | None] = [len(t) for t in texts]
+    expected[20:30] = [None] * 10
+    assert asyncio.run(run()) == expected
+    assert 1 < _StubScoring.max_in_flight <= 3
+
+
+def _warm_guard() -> LatencyGuard:
+    guard = LatencyGuard(min_samples=5, hedge_quantile=0.95, hedge_max_ratio=1.0)
+    for _ in range(5):
+        guard.record(0.2, ok=True)
+    return guard
+
+
+def test_async_slow_call_is_hedged_and_the_hedge_wins(stub_url: str) -> None:
+    guard = _warm_guard()
+
+    async def run() -> tuple[float, bool]:
+        client = AsyncAMLOnlineEndpointClient(stub_url, "key", guard=guard)
+        _StubScoring.delays = [1.0]  # the original request hits a slow replica
+        try:
+            start = time.perf_counter()
+            pred = await client.predict("hello")
+            return time.perf_counter() - start, pred.hedged
+        finally:
+            await client.close()
+
+    elapsed, hedged = asyncio.run(run())
+    assert elapsed < 0.5 and hedged
+    assert (guard.stats()["hedges_fired"], guard.stats()["hedges_won"]) == (1, 1)
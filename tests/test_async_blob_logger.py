@@ -0,0 +1,99 @@
+from __future__ import annotations
+
+import json
+import threading
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+from src.functions.predict_function.shared_code import blob_logger
+from src.functions.predict_function.shared_code.blob_logger import (
+    AsyncPredictionLogger,
+    LogResult,
+    PredictionLogger,
+)
+
+
+def test_async_logger_writes_local_fallback_in_background(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setenv("LOCAL_BLOB_LOG_DIR", str(tmp_path))
+    logger = AsyncPredictionLogger(PredictionLogger(connection_string=None, container="logs"))
+    results = [logger.write({"i": i}) for i in range(20)]
+    assert {r.destination for r in results} == {"queued"}
+
+    assert logger.flush(timeout_s=5)
+    files = sorted((tmp_path / "logs").iterdir())
+    assert sorted(json.loads(f.read_text(encoding="utf-8"))["i"] for f in files) == list(range(20))
+    assert logger.stats() == {
+        "queue_depth": 0,
+        "enqueued": 20,
+        "written": 20,
+        "dropped": 0,
+        "failed": 0,
+    }
+    logger.close()
+
+
+class _BlockedLogger(PredictionLogger):
+    def __init__(self) -> None:
+        super().__init__(connection_string=None, container="logs")
+        self.release = threading.Event()
+        self.started = threading.Event()
+        self.records: list[dict[str, Any]] = []
+
+    def write(self, record: dict[str, Any]) -> LogResult:
+        self.started.set()
+        self.release.wait(5)
+        self.records.append(record)
+        return LogResult(destination="memory")
+
+
+def test_async_logger_drops_when_queue_is_full() -> None:
+    inner = _BlockedLogger()
+    logger = AsyncPredictionLogger(inner, max_queue=2, block_timeout_s=0.01)
+    logger.write({"i": 0})
+    assert inner.started.wait(5)  # the worker holds record 0; the queue is empty again
+    destinations = [logger.write({"i": i}).destination for i in range(1, 5)]
+    assert destinations == ["queued", "queued", "dropped", "dropped"]
+
+    inner.release.set()
+    assert logger.flush(timeout_s=5)
+    assert [r["i"] for r in inner.records] == [0, 1, 2]
+    assert logger.stats()["dropped"] == 2
+    logger.close()
+    # After close, writes go straight through instead of into a queue nobody drains.
+    assert logger.write({"i": 9}).destination == "memory"
+
+
+class _FakeBlobService:
+    def __init__(self) -> None:
+        self.create_calls = 0
+        self.uploads: list[str] = []
+
+    def get_container_client(self, container: str) -> _FakeBlobService:
+        return self
+
+    def create_container(self) -> None:
+        self.create_calls += 1
+        raise RuntimeError("ContainerAlreadyExists")
+
+    def get_blob_client(self, container: str, blob: str) -> _FakeBlobService:
+        self.uploads.append(blob)
+        return self
+
+    def upload_blob(self, data: bytes, overwrite: bool) -> None:
+        pass
+
+
+def test_container_existence_is_checked_once(monkeypatch: pytest.MonkeyPatch) -> None:
+    service = _FakeBlobService()
+    monkeypatch.setattr(
+        blob_logger.BlobServiceClient, "from_connection_string", lambda conn: service
+    )
+    logger = PredictionLogger(connection_string="UseDevelopmentStorage=true", container="logs")
+    for i in range(3):
+        assert logger.write({"i": i}).destination.startswith("logs/predictions/")
+    assert service.create_calls == 1
+    assert len(service.uploads) == 3
@@ -0,0 +1,32 @@
+from __future__ import annotations
+
+from concurrent.futures import ThreadPoolExecutor
+
+from src.serving.batching import MicroBatcher
+
+
+def test_micro_batcher_coalesces_and_slices() -> None:
+    calls: list[int] = []
+
+    def predict(texts: list[str]) -> list[int]:
+        calls.append(len(texts))
+        return [len(t) for t in texts]
+
+    batcher = MicroBatcher(predict, max_batch_size=64, max_wait_ms=200)
+    inputs = [["a" * i, "b" * (i + 1)] for i in range(8)]
+    with ThreadPoolExecutor(max_workers=8) as ex:
+        results = list(ex.map(batcher.submit, inputs))
+
+    assert results == [[i, i + 1] for i in range(8)]
+    assert len(calls) < len(inputs)
+    stats = batcher.stats()
+    assert stats["requests"] == 8
+    assert stats["rows"] == 16
+    assert stats["max_batch_size"] <= 64
+
+
+def test_closed_batcher_never_starts_a_worker() -> None:
+    batcher = MicroBatcher(lambda texts: [len(t) for t in texts])
+    batcher.close()  # e.g. swapped out by a hot reload before any request reached it
+    assert batcher.submit(["abc"]) == [3]
+    assert batcher._thread is None
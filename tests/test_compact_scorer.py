@@ -0,0 +1,25 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import mlflow.sklearn
+import numpy as np
+import pandas as pd
+
+from src.serving.compact_scorer import CompactScorer
+
+
+def test_compact_scorer_matches_pipeline(trained_model_dir: Path) -> None:
+    pipeline = mlflow.sklearn.load_model(str(trained_model_dir))
+    scorer = CompactScorer.from_model_dir(trained_model_dir)
+
+    texts = pd.read_csv("data/spam_sample.csv")["text"].astype(str).tolist()
+    texts += ["", "the and of", "FREE free FREE", "Ünïcödé prize — claim now!!", "a b c"]
+
+    assert scorer.predict(texts) == [int(x) for x in pipeline.predict(texts)]
+    np.testing.assert_allclose(
+        scorer.decision_function(texts), pipeline.decision_function(texts), rtol=1e-9, atol=1e-12
+    )
+
+    # A batch in which no text has a known term.
+    assert scorer.predict(["zzqx"]) == [int(x) for x in pipeline.predict(["zzqx"])]
@@ -0,0 +1,75 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+
+from src.training.dataset import convert_csv, parquet_files
+from src.training.streaming import iter_chunks
+from src.training.train import TrainConfig, load_dataset, main
+
+SAMPLE = Path("data/spam_sample.csv")
+
+
+def test_parquet_folder_loads_the_same_rows_as_the_csv(tmp_path: Path) -> None:
+    files = convert_csv(SAMPLE, tmp_path / "parts", rows_per_file=30)
+    assert len(files) > 1
+    assert parquet_files(tmp_path / "parts") == files
+
+    x_csv, y_csv = load_dataset(SAMPLE)
+    for path in (tmp_path / "parts", files[0]):
+        x, y = load_dataset(path)
+        n = len(x)
+        assert x.tolist() == x_csv.tolist()[:n]
+        assert y.dtype == np.int64 and y.tolist() == y_csv.tolist()[:n]
+    assert len(load_dataset(tmp_path / "parts")[0]) == len(x_csv)
+
+    # Streaming reads the same rows from the folder, a batch per file.
+    chunks = list(iter_chunks(tmp_path / "parts", chunk_rows=1000))
+    assert len(chunks) == len(files)
+    assert [t for texts, _ in chunks for t in texts] == x_csv.tolist()
+
+    # Only text and label are read, cast to their training types, and null texts become "".
+    extra = pa.table(
+        {
+            "id": [1, 2],
+            "text": ["free prize", None],
+            "label": pa.array([1, 0], type=pa.int8()),
+        }
+    )
+    pq.write_table(extra, tmp_path / "extra.parquet")
+    x, y = load_dataset(tmp_path / "extra.parquet")
+    assert x.tolist() == ["free prize", ""] and y.tolist() == [1, 0]
+
+    pq.write_table(pa.table({"body": ["x"], "label": [1]}), tmp_path / "bad.parquet")
+    with pytest.raises(ValueError, match="text"):
+        load_dataset(tmp_path / "bad.parquet")
+
+
+def test_train_reads_a_parquet_uri_folder(tmp_path: Path) -> None:
+    parts = tmp_path / "data"
+    convert_csv(SAMPLE, parts, rows_per_file=40)
+    csv_out, pq_out = tmp_path / "csv_model", tmp_path / "pq_model"
+    for data_path, out in ((SAMPLE, csv_out), (parts, pq_out)):
+        cfg = TrainConfig(
+            data_path=data_path,
+            output_dir=out,
+            test_size=0.2,
+            random_state=42,
+            max_features=2000,
+            ngram_max=2,
+            c=1.0,
+            max_iter=100,
+            feature_cache_dir=tmp_path / "features",
+        )
+        assert main(cfg) == 0
+
+    def read_metrics(out: Path) -> dict[str, float]:
+        metrics = json.loads((out / "metrics.json").read_text(encoding="utf-8"))
+        return {"accuracy": metrics["accuracy"], "f1": metrics["f1"]}
+
+    assert read_metrics(pq_out) == read_metrics(csv_out)
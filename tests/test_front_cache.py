@@ -0,0 +1,54 @@
+from __future__ import annotations
+
+import time
+from pathlib import Path
+
+from src.functions.predict_function.shared_code.aml_client import model_version_from
+from src.functions.predict_function.shared_code.prediction_cache import (
+    CacheHit,
+    FrontCache,
+    MemoryTier,
+    SqliteTier,
+)
+
+
+def test_memory_tier_is_keyed_on_normalized_text_and_version() -> None:
+    cache = FrontCache(MemoryTier(max_entries=2, ttl_s=60))
+    cache.put("free  prize\n", "v1", 1)
+
+    assert cache.get("free prize", "v1") == CacheHit(1, "memory")
+    assert cache.get("free prize", "v2") is None
+
+    cache.put("b", "v1", 0)
+    assert cache.get("b", "v1") == CacheHit(0, "memory")
+    cache.put("c", "v1", 0)  # evicts the least recently used entry
+    assert cache.get("free prize", "v1") is None
+    assert cache.stats() == {"entries": 2, "memory_hits": 2, "shared_hits": 0, "misses": 2}
+
+
+def test_memory_entries_expire() -> None:
+    cache = FrontCache(MemoryTier(max_entries=10, ttl_s=0.01))
+    cache.put("hello", "v1", 0)
+    time.sleep(0.02)
+    assert cache.get("hello", "v1") is None
+
+
+def test_shared_tier_serves_other_workers(tmp_path: Path) -> None:
+    path = str(tmp_path / "cache.sqlite")
+    worker_a = FrontCache(MemoryTier(10, 60), SqliteTier(path, ttl_s=60))
+    worker_b = FrontCache(MemoryTier(10, 60), SqliteTier(path, ttl_s=60))
+
+    worker_a.put("win a prize", "v1", 1)
+    assert worker_b.get("win a prize", "v1") == CacheHit(1, "shared")
+    assert worker_b.get("win a prize", "v1") == CacheHit(1, "memory")
+    assert worker_b.get("win a prize", "v2") is None
+    worker_a.close()
+    worker_b.close()
+
+
+def test_model_version_comes_from_the_scored_model() -> None:
+    assert model_version_from({"model_version": "abc123"}, {}) == "abc123"
+    assert model_version_from({}, {"X-Model-Version": "abc123"}) == "abc123"
+    # The deployment name stays "blue" across model rollouts, so it is never a version.
+    assert model_version_from({}, {"azureml-model-deployment": "blue"}) is None
+    assert model_version_from({}, {}) is None
@@ -0,0 +1,123 @@
+from __future__ import annotations
+
+import http.client
+import json
+import threading
+import time
+from collections.abc import Callable
+from pathlib import Path
+
+import pytest
+
+from src.serving.batching import MicroBatcher
+from src.serving.hot_reload import ModelReloader, ServingModel
+from src.serving.local_server import Handler, _PooledHTTPServer
+
+
+class _ConstModel:
+    flavor = "test"
+
+    def __init__(self, value: int) -> None:
+        self.value = value
+
+    def predict(self, texts: list[str]) -> list[int]:
+        return [self.value for _ in texts]
+
+
+def _wait_for(cond: Callable[[], bool], timeout: float = 5.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if cond():
+            return
+        time.sleep(0.01)
+    raise AssertionError("condition not met in time")
+
+
+def test_reload_swaps_model_and_keeps_old_one_on_failure(tmp_path: Path) -> None:
+    old_model = _ConstModel(0)
+    old = ServingModel(old_model, "v1", batcher=MicroBatcher(old_model.predict, max_wait_ms=0))
+    assert old.predict(["a"]) == [0]
+    published: list[ServingModel] = []
+    loads = iter([ServingModel(_ConstModel(1), "v2")])
+
+    def load(path: Path) -> ServingModel:
+        return next(loads)  # StopIteration on the second call stands in for a broken model
+
+    reloader = ModelReloader(tmp_path, old, load, published.append)
+    assert reloader.request()
+    _wait_for(lambda: not reloader.stats()["reloading"])
+    assert [m.version for m in published] == ["v2"]
+    assert reloader.current.predict(["a", "b"]) == [1, 1]
+    # The replaced batcher is closed but still answers callers that grabbed it late.
+    assert old.predict(["a"]) == [0]
+
+    reloader.request()
+    _wait_for(lambda: not reloader.stats()["reloading"])
+    stats = reloader.stats()
+    assert (stats["version"], stats["reloads"], stats["reload_failures"]) == ("v2", 1, 1)
+
+
+def test_watch_reloads_once_the_model_dir_settles(tmp_path: Path) -> None:
+    (tmp_path / "MLmodel").write_text("v1")
+    versions = iter(["v2", "v3"])
+    reloader = ModelReloader(
+        tmp_path,
+        ServingModel(_ConstModel(0), "v1"),
+        lambda path: ServingModel(_ConstModel(1), next(versions)),
+        lambda serving: None,
+        poll_s=0.02,
+    )
+    reloader.watch()
+    time.sleep(0.1)
+    assert reloader.stats()["reloads"] == 0
+
+    (tmp_path / "MLmodel").write_text("v2, a longer file")
+    _wait_for(lambda: reloader.stats()["reloads"] == 1)
+    assert reloader.current.version == "v2"
+
+
+def test_admin_reload_changes_the_version_on_responses(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    def publish(serving: ServingModel) -> None:
+        Handler.serving = serving
+
+    current = ServingModel(_ConstModel(0), "v1")
+    monkeypatch.setattr(Handler, "serving", current, raising=False)
+    monkeypatch.setattr(
+        Handler,
+        "reloader",
+        ModelReloader(tmp_path, current, lambda p: ServingModel(_ConstModel(1), "v2"), publish),
+    )
+    monkeypatch.setattr(Handler, "admin_token", "s3cret")
+    server = _PooledHTTPServer(("127.0.0.1", 0), Handler, threads=2)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    conn = http.client.HTTPConnection("127.0.0.1", server.server_address[1], timeout=10)
+
+    def score() -> tuple[str | None, dict[str, object]]:
+        conn.request("POST", "/score", body=json.dumps({"text": "hi"}))
+        resp = conn.getresponse()
+        return resp.getheader("X-Model-Version"), json.loads(resp.read())
+
+    try:
+        version, body = score()
+        assert (version, body["predictions"], body["model_version"]) == ("v1", [0], "v1")
+
+        conn.request("POST", "/admin/reload", body=b"")
+        resp = conn.getresponse()
+        resp.read()
+        assert resp.status == 401
+        conn.close()
+
+        headers = {"Authorization": "Bearer s3cret"}
+        conn.request("POST", "/admin/reload", body=b"", headers=headers)
+        resp = conn.getresponse()
+        assert resp.status == 202
+        assert json.loads(resp.read())["status"] == "reloading"
+
+        _wait_for(lambda: score()[0] == "v2")
+        assert score()[1]["predictions"] == [1]
+    finally:
+        conn.close()
+        server.shutdown()
+        server.server_close()
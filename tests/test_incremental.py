@@ -0,0 +1,167 @@
+from __future__ import annotations
+
+import json
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any
+
+import mlflow
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.feature_extraction.text import TfidfVectorizer
+
+from src.functions.predict_function.shared_code.blob_logger import BlobStore, PredictionLogger
+from src.functions.predict_function.shared_code.segment_logger import SegmentLogger
+from src.serving.prediction_cache import model_version
+from src.serving.predictor import load_predictor
+from src.training.incremental import STATE_FILE, count_terms, load_holdout, refresh_idf, weigh
+from src.training.prediction_logs import may_hold_newer
+from src.training.train import TrainConfig, main
+
+SAMPLE = Path("data/spam_sample.csv")
+
+
+def test_refresh_idf_matches_refitting_on_all_documents() -> None:
+    df = pd.read_csv(SAMPLE)
+    old, new = df["text"].tolist()[:60], df["text"].tolist()[60:]
+    tfidf = TfidfVectorizer(lowercase=True, stop_words="english", max_features=300).fit(old)
+
+    counts = count_terms(tfidf, new)
+    np.testing.assert_allclose(weigh(tfidf, counts).toarray(), tfidf.transform(new).toarray())
+    n = refresh_idf(tfidf, len(old), counts)
+
+    refit = TfidfVectorizer(lowercase=True, stop_words="english", vocabulary=tfidf.vocabulary_).fit(
+        old + new
+    )
+    assert n == len(old) + len(new)
+    np.testing.assert_allclose(tfidf.idf_, refit.idf_)
+
+
+def test_log_file_names_prune_only_files_older_than_the_watermark() -> None:
+    mark = datetime(2026, 5, 1, 12, 30, tzinfo=timezone.utc)
+    assert may_hold_newer("predictions/2026/05/01/12/w-1.jsonl.gz", mark)
+    assert may_hold_newer("predictions_2026_05_01_11_20260501T110000Z-w-000001.jsonl.gz", mark)
+    assert not may_hold_newer("predictions/2026/05/01/10/w-1.jsonl.gz", mark)
+    assert may_hold_newer("predictions/2026/05/01/113000-ab12.json", mark)
+    assert not may_hold_newer("predictions_2026_05_01_112959-ab12.json", mark)
+    assert not may_hold_newer("something-else.json", None)
+
+
+def _labeled(text: str, label: int | None, ts: datetime | None = None) -> dict[str, object]:
+    record: dict[str, object] = {
+        "ts_utc": (ts or datetime.now(timezone.utc)).isoformat(),
+        "input": {"text": text},
+        "prediction": {"predictions": [label or 0]},
+    }
+    if label is not None:
+        record["label"] = label
+    return record
+
+
+def _config(data: Path, out: Path, **kwargs: Any) -> TrainConfig:
+    return TrainConfig(
+        data_path=data,
+        output_dir=out,
+        test_size=0.2,
+        random_state=42,
+        max_features=2000,
+        ngram_max=2,
+        c=1.0,
+        max_iter=100,
+        **kwargs,
+    )
+
+
+def test_retrain_ingests_only_new_labeled_logs(
+    trained_model_dir: Path, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setenv("LOCAL_BLOB_LOG_DIR", str(tmp_path / "blob"))
+    log_dir = tmp_path / "blob" / "logs"
+    df = pd.read_csv(SAMPLE)
+    rows = list(zip(df["text"], df["label"], strict=True))
+
+    # Both formats the Function writes: one JSON per request, and gzip JSONL segments.
+    per_request = PredictionLogger(None, "logs")
+    for text, label in rows[:40]:
+        per_request.write(_labeled(text, int(label)))
+    per_request.write(_labeled("never reviewed", None))
+    segments = SegmentLogger(BlobStore(None, "logs"), writer_id="w")
+    for text, label in rows[40:80]:
+        segments.write(_labeled(text, int(label)))
+    segments.write(
+        {
+            "ts_utc": datetime.now(timezone.utc).isoformat(),
+            "input": {"texts": [t for t, _ in rows[80:90]]},
+            "labels": [int(y) for _, y in rows[80:90]],
+        }
+    )
+    segments.close()
+    assert any(p.name.endswith(".json") for p in log_dir.iterdir())
+    assert any(p.name.endswith(".jsonl.gz") for p in log_dir.iterdir())
+
+    def retrain(source: Path, out: Path) -> dict[str, float]:
+        assert main(_config(log_dir, out, retrain_from=source)) == 0
+        path = out / "metrics.json"
+        return json.loads(path.read_text(encoding="utf-8")) if path.exists() else {}
+
+    first = retrain(trained_model_dir, tmp_path / "r1")
+    assert first["new_labeled_rows"] == 90
+    assert first["new_records"] == 82  # 41 per-request + 40 single + 1 batch record
+    assert 0 <= first["f1"] <= 1 and "previous_model_f1" in first
+    assert first["full_retrain_estimate_s"] > 0 and "time_saved_estimate_s" in first
+    state = json.loads((tmp_path / "r1" / STATE_FILE).read_text(encoding="utf-8"))
+    assert state["idf_docs"] > 90
+    held_out = len(load_holdout(tmp_path / "r1")[0])
+    assert 0 < held_out < 90
+
+    texts = ["WIN a free prize now!!!", "see you at lunch"]
+    assert len(load_predictor(tmp_path / "r1").predict(texts)) == 2
+    assert (tmp_path / "r1" / "compact_scorer.npz").exists()
+
+    # Re-reading the lookback finds only records already used: the model is passed on as is.
+    assert retrain(tmp_path / "r1", tmp_path / "r-empty") == first
+    assert model_version(tmp_path / "r-empty") == model_version(tmp_path / "r1")
+    assert json.loads((tmp_path / "r-empty" / STATE_FILE).read_text(encoding="utf-8")) == state
+
+    per_request = PredictionLogger(None, "logs")
+    for text, label in rows[90:110]:
+        per_request.write(_labeled(text, int(label)))
+    # Arrived late, but within the lookback behind the watermark: used.
+    watermark = datetime.fromisoformat(state["watermark"])
+    per_request.write(_labeled(rows[110][0], int(rows[110][1]), watermark - timedelta(minutes=5)))
+    # Older than the lookback: skipped, and counted.
+    per_request.write(_labeled(rows[111][0], int(rows[111][1]), watermark - timedelta(hours=2)))
+    # A reviewer labels a record after the first retrain.
+    for path in log_dir.glob("*.json"):
+        record = json.loads(path.read_text(encoding="utf-8"))
+        if record["input"] == {"text": "never reviewed"}:
+            path.write_text(json.dumps({**record, "label": 0}), encoding="utf-8")
+
+    second = retrain(tmp_path / "r1", tmp_path / "r2")
+    assert second["new_labeled_rows"] == 22
+    assert second["late_labeled_records_skipped"] == 1
+    assert second["carried_holdout_rows"] == held_out
+    state2 = json.loads((tmp_path / "r2" / STATE_FILE).read_text(encoding="utf-8"))
+    assert state2["watermark"] > state["watermark"]
+    assert state2["full_rows"] == state["full_rows"] + 22
+    # The first retrain's holdout is trained on now, along with the new training rows.
+    new_held_out = len(load_holdout(tmp_path / "r2")[0])
+    assert state2["idf_docs"] == state["idf_docs"] + held_out + 22 - new_held_out
+
+    run_info = mlflow.last_active_run()
+    assert run_info is not None
+    assert run_info.data.params["watermark_before"] == state["watermark"]
+
+
+def test_retrain_rejects_models_it_cannot_update(tmp_path: Path) -> None:
+    streaming = tmp_path / "streaming"
+    assert main(_config(SAMPLE, streaming, streaming=True)) == 0
+    with pytest.raises(ValueError, match="streaming"):
+        main(_config(tmp_path / "logs", tmp_path / "out", retrain_from=streaming))
+
+    for out in (tmp_path / "miss", tmp_path / "hit"):
+        assert main(_config(SAMPLE, out, feature_cache_dir=tmp_path / "features")) == 0
+    with pytest.raises(ValueError, match="feature-cache"):
+        main(_config(tmp_path / "logs", tmp_path / "out", retrain_from=tmp_path / "hit"))
+    assert not (tmp_path / "out").exists()
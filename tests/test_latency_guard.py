@@ -0,0 +1,50 @@
+from __future__ import annotations
+
+import time
+
+import pytest
+
+from src.functions.predict_function.shared_code.latency_guard import (
+    CircuitOpenError,
+    LatencyGuard,
+)
+
+
+def test_hedge_delay_is_the_window_quantile_and_respects_the_budget() -> None:
+    guard = LatencyGuard(min_samples=10, hedge_quantile=0.9, hedge_max_ratio=0.1)
+    for i in range(9):
+        guard.record(0.01 * (i + 1), ok=True)
+    assert guard.hedge_delay() is None  # not enough samples yet
+
+    guard.record(0.10, ok=True)
+    guard.record(5.0, ok=False)  # failures do not count towards the latency quantile
+    assert guard.hedge_delay() == pytest.approx(0.10)
+
+    guard.hedge_fired()
+    guard.hedge_fired()  # 2 hedges in 11 calls is over the 10% budget
+    assert guard.hedge_delay() is None
+    assert LatencyGuard().hedge_delay() is None  # hedging off
+
+
+def test_breaker_opens_on_slow_calls_and_closes_after_a_good_probe() -> None:
+    guard = LatencyGuard(min_samples=4, slow_call_s=0.5, failure_ratio=0.5, open_s=0.05)
+    for latency in (0.1, 0.1, 0.9, 0.9):
+        guard.check()
+        guard.record(latency, ok=True)
+
+    with pytest.raises(CircuitOpenError):
+        guard.check()
+    time.sleep(0.06)
+    guard.check()  # the probe goes through...
+    with pytest.raises(CircuitOpenError):
+        guard.check()  # ...alone
+    guard.record(0.9, ok=True)  # a slow probe re-opens the breaker
+    with pytest.raises(CircuitOpenError):
+        guard.check()
+
+    time.sleep(0.06)
+    guard.check()
+    guard.record(0.1, ok=True)
+    guard.check()
+    stats = guard.stats()
+    assert (stats["state"], stats["opened"], stats["rejected"]) == ("closed", 2, 3)
@@ -0,0 +1,145 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import sys
+import threading
+from collections.abc import Iterator
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any
+
+import azure.functions as func
+import pytest
+
+from src.functions.predict_function.shared_code.local_scorer import LocalScorer
+from src.serving.prediction_cache import model_version
+
+FUNCTION_DIR = Path(__file__).resolve().parents[1] / "src" / "functions" / "predict_function"
+
+
+class _Endpoint(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    reply = json.dumps({"predictions": [7]}).encode()
+
+    def do_POST(self) -> None:
+        json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        body = self.reply
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args: object) -> None:
+        pass
+
+
+@pytest.fixture()
+def endpoint_url() -> Iterator[str]:
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _Endpoint)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        yield f"http://127.0.0.1:{server.server_address[1]}/score"
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+@pytest.fixture
+def function_loop() -> Iterator[asyncio.AbstractEventLoop]:
+    # One loop per test, like the Functions host; the endpoint client is process-wide, so its
+    # session is closed on that loop before the loop goes away.
+    loop = asyncio.new_event_loop()
+    try:
+        yield loop
+    finally:
+        clients = sys.modules.get("shared_code.clients")
+        if clients is not None:
+            loop.run_until_complete(clients.close_async_client())
+        loop.close()
+
+
+def _call_function(
+    loop: asyncio.AbstractEventLoop, body: dict[str, Any] | bytes, status: int = 200
+) -> dict[str, Any]:
+    sys.path.insert(0, str(FUNCTION_DIR))
+    try:
+        import predict
+    finally:
+        sys.path.remove(str(FUNCTION_DIR))
+    raw = body if isinstance(body, bytes) else json.dumps(body).encode("utf-8")
+    req = func.HttpRequest(method="POST", url="/api/predict", body=raw)
+    resp = loop.run_until_complete(predict.main(req))
+    assert resp.status_code == status, resp.get_body()
+    result: dict[str, Any] = json.loads(resp.get_body())
+    return result
+
+
+def test_local_scorer_loads_the_trained_model(trained_model_dir: Path) -> None:
+    scorer = LocalScorer(trained_model_dir)
+    pred = scorer.predict_texts(["WIN a free prize now!!!", "see you at lunch"])
+    assert len(pred.predictions) == 2
+    assert pred.model_version == scorer.version == model_version(trained_model_dir)
+
+
+def test_function_scores_in_process_in_local_mode(
+    trained_model_dir: Path,
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+    function_loop: asyncio.AbstractEventLoop,
+) -> None:
+    monkeypatch.setenv("SCORING_MODE", "local")
+    monkeypatch.setenv("LOCAL_MODEL_DIR", str(trained_model_dir))
+    monkeypatch.setenv("LOCAL_BLOB_LOG_DIR", str(tmp_path))
+    monkeypatch.delenv("AML_SCORING_URI", raising=False)
+
+    single = _call_function(function_loop, {"text": "WIN a free prize now!!!"})
+    assert single["scored_by"] == "local"
+    assert single["model_version"] == model_version(trained_model_dir)
+    assert set(single) >= {"prediction", "endpoint_latency_ms", "function_latency_ms"}
+
+    batch = _call_function(function_loop, {"texts": ["free prize", "lunch?", "free prize"]})
+    assert batch["scored_by"] == "local"
+    assert len(batch["prediction"]["predictions"]) == 3
+    assert batch["prediction"]["predictions"][0] == batch["prediction"]["predictions"][2]
+
+
+def test_local_mode_falls_back_to_the_endpoint(
+    endpoint_url: str,
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+    function_loop: asyncio.AbstractEventLoop,
+) -> None:
+    monkeypatch.setenv("SCORING_MODE", "local")
+    monkeypatch.setenv("LOCAL_MODEL_DIR", str(tmp_path / "missing-model"))
+    monkeypatch.setenv("LOCAL_BLOB_LOG_DIR", str(tmp_path))
+    monkeypatch.setenv("AML_SCORING_URI", endpoint_url)
+    monkeypatch.setenv("AML_ENDPOINT_KEY", "key")
+
+    result = _call_function(function_loop, {"text": "hello"})
+    assert (result["scored_by"], result["prediction"]["predictions"]) == ("endpoint", [7])
+    # The load failure is reported, not just logged.
+    assert "missing-model" in result["local_scoring_error"]
+    batch = _call_function(function_loop, {"texts": ["hello"]})
+    assert batch["scored_by"] == "endpoint" and "local_scoring_error" in batch
+
+
+def test_only_request_body_errors_are_client_errors(
+    endpoint_url: str,
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+    function_loop: asyncio.AbstractEventLoop,
+) -> None:
+    monkeypatch.setenv("AML_SCORING_URI", endpoint_url)
+    monkeypatch.setenv("AML_ENDPOINT_KEY", "key")
+    monkeypatch.setenv("LOCAL_BLOB_LOG_DIR", str(tmp_path))
+
+    assert _call_function(function_loop, b"{not json", 400)["error"] == "Invalid JSON body"
+    assert _call_function(function_loop, b'["hello"]', 400)["error"] == "Expected a JSON object"
+
+    monkeypatch.setattr(_Endpoint, "reply", b"<html>bad gateway</html>")
+    assert _call_function(function_loop, {"text": "hello"}, 502)["error"] == "endpoint_error"
+
+    monkeypatch.setenv("AML_HTTP_TIMEOUT_S", "ten")
+    assert _call_function(function_loop, {"text": "hello"}, 500)["error"] == "invalid_settings"
@@ -0,0 +1,152 @@
+from __future__ import annotations
+
+import http.client
+import json
+import threading
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from src.serving.hot_reload import ServingModel
+from src.serving.local_server import Handler, _make_server, _PooledHTTPServer
+
+
+class _BarrierModel:
+    """Only answers once two requests are inside predict() at the same time."""
+
+    flavor = "test"
+
+    def __init__(self) -> None:
+        self.barrier = threading.Barrier(2, timeout=5)
+
+    def predict(self, texts: list[str]) -> list[int]:
+        self.barrier.wait()
+        return [1 for _ in texts]
+
+
+def _post(url: str, payload: dict[str, object]) -> dict[str, object]:
+    req = urllib.request.Request(
+        url, data=json.dumps(payload).encode("utf-8"), headers={"Content-Type": "application/json"}
+    )
+    with urllib.request.urlopen(req, timeout=10) as resp:
+        return json.loads(resp.read())
+
+
+def test_pooled_server_handles_requests_concurrently(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(
+        Handler, "serving", ServingModel(_BarrierModel(), version="v1"), raising=False
+    )
+    server = _PooledHTTPServer(("127.0.0.1", 0), Handler, threads=2)
+    t = threading.Thread(target=server.serve_forever, daemon=True)
+    t.start()
+    try:
+        url = f"http://127.0.0.1:{server.server_address[1]}/score"
+        with ThreadPoolExecutor(max_workers=2) as ex:
+            results = list(ex.map(lambda s: _post(url, {"text": s}), ["a", "b"]))
+        assert [r["predictions"] for r in results] == [[1], [1]]
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+class _EchoModel:
+    flavor = "test"
+
+    def predict(self, texts: list[str]) -> list[int]:
+        return [len(t) % 2 for t in texts]
+
+
+def test_keep_alive_reuses_connection_and_limits_body(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(Handler, "serving", ServingModel(_EchoModel(), version="v1"), raising=False)
+    monkeypatch.setattr(Handler, "max_body_bytes", 64)
+    server = _PooledHTTPServer(("127.0.0.1", 0), Handler, threads=2)
+    t = threading.Thread(target=server.serve_forever, daemon=True)
+    t.start()
+    try:
+        conn = http.client.HTTPConnection("127.0.0.1", server.server_address[1], timeout=10)
+        peers = set()
+        for text in ["a", "bb", "ccc"]:
+            conn.request("POST", "/score", body=json.dumps({"text": text}))
+            resp = conn.getresponse()
+            assert json.loads(resp.read())["predictions"] == [len(text) % 2]
+            assert not resp.will_close
+            assert conn.sock is not None
+            peers.add(conn.sock.getsockname())
+        assert len(peers) == 1
+
+        conn.request("POST", "/score", body=json.dumps({"text": "x" * 100}))
+        resp = conn.getresponse()
+        assert resp.status == 413
+        assert resp.will_close
+        conn.close()
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_bad_content_length_is_rejected(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(Handler, "serving", ServingModel(_EchoModel(), version="v1"), raising=False)
+    server = _PooledHTTPServer(("127.0.0.1", 0), Handler, threads=2)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        for path in ["/score", "/score/stream"]:
+            for length in ["abc", "-5", ""]:
+                conn = http.client.HTTPConnection("127.0.0.1", server.server_address[1], timeout=10)
+                conn.putrequest("POST", path)
+                conn.putheader("Content-Length", length)
+                conn.endheaders(b'"a"\n')
+                resp = conn.getresponse()
+                assert (resp.status, json.loads(resp.read())) == (
+                    400,
+                    {"error": "invalid_content_length"},
+                ), (path, length)
+                assert resp.will_close
+                conn.close()
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_broken_chunked_body_closes_the_connection(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(Handler, "serving", ServingModel(_EchoModel(), version="v1"), raising=False)
+    server = _PooledHTTPServer(("127.0.0.1", 0), Handler, threads=2)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        conn = http.client.HTTPConnection("127.0.0.1", server.server_address[1], timeout=10)
+        conn.putrequest("POST", "/score")
+        conn.putheader("Transfer-Encoding", "chunked")
+        conn.endheaders(b"zz\r\n{}\r\n0\r\n\r\n")
+        resp = conn.getresponse()
+        assert resp.status == 400
+        assert json.loads(resp.read())["error"] == "invalid_chunked_body"
+        assert resp.getheader("Connection") == "close" and resp.will_close
+        conn.close()
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_single_threaded_server_does_not_hold_idle_connections(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.setattr(Handler, "serving", ServingModel(_EchoModel(), version="v1"), raising=False)
+    server = _make_server("127.0.0.1", 0, threads=1)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        idle = http.client.HTTPConnection("127.0.0.1", server.server_address[1], timeout=10)
+        idle.request("POST", "/score", body=json.dumps({"text": "a"}))
+        resp = idle.getresponse()
+        assert resp.status == 200 and resp.will_close
+        resp.read()
+
+        # The first client never closes its side; a second one must still be served at once.
+        start = time.perf_counter()
+        url = f"http://127.0.0.1:{server.server_address[1]}/score"
+        assert _post(url, {"text": "bb"})["predictions"] == [0]
+        assert time.perf_counter() - start < 1.0
+        idle.close()
+    finally:
+        server.shutdown()
+        server.server_close()
@@ -0,0 +1,76 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+import pytest
+
+from src.serving import score
+from src.serving.metrics import Histogram, collect_stages, render_prometheus, stage
+from src.serving.prediction_cache import model_version
+
+
+def test_histogram_renders_cumulative_prometheus_buckets() -> None:
+    h = Histogram("demo_seconds", "Demo.", (0.1, 1.0), label="stage")
+    for v in (0.05, 0.5, 5.0):
+        h.observe(v, "predict")
+    lines = h.render()
+    assert 'demo_seconds_bucket{stage="predict",le="0.1"} 1' in lines
+    assert 'demo_seconds_bucket{stage="predict",le="1"} 2' in lines
+    assert 'demo_seconds_bucket{stage="predict",le="+Inf"} 3' in lines
+    assert 'demo_seconds_count{stage="predict"} 3' in lines
+
+
+def test_stage_breakdown_and_exposition() -> None:
+    with collect_stages() as stages, stage("parse"):
+        pass
+    assert set(stages) == {"parse"}
+    text = render_prometheus({"spam_cache_hit_rate": 0.5})
+    assert "# TYPE spam_scoring_stage_seconds histogram" in text
+    assert "spam_cache_hit_rate 0.5" in text
+
+
+def test_score_run_includes_stage_breakdown(
+    trained_model_dir: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setenv("AZUREML_MODEL_DIR", str(trained_model_dir))
+    monkeypatch.setenv("SCORE_INCLUDE_STAGES", "1")
+    monkeypatch.setenv("SCORE_WARMUP_ROUNDS", "0")
+    score.init()
+    res = score.run('{"texts": ["free prize now", "see you at lunch"]}')
+    assert len(res["predictions"]) == 2
+    assert {"parse", "normalize", "dataframe", "predict"} <= set(res["stages_ms"])
+    assert res["model_version"] == model_version(trained_model_dir)
+    # The body is decoded once: a JSON string holding JSON is not a payload.
+    with pytest.raises(ValueError):
+        score.run(json.dumps('{"texts": ["free prize now"]}'))
+
+
+def test_score_run_reports_batching_and_cache_counters_only_on_request(
+    trained_model_dir: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setenv("AZUREML_MODEL_DIR", str(trained_model_dir))
+    monkeypatch.setenv("SCORE_WARMUP_ROUNDS", "0")
+    monkeypatch.setenv("SCORE_BATCH_MAX_SIZE", "8")
+    monkeypatch.setenv("SCORE_CACHE_SIZE", "16")
+    monkeypatch.setenv("SCORE_INCLUDE_STAGES", "1")
+    score.init()
+    try:
+        res = score.run('{"text": "free prize now"}')
+        assert "batching" not in res and "cache" not in res
+        # The DataFrame is built on the batcher thread, outside this request's breakdown.
+        assert "dataframe" not in res["stages_ms"]
+
+        monkeypatch.setenv("SCORE_INCLUDE_STATS", "1")
+        assert "cache" not in score.run('{"text": "free prize now"}')  # read once, at init
+
+        assert score._BATCHER is not None
+        score._BATCHER.close()
+        score.init()
+        score.run('{"text": "free prize now"}')
+        res = score.run('{"text": "free prize now"}')
+        assert res["batching"]["batches"] == 1
+        assert res["cache"]["hits"] == 1
+    finally:
+        if score._BATCHER is not None:
+            score._BATCHER.close()
@@ -0,0 +1,31 @@
+from __future__ import annotations
+
+from src.serving.prediction_cache import PredictionCache
+
+
+def test_cache_dedupes_and_predicts_only_misses() -> None:
+    calls: list[list[str]] = []
+
+    def predict(texts: list[str]) -> list[int]:
+        calls.append(texts)
+        return [len(t) % 2 for t in texts]
+
+    cache = PredictionCache("v1", max_entries=2)
+    assert cache.predict(["aa", "b", "aa", "  aa "], predict) == [0, 1, 0, 0]
+    assert calls == [["aa", "b"]]
+
+    assert cache.predict(["b", "ccc"], predict) == [1, 1]
+    assert calls[-1] == ["ccc"]
+
+    # "aa" was least recently used and got evicted by "ccc".
+    cache.predict(["aa"], predict)
+    assert calls[-1] == ["aa"]
+
+    stats = cache.stats()
+    assert stats["evictions"] >= 1
+    assert stats["hits"] == 3
+    assert stats["entries"] == 2
+
+
+def test_cache_keys_include_model_version() -> None:
+    assert PredictionCache("v1").key("free prize") != PredictionCache("v2").key("free prize")
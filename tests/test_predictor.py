@@ -0,0 +1,29 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+from src.serving.predictor import SklearnPredictor, load_predictor
+
+
+def test_native_sklearn_path_matches_pyfunc(trained_model_dir: Path) -> None:
+    texts = ["WIN a free gift card now!!!", "see you at lunch", "claim your prize"]
+    pyfunc = load_predictor(trained_model_dir)
+    native = load_predictor(trained_model_dir, native=True)
+
+    assert isinstance(native, SklearnPredictor)
+    assert pyfunc.flavor == "python_function"
+    assert native.predict(texts) == pyfunc.predict(texts)
+    assert all(type(x) is int for x in native.predict(texts))
+
+
+def test_pipeline_cache_skips_mlflow_on_second_load(
+    trained_model_dir: Path, tmp_path: Path
+) -> None:
+    first = load_predictor(trained_model_dir, native=True, pipeline_cache_dir=tmp_path)
+    assert list(tmp_path.glob("pipeline-*.pkl"))
+    second = load_predictor(trained_model_dir, native=True, pipeline_cache_dir=tmp_path)
+
+    assert isinstance(second, SklearnPredictor)
+    assert "load_pipeline_cache" in second.load_phases_ms
+    texts = ["WIN a free gift card now!!!", "see you at lunch"]
+    assert second.predict(texts) == first.predict(texts)
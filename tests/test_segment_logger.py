@@ -0,0 +1,107 @@
+from __future__ import annotations
+
+import gzip
+import json
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+import pytest
+
+from src.functions.predict_function.shared_code.blob_logger import BlobStore
+from src.functions.predict_function.shared_code.segment_logger import SegmentLogger
+
+
+def _read_segments(folder: Path) -> list[dict[str, int]]:
+    records: list[dict[str, int]] = []
+    for path in sorted(folder.glob("*.jsonl.gz")):
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            records.extend(json.loads(line) for line in f)
+    return records
+
+
+@pytest.fixture()
+def log_dir(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    monkeypatch.setenv("LOCAL_BLOB_LOG_DIR", str(tmp_path))
+    return tmp_path / "logs"
+
+
+def test_segment_names_are_deterministic() -> None:
+    at = datetime(2026, 3, 4, 5, 6, 7, tzinfo=timezone.utc)
+    block = SegmentLogger(BlobStore(None, "logs"), writer_id="w1")
+    assert (
+        block.segment_name(at, 7) == "predictions/2026/03/04/05/20260304T050607Z-w1-000007.jsonl.gz"
+    )
+    append = SegmentLogger(BlobStore(None, "logs"), mode="append", writer_id="w1")
+    assert append.segment_name(at, 7) == "predictions/2026/03/04/05/w1.jsonl.gz"
+
+
+def test_size_bound_splits_segments_and_close_flushes_the_rest(log_dir: Path) -> None:
+    logger = SegmentLogger(BlobStore(None, "logs"), max_bytes=200, max_age_s=3600, writer_id="w")
+    results = [logger.write({"i": i, "text": "x" * 20}) for i in range(30)]
+    logger.close()
+
+    files = sorted(p.name for p in log_dir.iterdir())
+    assert len(files) > 1
+    assert {r.destination.replace("/", "_") for r in results} == set(files)
+    assert [r["i"] for r in _read_segments(log_dir)] == list(range(30))
+    assert logger.stats()["records_flushed"] == 30
+
+
+def test_age_bound_flushes_without_more_writes(log_dir: Path) -> None:
+    logger = SegmentLogger(BlobStore(None, "logs"), max_age_s=0.05, writer_id="w")
+    for i in range(3):
+        logger.write({"i": i})
+
+    def wait_for_segments(n: int) -> None:
+        deadline = time.monotonic() + 5
+        while len(list(log_dir.glob("*.jsonl.gz"))) < n and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+    wait_for_segments(1)
+    assert [r["i"] for r in _read_segments(log_dir)] == [0, 1, 2]
+
+    # After an idle period the flusher must still pick up the next segment by age.
+    time.sleep(0.2)
+    logger.write({"i": 3})
+    wait_for_segments(2)
+    assert sorted(r["i"] for r in _read_segments(log_dir)) == [0, 1, 2, 3]
+    stats = logger.stats()
+    assert (stats["buffered_records"], stats["records_flushed"]) == (0, 4)
+    logger.close()
+
+
+def test_append_mode_adds_gzip_members_to_one_blob(log_dir: Path) -> None:
+    logger = SegmentLogger(BlobStore(None, "logs"), mode="append", max_age_s=3600, writer_id="w")
+    logger.write({"i": 0})
+    logger.flush()
+    logger.write({"i": 1})
+    logger.close()
+    assert len(list(log_dir.iterdir())) == 1
+    assert [r["i"] for r in _read_segments(log_dir)] == [0, 1]
+
+
+class _FlakyStore(BlobStore):
+    def __init__(self) -> None:
+        super().__init__(None, "logs")
+        self.failures = 1
+
+    def upload(self, blob_name: str, data: bytes) -> str:
+        if self.failures:
+            self.failures -= 1
+            raise OSError("storage unavailable")
+        return super().upload(blob_name, data)
+
+
+def test_failed_segment_is_retried_on_next_flush(log_dir: Path) -> None:
+    logger = SegmentLogger(_FlakyStore(), max_age_s=3600, writer_id="w")
+    logger.write({"i": 0})
+    logger.flush()
+    stats = logger.stats()
+    assert (stats["segments_pending"], stats["records_flushed"]) == (1, 0)
+    logger.write({"i": 1})
+    logger.close()
+    stats = logger.stats()
+    assert (stats["segments_written"], stats["upload_failures"]) == (2, 1)
+    assert stats["records_flushed"] == 2
+    assert sorted(r["i"] for r in _read_segments(log_dir)) == [0, 1]
@@ -0,0 +1,54 @@
+from __future__ import annotations
+
+import io
+import json
+
+from src.serving.codec import STDLIB, JsonCodec
+from src.serving.metrics import collect_stages
+from src.serving.streaming import iter_chunked_body, iter_lines, score_ndjson
+
+
+def _chunked(payload: bytes, size: int) -> bytes:
+    out = b""
+    for i in range(0, len(payload), size):
+        part = payload[i : i + size]
+        out += f"{len(part):x}\r\n".encode() + part + b"\r\n"
+    return out + b"0\r\n\r\n"
+
+
+def test_score_ndjson_over_chunked_body_in_batches() -> None:
+    body = b'"free prize"\n{"text": "hi"}\nnot json\n\n"claim now"\n"last"'
+    rfile = io.BytesIO(_chunked(body, size=5))
+    batches: list[list[str]] = []
+
+    def predict(texts: list[str]) -> list[int]:
+        batches.append(texts)
+        return [len(t) for t in texts]
+
+    lines = iter_lines(iter_chunked_body(rfile), max_line_bytes=1024)
+    out = b"".join(score_ndjson(lines, predict, batch_size=2))
+    records = [json.loads(line) for line in out.splitlines()]
+
+    assert [r["i"] for r in records] == [0, 1, 2, 3, 4]
+    assert [r.get("prediction") for r in records] == [10, 2, None, 9, 4]
+    assert "error" in records[2]
+    assert batches == [["free prize", "hi"], ["claim now"], ["last"]]
+
+
+def test_score_ndjson_uses_the_codec_and_records_stages() -> None:
+    calls: list[str] = []
+
+    def loads(raw: bytes | str) -> object:
+        calls.append("loads")
+        return STDLIB.loads(raw)
+
+    def dumps(obj: object) -> bytes:
+        calls.append("dumps")
+        return STDLIB.dumps(obj)
+
+    codec = JsonCodec(name="spy", loads=loads, dumps=dumps)
+    with collect_stages() as stages:
+        out = b"".join(score_ndjson([b'"a"', b'"bb"'], lambda t: [0] * len(t), codec=codec))
+    assert out == b'{"i":0,"prediction":0}\n{"i":1,"prediction":0}\n'
+    assert calls == ["loads", "loads", "dumps", "dumps"]
+    assert {"parse", "predict", "serialize"} <= set(stages)
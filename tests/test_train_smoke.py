@@ -1,7 +1,15 @@
 from __future__ import annotations
 
+import json
+import os
 from pathlib import Path
 
+import mlflow.pyfunc
+import pandas as pd
+import pytest
+
+from src.serving.predictor import load_predictor
+from src.training.feature_cache import FeatureCache
 from src.training.train import TrainConfig, main
 
 
@@ -21,3 +29,157 @@ def test_train_smoke(tmp_path: Path) -> None:
     assert rc == 0
     assert (model_out / "MLmodel").exists()
     assert (model_out / "metrics.json").exists()
+
+    pyfunc_model = mlflow.pyfunc.load_model(str(model_out))
+    preds = pyfunc_model.predict(pd.DataFrame({"text": ["free prize now", "see you at lunch"]}))
+    assert len(preds) == 2
+
+
+def test_train_streaming_saves_a_servable_model(tmp_path: Path) -> None:
+    model_out = tmp_path / "model"
+    cfg = TrainConfig(
+        data_path=Path("data/spam_sample.csv"),
+        output_dir=model_out,
+        test_size=0.2,
+        random_state=42,
+        max_features=2000,
+        ngram_max=2,
+        c=1.0,
+        max_iter=100,
+        streaming=True,
+        chunk_rows=25,  # several chunks even for the sample
+        n_features=2**16,
+        epochs=5,
+    )
+    assert main(cfg) == 0
+    metrics = json.loads((model_out / "metrics.json").read_text(encoding="utf-8"))
+    assert metrics["accuracy"] >= 0.8
+    assert not (model_out / "compact_scorer.npz").exists()
+
+    texts = ["WIN a free prize now!!!", "see you at lunch"]
+    pyfunc = load_predictor(model_out)
+    native = load_predictor(model_out, native=True, compact=True)  # no npz: sklearn path
+    assert native.flavor == "sklearn"
+    assert native.predict(texts) == pyfunc.predict(texts)
+
+
+def test_train_search_logs_nested_runs_and_saves_the_best(tmp_path: Path) -> None:
+    model_out = tmp_path / "model"
+    cfg = TrainConfig(
+        data_path=Path("data/spam_sample.csv"),
+        output_dir=model_out,
+        test_size=0.2,
+        random_state=42,
+        max_features=2000,
+        ngram_max=2,
+        c=1.0,
+        max_iter=100,
+        search="grid",
+        search_c=(0.01, 10.0),
+        search_ngram_max=(1, 2),
+        search_max_features=(20, 2000),
+        search_jobs=2,
+    )
+    assert main(cfg) == 0
+
+    parent = mlflow.last_active_run()
+    assert parent is not None
+    children = mlflow.search_runs(
+        experiment_ids=[parent.info.experiment_id],
+        filter_string=f"tags.mlflow.parentRunId = '{parent.info.run_id}'",
+        output_format="list",
+    )
+    assert len(children) == 8
+
+    # The shared-count evaluation of the winning candidate matches the refit saved model.
+    best = max(children, key=lambda r: r.data.metrics["f1"])
+    saved = json.loads((model_out / "metrics.json").read_text(encoding="utf-8"))
+    assert saved["f1"] == best.data.metrics["f1"]
+    assert float(parent.data.params["C"]) in (0.01, 10.0)
+    assert (model_out / "MLmodel").exists() and (model_out / "compact_scorer.npz").exists()
+
+
+def test_train_feature_cache_reuses_features_and_stays_bounded(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    cache_dir = tmp_path / "features"
+
+    def run(out: str, max_features: int) -> tuple[str, dict[str, float]]:
+        cfg = TrainConfig(
+            data_path=Path("data/spam_sample.csv"),
+            output_dir=tmp_path / out,
+            test_size=0.2,
+            random_state=42,
+            max_features=max_features,
+            ngram_max=2,
+            c=1.0,
+            max_iter=100,
+            feature_cache_dir=cache_dir,
+        )
+        assert main(cfg) == 0
+        run_info = mlflow.last_active_run()
+        assert run_info is not None
+        metrics = json.loads((tmp_path / out / "metrics.json").read_text(encoding="utf-8"))
+        return run_info.data.params["feature_cache"], metrics
+
+    status, cold = run("cold", 2000)
+    assert status == "miss"
+    status, warm = run("warm", 2000)
+    assert status == "hit"
+    assert (warm["accuracy"], warm["f1"]) == (cold["accuracy"], cold["f1"])
+    assert "feature_cache_read_wall_s" in warm and "vectorize_wall_s" not in warm
+    texts = ["WIN a free prize now!!!", "see you at lunch"]
+    assert load_predictor(tmp_path / "warm").predict(texts) == load_predictor(
+        tmp_path / "cold"
+    ).predict(texts)
+
+    # A different vectorizer is a different entry; a budget of one entry evicts the older one.
+    assert run("other", 500)[0] == "miss"
+    entries = sorted(p for p in cache_dir.iterdir() if not p.name.startswith("."))
+    assert len(entries) == 2
+    cache = FeatureCache(cache_dir, max_bytes=1)
+    newest = max(entries, key=lambda p: (p / "meta.json").stat().st_mtime)
+    cache.evict(keep=newest.name)
+    assert [p.name for p in cache_dir.iterdir()] == [newest.name]
+
+    def read_only(*args: object, **kwargs: object) -> None:
+        raise PermissionError("read-only file system")
+
+    # A hit on a cache dir this process cannot write to is still a hit.
+    monkeypatch.setattr(os, "utime", read_only)
+    assert cache.get(newest.name) is not None
+
+
+def test_train_profiles_each_phase(tmp_path: Path) -> None:
+    model_out = tmp_path / "model"
+    cfg = TrainConfig(
+        data_path=Path("data/spam_sample.csv"),
+        output_dir=model_out,
+        test_size=0.2,
+        random_state=42,
+        max_features=2000,
+        ngram_max=2,
+        c=1.0,
+        max_iter=100,
+        profile_fit=True,
+    )
+    assert main(cfg) == 0
+
+    saved = json.loads((model_out / "metrics.json").read_text(encoding="utf-8"))
+    for phase in ("load", "split", "vectorize", "fit", "evaluate", "save"):
+        assert saved[f"{phase}_wall_s"] > 0
+        assert saved[f"{phase}_cpu_s"] >= 0
+        assert saved[f"{phase}_peak_rss_mb"] > 0
+    assert saved["load_rows"] == saved["split_rows"] == saved["vectorize_rows"]
+    assert saved["fit_rows"] + saved["evaluate_rows"] == saved["load_rows"]
+    assert saved["fit_nnz"] < saved["vectorize_nnz"]
+    assert saved["fit_rows_per_s"] > 0
+    assert saved["total_wall_s"] >= sum(saved[f"{p}_wall_s"] for p in ("load", "fit", "save"))
+
+    run_info = mlflow.last_active_run()
+    assert run_info is not None
+    assert run_info.data.metrics["fit_wall_s"] == saved["fit_wall_s"]
+    artifacts = {
+        a.path for a in mlflow.MlflowClient().list_artifacts(run_info.info.run_id, "profile")
+    }
+    assert artifacts == {"profile/fit.prof", "profile/fit_profile.txt"}